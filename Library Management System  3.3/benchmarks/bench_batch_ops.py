@@ -0,0 +1,66 @@
+"""
+Batch BTree mutations (insert_many, delete_many_by_id, update_availability_many)
+against the same work done one key at a time
+
+Usage: python benchmarks/bench_batch_ops.py [n_books] [batch_size]
+"""
+
+import gc
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from models.Book import Book
+from models.Genre import Genre
+from models.btree import BTree
+
+
+def timed(fn, books, repeat=5):
+    """Best-of-repeat seconds for fn on a freshly bulk-loaded tree
+
+    The garbage collector is off while timing, as in timeit: otherwise a
+    full collection over the n books lands on whichever run allocates
+    enough to trigger it and swamps the difference being measured.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        tree = BTree(t=3)
+        tree.bulk_load(books)
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            fn(tree)
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    m = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    rng = random.Random(3)
+    books = [Book(i, f"Title {rng.randrange(n):08d}", "Author", Genre.FICTION, 2000) for i in range(n)]
+    extra = [Book(n + i, f"Title {rng.randrange(n):08d}", "Author", Genre.FICTION, 2000) for i in range(m)]
+    doomed = rng.sample(range(n), m)
+    returns = [(books[i].title, True) for i in rng.sample(range(n), m)]
+
+    print(f"{n} books, batches of {m}, t=3")
+    for label, single, batch in (
+        ("insert", lambda tree: [tree.insert(book) for book in extra], lambda tree: tree.insert_many(extra)),
+        ("delete", lambda tree: [tree.delete_by_id(i) for i in doomed], lambda tree: tree.delete_many_by_id(doomed)),
+        ("availability", lambda tree: [tree.update_availability(title, a) for title, a in returns],
+         lambda tree: tree.update_availability_many(returns)),
+    ):
+        results = [timed(fn, books) for fn in (single, batch)]
+        print(f"  {label:<13} one at a time {results[0] * 1e3:8.1f} ms   batch {results[1] * 1e3:8.1f} ms   "
+              f"{results[0] / results[1]:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
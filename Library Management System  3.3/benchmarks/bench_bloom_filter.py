@@ -0,0 +1,63 @@
+"""
+Negative title lookups: BTree.search with and without the counting Bloom filter
+
+Usage: python benchmarks/bench_bloom_filter.py [n_books]
+"""
+
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from models.Book import Book
+from models.Genre import Genre
+from models.btree import BTree
+
+
+def time_lookups(lookup, titles, repeat=3):
+    """Best-of-repeat average seconds per lookup"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for title in titles:
+            lookup(title)
+        best = min(best, time.perf_counter() - start)
+    return best / len(titles)
+
+
+def time_inserts(tree, books):
+    start = time.perf_counter()
+    for book in books:
+        tree.insert(book)
+    return (time.perf_counter() - start) / len(books)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    books = [Book(i, f"Title {i:07d}", f"Author {i % 997}", Genre.FICTION, 1900 + i % 120)
+             for i in range(n)]
+    rng = random.Random(7)
+    hits = [books[rng.randrange(n)].title for _ in range(20_000)]
+    misses = [f"Missing {rng.randrange(10 ** 9)}" for _ in range(20_000)]
+    shuffled = books[:]
+    rng.shuffle(shuffled)
+
+    print(f"{n} books, {len(hits)} lookups per run")
+    print(f"{'filter':>7} {'insert (us)':>12} {'hit (us)':>9} {'miss (us)':>10} {'fp rate':>8} {'memory':>9}")
+    for bloom in [False, True]:
+        tree = BTree(t=3, bloom_filter=bloom)
+        insert = time_inserts(tree, shuffled)
+        hit = time_lookups(tree.search, hits)
+        miss = time_lookups(tree.search, misses)
+        stats = tree.bloom_stats()
+        fp = f"{stats['false_positive_rate']:.4f}" if stats else "-"
+        memory = f"{stats['memory_bytes'] // 1024} KiB" if stats else "-"
+        print(f"{'on' if bloom else 'off':>7} {insert * 1e6:>12.2f} {hit * 1e6:>9.2f} "
+              f"{miss * 1e6:>10.2f} {fp:>8} {memory:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Lookup latency of BTree.search: linear in-node scan vs. bisect over node.keys
+
+Usage: python benchmarks/bench_btree_search.py [n_books]
+"""
+
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from models.Book import Book
+from models.Genre import Genre
+from models.btree import BTree
+
+
+def linear_search(node, title):
+    """Previous recursive search: scan node.books comparing .title one by one"""
+    if not node:
+        return None
+    i = 0
+    while i < len(node.books) and title > node.books[i].title:
+        i += 1
+    if i < len(node.books) and title == node.books[i].title:
+        return node.books[i]
+    if node.leaf:
+        return None
+    return linear_search(node.children[i], title)
+
+
+def time_lookups(lookup, titles, repeat=3):
+    """Best-of-repeat average seconds per lookup"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for title in titles:
+            lookup(title)
+        best = min(best, time.perf_counter() - start)
+    return best / len(titles)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    books = [Book(i, f"Title {i:07d}", f"Author {i % 997}", Genre.FICTION, 1900 + i % 120)
+             for i in range(n)]
+    rng = random.Random(7)
+    probes = [books[rng.randrange(n)].title for _ in range(20_000)]
+
+    print(f"{n} books, {len(probes)} random hits per run")
+    print(f"{'t':>5} {'height':>6} {'linear (us)':>12} {'bisect (us)':>12} {'speedup':>8}")
+    for t in [3, 32, 64, 128, 256]:
+        tree = BTree(t=t)
+        tree.bulk_load(books)
+        height, node = 1, tree.root
+        while not node.leaf:
+            node, height = node.children[0], height + 1
+
+        before = time_lookups(lambda title: linear_search(tree.root, title), probes)
+        after = time_lookups(tree.search, probes)
+        print(f"{t:>5} {height:>6} {before * 1e6:>12.2f} {after * 1e6:>12.2f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Throughput of ConcurrentBTree against a BTree behind one global lock
+
+Usage: python benchmarks/bench_concurrent_btree.py [n_books] [ops_per_thread]
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from models.Book import Book
+from models.Genre import Genre
+from models.btree import BTree
+from models.concurrentbtree import ConcurrentBTree
+
+
+class GlobalLockBTree:
+    """Baseline: every operation serialized on a single mutex"""
+
+    def __init__(self, t):
+        self._tree = BTree(t=t)
+        self._lock = threading.Lock()
+
+    def bulk_load(self, books):
+        with self._lock:
+            self._tree.bulk_load(books)
+
+    def search(self, title):
+        with self._lock:
+            return self._tree.search(title)
+
+    def insert(self, book):
+        with self._lock:
+            self._tree.insert(book)
+
+    def delete_by_id(self, book_ID):
+        with self._lock:
+            return self._tree.delete_by_id(book_ID)
+
+
+def run(tree, n, threads, ops, write_ratio):
+    """Run a mixed workload and return operations per second"""
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(tid):
+        rng = random.Random(tid)
+        next_id = n + tid * ops
+        barrier.wait()
+        for _ in range(ops):
+            if rng.random() < write_ratio:
+                if rng.random() < 0.5:
+                    tree.insert(Book(next_id, f"Title {rng.randrange(n):08d}", "Author", Genre.FICTION, 2000))
+                    next_id += 1
+                else:
+                    tree.delete_by_id(rng.randrange(n))
+            else:
+                tree.search(f"Title {rng.randrange(n):08d}")
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for w in workers:
+        w.join()
+    return threads * ops / (time.perf_counter() - start)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    ops = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    print(f"{'threads':>7} {'writes':>6} {'global lock':>12} {'latched':>12} {'ratio':>6}")
+    for write_ratio in (0.0, 0.1, 0.5):
+        for threads in (1, 4, 8):
+            results = []
+            for cls in (GlobalLockBTree, ConcurrentBTree):
+                tree = cls(t=16)
+                tree.bulk_load(Book(i, f"Title {i:08d}", "Author", Genre.FICTION, 2000) for i in range(n))
+                results.append(run(tree, n, threads, ops, write_ratio))
+            print(f"{threads:>7} {write_ratio:>6.0%} {results[0]:>10.0f}/s {results[1]:>10.0f}/s "
+                  f"{results[1] / results[0]:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+"Contains" search: scanning every title/author vs. the trigram index
+
+Usage: python benchmarks/bench_contains_search.py [n_books]
+"""
+
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from models.Book import Book, normalize_title
+from models.Genre import Genre
+from models.trigramindex import TrigramIndex
+
+WORDS = ["the", "war", "peace", "night", "dune", "star", "river", "stone", "house", "garden",
+         "city", "sea", "king", "queen", "dark", "light", "time", "love", "winter", "glass"]
+AUTHORS = ["Leo Tolstoy", "Jane Austen", "Frank Herbert", "Ursula K. Le Guin",
+           "Gabriel García Márquez", "Toni Morrison", "Haruki Murakami", "Chinua Achebe"]
+
+
+def scan(books, field, term):
+    """The previous search: normalize every book's field and test it"""
+    term = normalize_title(term)
+    text = (lambda book: book.title_key) if field == "title" else (lambda book: normalize_title(book.author))
+    return [book for book in books if term in text(book)]
+
+
+def best_of(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(7)
+    books = [Book(i, " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 5))) + f" {i}",
+                  rng.choice(AUTHORS), Genre.FICTION, 1900 + i % 120) for i in range(n)]
+    index = TrigramIndex()
+    build = best_of(lambda: index.add_many(books), repeat=1)
+    print(f"{n} books, index built in {build:.2f}s")
+    print(f"{'field':>7} {'term':>14} {'hits':>6} {'scan (ms)':>10} {'index (ms)':>11}")
+    for field, term in [("title", "night 4242"), ("title", "inter gla"), ("title", "river"),
+                        ("author", "morris"), ("author", "zzz"), ("title", "42")]:
+        hits = len(index.search(field, term))
+        scanned = best_of(lambda: scan(books, field, term))
+        indexed = best_of(lambda: index.search(field, term))
+        print(f"{field:>7} {term:>14} {hits:>6} {scanned * 1e3:>10.2f} {indexed * 1e3:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
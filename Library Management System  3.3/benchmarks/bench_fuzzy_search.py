@@ -0,0 +1,71 @@
+"""
+"Fuzzy" search: edit distance against every title/author word vs. the BK-tree index
+
+Usage: python benchmarks/bench_fuzzy_search.py [n_books]
+"""
+
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from models.Book import Book, normalize_title
+from models.Genre import Genre
+from models.bktree import FuzzyIndex, levenshtein
+
+WORDS = ["the", "war", "peace", "night", "dune", "star", "river", "stone", "house", "garden",
+         "city", "sea", "king", "queen", "dark", "light", "time", "love", "winter", "glass"]
+AUTHORS = ["Leo Tolstoy", "Jane Austen", "Frank Herbert", "Ursula K. Le Guin",
+           "Gabriel García Márquez", "Toni Morrison", "Haruki Murakami", "Chinua Achebe"]
+
+
+def scan(books, field, term):
+    """Compare every query word with every word of every book, capping the total as the index does"""
+    words = normalize_title(term).split()
+    text = (lambda book: book.title_key) if field == "title" else (lambda book: normalize_title(book.author))
+
+    def distance(book):
+        own, total = text(book).split(), 0
+        for word in words:
+            best = min(levenshtein(word, other) for other in own)
+            if best > FuzzyIndex.word_tolerance(word):
+                return None
+            total += best
+        return total
+
+    return [book for book in books
+            if (dist := distance(book)) is not None and dist <= FuzzyIndex.MAX_DISTANCE]
+
+
+def best_of(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    rng = random.Random(7)
+    books = [Book(i, " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 5))) + f" {i}",
+                  rng.choice(AUTHORS), Genre.FICTION, 1900 + i % 120) for i in range(n)]
+    index = FuzzyIndex()
+    index.add_many(books)
+    build = best_of(lambda: (index._tree_for("title"), index._tree_for("author")), repeat=1)
+    print(f"{n} books, trees built in {build:.2f}s")
+    print(f"{'field':>7} {'term':>16} {'hits':>6} {'scan (ms)':>10} {'index (ms)':>11}")
+    for field, term in [("title", "nihgt 4242"), ("title", "rivr stone"), ("title", "wintr"),
+                        ("author", "tolstoi"), ("author", "murakam"), ("title", "zzzzzz")]:
+        hits = len(index.search(field, term, limit=n))
+        scanned = best_of(lambda: scan(books, field, term), repeat=1)
+        indexed = best_of(lambda: index.search(field, term))
+        print(f"{field:>7} {term:>16} {hits:>6} {scanned * 1e3:>10.2f} {indexed * 1e3:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
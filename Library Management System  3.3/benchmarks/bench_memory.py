@@ -0,0 +1,46 @@
+"""
+Resident bytes per book for Book records and the BTree title index (tracemalloc)
+
+Usage: python benchmarks/bench_memory.py [n_books] [t]
+"""
+
+import os
+import sys
+import tracemalloc
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from models.Book import Book
+from models.Genre import Genre
+from models.btree import BTree
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    t = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    genres = list(Genre)
+    # Strings are built first so only the objects under test are measured
+    titles = [f"Title {i:08d}" for i in range(n)]
+    authors = [f"Author {i}" for i in range(1000)]
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    books = [Book(i, titles[i], authors[i % 1000], genres[i % 4], 1900 + i % 120) for i in range(n)]
+    records = tracemalloc.get_traced_memory()[0] - base
+
+    tree = BTree(t=t)
+    tree.bulk_load(books)
+    index = tracemalloc.get_traced_memory()[0] - base - records
+    tracemalloc.stop()
+
+    # The list holding the books is bookkeeping for this script, not part of either structure
+    records -= sys.getsizeof(books)
+    print(f"{n} books, t={t}")
+    print(f"  Book records: {records / n:7.1f} bytes/book")
+    print(f"  BTree index:  {index / n:7.1f} bytes/book")
+    print(f"  total:        {(records + index) / n:7.1f} bytes/book ({(records + index) / 2**20:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
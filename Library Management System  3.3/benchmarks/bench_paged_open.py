@@ -0,0 +1,52 @@
+"""
+Open time and lookup latency of a PagedBTree catalog file
+
+Usage: python benchmarks/bench_paged_open.py [n_books] [cache_pages]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from models.Book import Book
+from models.Genre import Genre
+from models.pagedbtree import PagedBTree
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    cache_pages = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+    genres = list(Genre)
+    path = os.path.join(tempfile.mkdtemp(), "catalog.db")
+
+    start = time.perf_counter()
+    books = (Book(i, f"Title {i:08d}", f"Author {i % 9973}", genres[i % 4], 1900 + i % 120)
+             for i in range(n))
+    with PagedBTree(path, t=32, page_size=8192) as tree:
+        tree.bulk_load(books)
+    print(f"bulk load {n} books: {time.perf_counter() - start:.2f} s, "
+          f"file {os.path.getsize(path) / 2**20:.1f} MiB")
+
+    start = time.perf_counter()
+    tree = PagedBTree(path, cache_pages=cache_pages)
+    print(f"open: {(time.perf_counter() - start) * 1e3:.3f} ms ({len(tree)} books)")
+
+    rng = random.Random(5)
+    probes = [f"Title {rng.randrange(n):08d}" for _ in range(10_000)]
+    for label in ("cold", "warm"):
+        start = time.perf_counter()
+        for title in probes:
+            tree.search(title)
+        elapsed = time.perf_counter() - start
+        print(f"{label} lookups: {elapsed / len(probes) * 1e6:.1f} us each, {tree.cache_info()}")
+    tree.close()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,17 +5,41 @@ from datetime import datetime
 import csv
 import chardet
 import logging
-from models.Book import Book
+import shlex
+from models.Book import Book, normalize_title
 from models.Genre import Genre
 from models.btree import BTree
+from models.bplustree import BPlusTree
+from models.pagedbtree import PagedBTree
+from models.trigramindex import TrigramIndex
+from models.bktree import FuzzyIndex, levenshtein
+from models.authorindex import AuthorIndex
+from models.searchcache import SearchCache
+from models.autocomplete import AutocompleteIndex
 from models.User import User
 from services.RecommendationService import RecommendationService
+from services.QueryEngine import QueryEngine
+
+AVAILABLE_LABELS = ("No", "Yes")  # Indexed by book.available
 
 class LibraryApp(tk.Tk):
     """Library Management System Main Window"""
     
-    def __init__(self):
+    PAGE_SIZE = 100  # Rows shown per inventory page
+    COMPACT_STEP = 256  # Tombstones compacted per idle callback
+    SEARCH_CACHE_SIZE = 128  # Distinct searches whose results are kept
+    CATALOG_FILE = "library_catalog.db"  # Page file used by the "paged" index type
+    
+    def __init__(self, index_type="btree", catalog_path=None):
+        if index_type not in ("btree", "bplustree", "paged"):
+            raise ValueError(f"Unknown index type: {index_type}")
         super().__init__()
+        # Title index: "btree", "bplustree", or "paged" (the B-tree in a page file,
+        # kept between runs). The page file opens in O(1) and serves paging and
+        # title searches itself; the other indexes are built from one scan of it
+        # the first time a search, action or recommendation needs them.
+        self.index_type = index_type
+        self.catalog_path = catalog_path or self.CATALOG_FILE
         self.title("Library Management System")
         self.geometry("1200x800")
         
@@ -49,10 +73,17 @@ class LibraryApp(tk.Tk):
 
     def _setup_infrastructure(self):
         """Initialize backend services"""
-        self.btree = BTree(t=3)
+        self.index_cls = {"bplustree": BPlusTree, "paged": PagedBTree}.get(self.index_type, BTree)
+        self._compaction_pending = False
         self.id_index = {}
+        self.text_index = TrigramIndex()  # "Contains" search over titles and authors
+        self.fuzzy_index = FuzzyIndex()  # "Fuzzy" (typo-tolerant) search over titles and authors
+        self.author_index = AuthorIndex()  # Exact and "Starts with" author search
+        self.search_cache = SearchCache(self.SEARCH_CACHE_SIZE)  # Invalidated by every catalog change
+        self.autocomplete = AutocompleteIndex()  # Type-ahead ranked by borrow counts
         self.current_user = None
-        self.rec_service = RecommendationService()
+        self.rec_service = RecommendationService(index_type="bplustree" if self.index_type == "bplustree" else "btree")
+        self.page_offset = 0
         
         # Configure logging
         logging.basicConfig(
@@ -61,6 +92,22 @@ class LibraryApp(tk.Tk):
             format='%(asctime)s - %(levelname)s - %(message)s'
         )
         self.logger = logging.getLogger('LibraryApp')
+        
+        # Reopen the saved catalog instead of asking for the CSV again. The store is
+        # the title index, so nothing is read until a page or search asks for it.
+        self.store = None
+        if self.index_type == "paged":
+            self.store = PagedBTree(self.catalog_path)
+            self.logger.info(f"Opened {len(self.store)} books from {self.catalog_path}")
+        self.btree = self._new_index()
+        self._indexes_built = self.store is None or not len(self.store)  # Empty indexes match
+
+    def destroy(self):
+        """Close the window, writing the catalog file back first"""
+        if getattr(self, "store", None) is not None:
+            self.store.close()
+            self.store = None
+        super().destroy()
 
     def _create_menu_bar(self):
         """Create the menu bar with File and User menus"""
@@ -71,7 +118,7 @@ class LibraryApp(tk.Tk):
         file_menu.add_command(label="Load CSV", command=self.load_csv, accelerator="Ctrl+O")
         file_menu.add_command(label="Export CSV", command=self.export_to_csv, accelerator="Ctrl+S")
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.quit, accelerator="Alt+F4")
+        file_menu.add_command(label="Exit", command=self.destroy, accelerator="Alt+F4")
         
         # Bind keyboard shortcuts
         self.bind('<Control-o>', lambda e: self.load_csv())
@@ -89,13 +136,15 @@ class LibraryApp(tk.Tk):
         
         # Special handling for macOS
         if self.tk.call('tk', 'windowingsystem') == 'aqua':
-            self.createcommand('tk::mac::Quit', self.quit)
+            self.createcommand('tk::mac::Quit', self.destroy)
 
     def _initialize_ui(self):
         """Initialize the UI components"""
         self.grid_rowconfigure(1, weight=1)
         self.grid_columnconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=1)
+        self.page_info = tk.StringVar(self, value="")
+        self.available_only = tk.BooleanVar(self, value=False)
 
     def _show_login_screen(self):
         """Show the login screen"""
@@ -199,19 +248,23 @@ class LibraryApp(tk.Tk):
         
         # Search controls
         ttk.Label(parent, text="Search By:").grid(row=4, column=0, sticky="e", padx=5)
-        self.search_by = ttk.Combobox(parent, values=["Title", "Author", "Genre", "ID"])
+        self.search_by = ttk.Combobox(parent, values=["Title", "Author", "Genre", "ID", "Year", "Query"])
         self.search_by.grid(row=5, column=0, padx=5, sticky="ew")
         self.search_by.current(0)
         
-        self.search_entry = ttk.Entry(parent)
+        # Type-ahead: the drop-down list holds the most borrowed completions of what is typed
+        self.search_entry = ttk.Combobox(parent)
         self.search_entry.grid(row=5, column=1, padx=5, sticky="ew")
+        self.search_entry.bind("<KeyRelease>", self._suggest)
         
         ttk.Label(parent, text="Match Type:").grid(row=6, column=0, sticky="e", padx=5)
-        self.match_type = ttk.Combobox(parent, values=["Exact", "Starts with", "Contains"])
+        self.match_type = ttk.Combobox(parent, values=["Exact", "Starts with", "Contains", "Fuzzy"])
         self.match_type.grid(row=6, column=1, padx=5, sticky="ew")
         self.match_type.current(0)
         
-        ttk.Button(parent, text="Search", command=self.search_books).grid(row=7, column=0, columnspan=2, pady=10)
+        ttk.Checkbutton(parent, text="Available only", variable=self.available_only).grid(row=7, column=1, sticky="w", padx=5)
+        
+        ttk.Button(parent, text="Search", command=self.search_books).grid(row=8, column=0, columnspan=2, pady=10)
 
     def _create_book_list(self, parent):
         """Create the book list treeview"""
@@ -231,6 +284,13 @@ class LibraryApp(tk.Tk):
             self.tree.heading(col, text=col)
             self.tree.column(col, **config)
         
+        # Paging controls (the inventory is shown one window at a time)
+        nav = ttk.Frame(parent)
+        nav.pack(side="bottom", fill="x")
+        ttk.Button(nav, text="◀ Prev", command=lambda: self._change_page(-1)).pack(side="left")
+        ttk.Button(nav, text="Next ▶", command=lambda: self._change_page(1)).pack(side="right")
+        ttk.Label(nav, textvariable=self.page_info).pack(side="top")
+        
         scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self.tree.yview)
         self.tree.configure(yscrollcommand=scrollbar.set)
         scrollbar.pack(side="right", fill="y")
@@ -238,24 +298,51 @@ class LibraryApp(tk.Tk):
 
     def _refresh_display(self):
         """Refresh all displays"""
+        self._show_inventory_page()
+        self._update_recommendations()
+        self.error_label.config(text="")
+
+    def _show_inventory_page(self):
+        """Show the current inventory window using the tree's order statistics"""
+        total = len(self.btree)
+        if self.page_offset >= total:
+            self.page_offset = max(0, (total - 1) // self.PAGE_SIZE * self.PAGE_SIZE)
+        
         self.tree.delete(*self.tree.get_children())
-        for book in self.btree.traverse():
+        for book in self.btree.page(self.page_offset, self.PAGE_SIZE):
             self.tree.insert("", "end", values=(
                 book.book_ID,
                 book.title,
                 book.author,
                 book.genre.value,
                 book.publication_year,
-                "Yes" if book.available else "No"
+                AVAILABLE_LABELS[book.available]
             ))
         
-        self._update_recommendations()
-        self.error_label.config(text="")
+        if total:
+            last = min(self.page_offset + self.PAGE_SIZE, total)
+            text = f"Books {self.page_offset + 1}–{last} of {total}"
+            if self._indexes_built:  # The count comes from the availability bitmap
+                text += f" · {self.rec_service.available_count()} available"
+            self.page_info.set(text)
+        else:
+            self.page_info.set("No books")
+
+    def _change_page(self, step):
+        """Move the inventory window by step pages"""
+        offset = self.page_offset + step * self.PAGE_SIZE
+        if 0 <= offset < len(self.btree):
+            self.page_offset = offset
+            self._show_inventory_page()
 
     def _update_recommendations(self):
         """Update recommendation list"""
         self.recommend_list.delete(0, tk.END)
         if self.current_user:
+            if not self._indexes_built:
+                # Draw the inventory page first; the scan the recommendations need runs once idle
+                self.after_idle(self._load_recommendations)
+                return
             try:
                 recommended = self.rec_service.recommend_books(self.current_user.user_id)
                 for book in recommended:
@@ -267,6 +354,11 @@ class LibraryApp(tk.Tk):
                 self.logger.error(f"Recommendation failed: {str(e)}")
                 self.recommend_list.insert(tk.END, "Unable to load recommendations")
 
+    def _load_recommendations(self):
+        """Build the indexes the recommendations read, then show them"""
+        self._ensure_indexes()
+        self._update_recommendations()
+
     def add_book(self):
         """Add a new book"""
         try:
@@ -331,6 +423,7 @@ class LibraryApp(tk.Tk):
                 errors.append(f"Invalid {name} format")
                 self._highlight_error(widget)
         
+        self._ensure_indexes()
         if 'id' in collected and collected['id'] in self.id_index:
             errors.append("Book ID already exists")
             self._highlight_error(self.id_entry)
@@ -351,11 +444,56 @@ class LibraryApp(tk.Tk):
 
     def _add_book_to_system(self, book: Book):
         """Add book to all index structures"""
+        self._ensure_indexes()
         self.btree.insert(book)
         self.id_index[book.book_ID] = book
+        self.text_index.add(book)
+        self.fuzzy_index.add(book)
+        self.author_index.add(book)
+        self.autocomplete.add(book)
         self.rec_service.add_book(book)
+        if self.store is not None:
+            self.store.flush()
+        self.search_cache.invalidate()
         self.logger.info(f"Added book: {book.title} (ID: {book.book_ID})")
 
+    def _load_books(self, books):
+        """Replace the catalog with books, building every index in one pass each"""
+        self.btree = self._new_index()
+        # Build both title indexes bottom-up instead of row-by-row inserts
+        self.btree.bulk_load(books)
+        self.search_cache.invalidate()
+        self.page_offset = 0
+        self._build_indexes(books)
+
+    def _ensure_indexes(self):
+        """Build the indexes other than the title index from the page file on first use"""
+        if not self._indexes_built:
+            self._build_indexes(list(self.store))
+
+    def _build_indexes(self, books):
+        """Rebuild the ID, text, author, autocomplete and recommendation indexes from books"""
+        self.id_index = {book.book_ID: book for book in books}
+        self.text_index.clear()
+        self.fuzzy_index.clear()
+        self.author_index.clear()
+        self.autocomplete.clear()
+        self.rec_service.reset_books()
+        self.text_index.add_many(books)
+        self.fuzzy_index.add_many(books)
+        self.author_index.add_many(books)
+        self.autocomplete.add_many(books)
+        self.rec_service.load_books(books)
+        self._indexes_built = True
+
+    def _save_books(self, book_ids):
+        """Write the availability and borrow counts of these books to the catalog file and flush it"""
+        if self.store is not None:
+            for book_id in book_ids:
+                book = self.id_index[book_id]
+                self.store.update_by_id(book_id, book.available, book.borrow_count)
+            self.store.flush()
+
     def load_csv(self):
         """Load books from CSV file"""
         filepath = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
@@ -363,24 +501,19 @@ class LibraryApp(tk.Tk):
             return
 
         try:
-            # Reset data
-            self.btree = BTree(t=3)
-            self.id_index = {}
-            self.rec_service.reset_books()
-        
             with open(filepath, 'rb') as f:
                 encoding = chardet.detect(f.read())['encoding'] or 'utf-8'
             
+            books = []
             with open(filepath, 'r', encoding=encoding, errors='replace') as file:
                 reader = csv.DictReader(file)
                 for row in reader:
                     try:
-                        book = self._create_book_from_csv(row)
-                        self.btree.insert(book)
-                        self.id_index[book.book_ID] = book
-                        self.rec_service.add_book(book)
+                        books.append(self._create_book_from_csv(row))
                     except Exception as e:
                         print(f"[WARNING] Skipping invalid row: {str(e)}")
+            
+            self._load_books(books)  # A paged store is written level by level, then flushed
                     
             self._refresh_display()
             messagebox.showinfo("Import Complete", "CSV imported successfully")
@@ -419,12 +552,18 @@ class LibraryApp(tk.Tk):
             return
         
         try:
+            exported = 0
             with open(filepath, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
                 writer.writerow(["book_ID", "title", "author", 
                                "genre", "publication_year", "available"])
                 
-                for book in self.btree.traverse():
+                # Walk a snapshot so concurrent borrow/return/delete cannot tear the scan
+                # (O(1) for the B-tree; the B+ tree copies the whole catalog). The page
+                # file is read in place: only this thread writes it, and it flushes each change.
+                books = self.btree if self.store is not None else self.btree.snapshot()
+                for book in books:
+                    exported += 1
                     writer.writerow([
                         book.book_ID,
                         book.title,
@@ -435,26 +574,54 @@ class LibraryApp(tk.Tk):
                     ])
             
             messagebox.showinfo("Export Complete", 
-                              f"Successfully exported {len(list(self.btree.traverse()))} books")
+                              f"Successfully exported {exported} books")
         except Exception as e:
             self._show_error(f"Export failed: {str(e)}")
 
     def search_books(self):
-        """Search for books"""
+        """Search for books, reusing cached results while the catalog is unchanged"""
         search_by = self.search_by.get().lower()
         search_term = self.search_entry.get().strip()
-        match_type = self.match_type.get()
+        match_type = self.match_type.get().lower()
+        available_only = self.available_only.get()
 
         if not search_term:
-            self._refresh_display()
+            if available_only:
+                # Straight off the availability bitmap, no scan of the catalog
+                self._ensure_indexes()
+                books = self.rec_service.available_books(title_order=True)
+                self.page_info.set(f"{len(books)} found")
+                self.update_display(books or None)
+            else:
+                self._refresh_display()
             return
 
+        key = (search_by, normalize_title(search_term), match_type, available_only)
+        found = self.search_cache.get(key)
+        if found is None:
+            try:
+                found = self._run_search(search_by, search_term, match_type, available_only)
+            except ValueError as e:
+                self._show_error(str(e))
+                return
+            self.search_cache.put(key, found)
+        results, info = found
+        self.page_info.set(info or f"{len(results)} found")  # Replaces the inventory paging text
+        self.update_display(results or None)
+
+    def _run_search(self, search_by, search_term, match_type, available_only):
+        """(results, status text) for one search; raises ValueError for malformed input"""
         results = []
+        info = ""
+        term = normalize_title(search_term)  # Matched against the genre names
         match_func = {
-            "exact": lambda x, y: x.lower() == y.lower(),
-            "starts with": lambda x, y: x.lower().startswith(y.lower()),
-            "contains": lambda x, y: y.lower() in x.lower()
-        }.get(match_type.lower(), lambda x, y: y.lower() in x.lower())
+            "exact": lambda x: x == term,
+            "starts with": lambda x: x.startswith(term),
+            "contains": lambda x: term in x,
+            "fuzzy": lambda x: levenshtein(x, term) <= FuzzyIndex.MAX_DISTANCE
+        }.get(match_type, lambda x: term in x)
+        if available_only or search_by != "title" or match_type not in ("exact", "starts with"):
+            self._ensure_indexes()  # Only title probes without the bitmap run on the title index alone
 
         # ID search special case
         if search_by == "id":
@@ -464,42 +631,163 @@ class LibraryApp(tk.Tk):
                     results.append(self.id_index[book_id])
             except ValueError:
                 pass
-        else:
-            # Other search types
-            for book in self.btree.traverse():
-                try:
-                    field_value = {
-                        "title": book.title,
-                        "author": book.author,
-                        "genre": book.genre.value
-                    }.get(search_by, "")
-                    
-                    if field_value and match_func(field_value, search_term):
-                        results.append(book)
-                except Exception:
-                    continue
+        elif search_by == "title" and match_type == "exact":
+            # Index probe on the case-folded title key (O(log n))
+            results = self.btree.find_all(search_term)
+        elif search_by == "title" and match_type == "starts with":
+            results = list(self.btree.prefix(search_term))
+        elif search_by == "author" and match_type == "exact":
+            # All books by the author, oldest first
+            results = self.author_index.by_year(search_term)
+        elif search_by == "author" and match_type == "starts with":
+            results = self.author_index.prefix(search_term)
+        elif search_by in ("title", "author") and match_type == "fuzzy":
+            # BK-tree over title/author words: nearest matches first, tolerating typos
+            results = self.fuzzy_index.search(search_by, search_term)
+        elif search_by in ("title", "author") and match_type not in ("exact", "starts with"):
+            # Trigram posting lists narrow "contains" down to a few candidates
+            results = self.text_index.search(search_by, search_term)
+        elif search_by == "year":
+            try:
+                lo, hi = self._parse_year_range(search_term)
+            except ValueError:
+                raise ValueError("Enter a year or a range such as 1900-1950")
+            # Read from the year index in year order; the count comes from the per-year totals
+            results = list(self.rec_service.books_published_between(lo, hi))
+            info = (f"{self.rec_service.count_published_between(lo, hi)} books published "
+                    f"{'' if lo is None else lo}–{'' if hi is None else hi}")
+        elif search_by == "query":
+            # e.g. genre:science author:"carl sagan" year:1970- available:yes
+            filters = self._parse_query(search_term, match_type)
+            if available_only:
+                filters["available"] = True
+            engine = self._query_engine()
+            results = engine.find(**filters)
+            plan = engine.last_plan
+            info = (f"Plan: {plan['driver']} (~{plan['estimated_rows']} rows), "
+                    f"verify {', '.join(plan['verify']) or 'nothing'} · {plan['rows']} found")
+            self.logger.info(f"Query {filters} ran with plan {plan}")
+        elif search_by == "genre":
+            # Match the handful of genre names, then OR their bitmaps
+            genres = [genre for genre in Genre if match_func(normalize_title(genre.value))]
+            results = self.rec_service.books_in_genres(genres, available_only)
 
-        self.update_display(results or None)
+        if available_only and search_by not in ("genre", "query"):  # Those already AND the bitmap
+            results = self.rec_service.filter_available(results)
+        return tuple(results), info
+
+    def _suggest(self, event=None):
+        """Offer the most borrowed titles or authors starting with the text typed so far"""
+        field = self.search_by.get().lower()
+        prefix = self.search_entry.get().strip()
+        if field in ("title", "author") and prefix:
+            self._ensure_indexes()
+            self.search_entry["values"] = self.autocomplete.suggest(field, prefix)
+        else:
+            self.search_entry["values"] = ()
 
     def update_display(self, books=None):
         """Update book list display"""
-        self.tree.delete(*self.tree.get_children())
+        if books is None:
+            self._show_inventory_page()
+            return
         
-        display_books = books if books is not None else self.btree.traverse()
-        for book in display_books:
+        self.tree.delete(*self.tree.get_children())
+        for book in books:
             self.tree.insert("", "end", values=(
                 book.book_ID,
                 book.title,
                 book.author,
                 book.genre.value,
                 book.publication_year,
-                "Yes" if book.available else "No"
+                AVAILABLE_LABELS[book.available]
             ))
 
+    def _query_engine(self):
+        """A query engine over the current indexes (load_csv replaces them, so build one per query)"""
+        self._ensure_indexes()
+        return QueryEngine(self.id_index, self.btree, self.author_index, self.rec_service.bitmaps,
+                           self.rec_service.year_index, self.text_index, self.fuzzy_index)
+
+    @classmethod
+    def _parse_query(cls, text, match_type="exact"):
+        """Keyword filters for QueryEngine.find from "key:value" terms (quote values with spaces)
+
+        Keys are id, title, author, genre (comma-separated), year (as in Year search)
+        and available (yes/no). Words without a key are matched against the title.
+        The Match Type applies to title and author.
+        """
+        text_match = {"starts with": "prefix", "contains": "contains", "fuzzy": "fuzzy"}.get(match_type, "exact")
+        filters, loose = {}, []
+        try:
+            terms = shlex.split(text)
+        except ValueError:
+            raise ValueError("Unbalanced quotes in query")
+        for term in terms:
+            key, sep, value = term.partition(":")
+            if not sep:
+                loose.append(term)
+                continue
+            key = key.lower()
+            if key == "id":
+                filters["book_id"] = int(value)
+            elif key in ("title", "author"):
+                filters[key] = value
+                filters[f"{key}_match"] = text_match
+            elif key == "genre":
+                try:
+                    filters["genre"] = [Genre[name.strip().upper()] for name in value.split(",") if name.strip()]
+                except KeyError as e:
+                    raise ValueError(f"Unknown genre: {e.args[0]}")
+            elif key == "year":
+                filters["year"] = cls._parse_year_range(value)
+            elif key == "available":
+                filters["available"] = value.lower() in ("yes", "y", "true", "1")
+            else:
+                raise ValueError(f"Unknown query key: {key}")
+        if loose and "title" not in filters:
+            filters["title"] = " ".join(loose)
+            filters["title_match"] = text_match
+        return filters
+
+    @staticmethod
+    def _parse_year_range(text):
+        """(lo, hi) from "1950", "1900-1950", "1900-" or "-1950"; an open end is None"""
+        for separator in ("..", "–", "-"):
+            if separator in text:
+                lo, _, hi = text.partition(separator)
+                break
+        else:
+            lo = hi = text
+        lo, hi = lo.strip(), hi.strip()
+        if not (lo or hi):
+            raise ValueError("No year given")
+        return (int(lo) if lo else None, int(hi) if hi else None)
+
+    def _parse_book_ids(self):
+        """Book IDs typed into the action entry; several may be separated by commas or spaces"""
+        book_ids = [int(part) for part in self.action_id_entry.get().replace(",", " ").split()]
+        if not book_ids:
+            raise ValueError("No Book ID given")
+        return book_ids
+
+    def _report_batch(self, action, done, book_ids):
+        """Summarize a batch action, listing the IDs that were skipped"""
+        skipped = [book_id for book_id in book_ids if book_id not in done]
+        message = f"Successfully {action} {len(done)} books"
+        if skipped:
+            message += f"\nSkipped IDs: {', '.join(map(str, skipped))}"
+        messagebox.showinfo("Success", message)
+
     def borrow_book(self):
-        """Borrow a book"""
+        """Borrow a book (or several, given a list of IDs)"""
+        self._ensure_indexes()
         try:
-            book_id = int(self.action_id_entry.get())
+            book_ids = self._parse_book_ids()
+            if len(book_ids) > 1:
+                self.borrow_books(book_ids)
+                return
+            book_id = book_ids[0]
             
             if book_id not in self.id_index:
                 self._show_error(f"Book ID {book_id} not found")
@@ -512,17 +800,47 @@ class LibraryApp(tk.Tk):
         
             if self.current_user:
                 self.rec_service.record_borrow(self.current_user.user_id, book_id)
+            else:
+                self.rec_service.update_availability([book_id], False)
         
             book.available = False
+            book.borrow_count += 1
+            self.autocomplete.update(book)
+            self._save_books([book_id])
+            self.search_cache.invalidate()
             self._refresh_display()
             messagebox.showinfo("Success", f"Successfully borrowed: {book.title}")
         except ValueError:
             self._show_error("Please enter a valid Book ID")
 
+    def borrow_books(self, book_ids):
+        """Borrow every available book in book_ids with a single display refresh"""
+        self._ensure_indexes()
+        done = [book_id for book_id in dict.fromkeys(book_ids)
+                if book_id in self.id_index and self.id_index[book_id].available]
+        if self.current_user:
+            self.rec_service.record_borrows(self.current_user.user_id, done)
+        else:
+            self.rec_service.update_availability(done, False)
+        for book_id in done:
+            book = self.id_index[book_id]
+            book.available = False
+            book.borrow_count += 1
+            self.autocomplete.update(book)
+        self._save_books(done)
+        self.search_cache.invalidate()
+        self._refresh_display()
+        self._report_batch("borrowed", done, book_ids)
+
     def return_book(self):
-        """Return a book"""
+        """Return a book (or several, given a list of IDs)"""
+        self._ensure_indexes()
         try:
-            book_id = int(self.action_id_entry.get())
+            book_ids = self._parse_book_ids()
+            if len(book_ids) > 1:
+                self.return_books(book_ids)
+                return
+            book_id = book_ids[0]
             
             if book_id not in self.id_index:
                 self._show_error(f"Book ID {book_id} not found")
@@ -535,17 +853,42 @@ class LibraryApp(tk.Tk):
             
             if self.current_user:
                 self.rec_service.record_return(self.current_user.user_id, book_id)
+            else:
+                self.rec_service.update_availability([book_id], True)
             
             book.available = True
+            self._save_books([book_id])
+            self.search_cache.invalidate()
             self._refresh_display()
             messagebox.showinfo("Success", f"Successfully returned: {book.title}")
         except ValueError:
             self._show_error("Please enter a valid Book ID")
 
+    def return_books(self, book_ids):
+        """Return every borrowed book in book_ids with a single display refresh"""
+        self._ensure_indexes()
+        done = [book_id for book_id in dict.fromkeys(book_ids)
+                if book_id in self.id_index and not self.id_index[book_id].available]
+        if self.current_user:
+            self.rec_service.record_returns(self.current_user.user_id, done)
+        else:
+            self.rec_service.update_availability(done, True)
+        for book_id in done:
+            self.id_index[book_id].available = True
+        self._save_books(done)
+        self.search_cache.invalidate()
+        self._refresh_display()
+        self._report_batch("returned", done, book_ids)
+
     def delete_book(self):
-        """Delete a book"""
+        """Delete a book (or several, given a list of IDs)"""
+        self._ensure_indexes()
         try:
-            book_id = int(self.action_id_entry.get())
+            book_ids = self._parse_book_ids()
+            if len(book_ids) > 1:
+                self.delete_books(book_ids)
+                return
+            book_id = book_ids[0]
             
             if book_id not in self.id_index:
                 self._show_error(f"Book ID {book_id} not found")
@@ -557,15 +900,71 @@ class LibraryApp(tk.Tk):
                                      f"Are you sure you want to delete '{book.title}' (ID: {book_id})? This cannot be undone!"):
                 return
                 
-            self.btree.delete(book.title)
+            self.btree.delete_by_id(book_id)
             del self.id_index[book_id]
+            self.text_index.remove(book_id)
+            self.fuzzy_index.remove(book_id)
+            self.author_index.remove(book_id)
+            self.autocomplete.remove(book_id)
             self.rec_service.remove_book(book_id)
+            if self.store is not None:
+                self.store.flush()
+            self.search_cache.invalidate()
+            self._schedule_compaction()
             
             self._refresh_display()
             messagebox.showinfo("Success", f"Deleted book: {book.title}")
         except ValueError:
             self._show_error("Please enter a valid Book ID")
 
+    def delete_books(self, book_ids):
+        """Delete every known book in book_ids after one confirmation"""
+        self._ensure_indexes()
+        done = [book_id for book_id in dict.fromkeys(book_ids) if book_id in self.id_index]
+        if not done:
+            self._show_error("None of the given Book IDs were found")
+            return
+        if not messagebox.askyesno("Confirm Deletion",
+                                   f"Are you sure you want to delete {len(done)} books? This cannot be undone!"):
+            return
+        
+        self.btree.delete_many_by_id(done)
+        for book_id in done:
+            del self.id_index[book_id]
+            self.text_index.remove(book_id)
+            self.fuzzy_index.remove(book_id)
+            self.author_index.remove(book_id)
+            self.autocomplete.remove(book_id)
+        self.rec_service.remove_books(done)
+        if self.store is not None:
+            self.store.flush()
+        self.search_cache.invalidate()
+        self._schedule_compaction()
+        
+        self._refresh_display()
+        self._report_batch("deleted", done, book_ids)
+
+    def _new_index(self):
+        """Create an empty title index; the B-tree deletes lazily, compacts when idle and
+        filters out lookups for absent titles, and the paged index is the page file itself"""
+        if self.index_cls is PagedBTree:
+            return self.store
+        if self.index_cls is BTree:
+            return self.index_cls(t=3, lazy_delete=True, bloom_filter=True)
+        return self.index_cls(t=3)
+
+    def _schedule_compaction(self):
+        """Queue an idle-time compaction step if deletes left tombstones behind"""
+        if self.index_cls is BTree and self.btree.tombstones and not self._compaction_pending:
+            self._compaction_pending = True
+            self.after_idle(self._compact_index)
+
+    def _compact_index(self):
+        """Compact one bounded step of tombstones, then yield back to the event loop"""
+        self._compaction_pending = False
+        self.btree.compact(self.COMPACT_STEP)
+        self._schedule_compaction()
+
     def show_user_stats(self):
         """Show user statistics"""
         if not self.current_user:
@@ -575,7 +974,9 @@ class LibraryApp(tk.Tk):
         stats = [
             f"👤 User ID: {self.current_user.user_id}",
             f"📚 Total Borrowed: {len(self.current_user.borrow_history)}",
-            f"❤️ Favorite Genre: {max(self.current_user.preferences.items(), key=lambda x: x[1])[0] if self.current_user.preferences else 'None'}"
+            f"❤️ Favorite Genre: {max(self.current_user.preferences.items(), key=lambda x: x[1])[0] if self.current_user.preferences else 'None'}",
+            f"🔎 Search Cache Hit Rate: {self.search_cache.hit_rate:.0%} "
+            f"({self.search_cache.hits} of {self.search_cache.hits + self.search_cache.misses} searches)"
         ]
         
         messagebox.showinfo("User Statistics", "\n".join(stats))
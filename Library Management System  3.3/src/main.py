@@ -44,7 +44,10 @@ def main():
         from gui.libraryapp import LibraryApp
         logger.info("Successfully imported LibraryApp")
         
-        app = LibraryApp()
+        # Title index implementation: "btree" (default), "bplustree" or "paged"; "paged"
+        # keeps the catalog in LIBRARY_CATALOG (default library_catalog.db) between runs
+        app = LibraryApp(index_type=os.environ.get("LIBRARY_INDEX", "btree"),
+                         catalog_path=os.environ.get("LIBRARY_CATALOG"))
         logger.info("LibraryApp Instance created successfully")
         
         # Ensure that the login interface is displayed
@@ -1,4 +1,13 @@
+import unicodedata
+
+def normalize_title(text):
+    """Collation key for titles: NFKC-normalized and case-folded"""
+    return unicodedata.normalize("NFKC", unicodedata.normalize("NFKC", text).casefold())
+
 class Book:
+    __slots__ = ("book_ID", "_title", "title_key", "author", "genre", "publication_year",
+                 "available", "borrow_count")
+
     def __init__(self, book_ID, title, author, genre, publication_year, available=True):
         self.book_ID = book_ID
         self.title = title
@@ -7,6 +16,17 @@ class Book:
         self.publication_year = publication_year
         self.available = available     
         self.borrow_count = 0
+
+    @property
+    def title(self):
+        return self._title
+
+    @title.setter
+    def title(self, value):
+        self._title = value
+        key = normalize_title(value)
+        self.title_key = value if key == value else key  # Reuse the title when already normalized
+
     def __repr__(self):
         return f"Book(ID={self.book_ID}, Title='{self.title}', Available={self.available})"
 
@@ -14,4 +34,4 @@ class Book:
         return self.book_ID == other.book_ID
 
     def __lt__(self, other):
-        return self.title < other.title
+        return (self.title_key, self.book_ID) < (other.title_key, other.book_ID)
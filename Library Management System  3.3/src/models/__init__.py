@@ -1,7 +1,21 @@
 from .Book import Book
 from .User import User
 from .Genre import Genre
-from .btree import BTree
+from .btree import BTree, BTreeSnapshot, Descending
 from .btreenode import BTreeNode
+from .bplustree import BPlusTree
+from .bplustreenode import BPlusTreeNode
+from .pagedbtree import PagedBTree
+from .concurrentbtree import ConcurrentBTree
+from .bloomfilter import CountingBloomFilter
+from .trigramindex import TrigramIndex
+from .bitmap import Bitmap, BitmapIndex
+from .bktree import BKTree, FuzzyIndex
+from .authorindex import AuthorIndex
+from .searchcache import SearchCache
+from .autocomplete import PrefixTrie, AutocompleteIndex
 
-__all__ = ['Book', 'User', 'Genre', 'BTree', 'BTreeNode']
+__all__ = ['Book', 'User', 'Genre', 'BTree', 'BTreeSnapshot', 'Descending', 'BTreeNode',
+           'BPlusTree', 'BPlusTreeNode', 'PagedBTree', 'ConcurrentBTree', 'CountingBloomFilter',
+           'TrigramIndex', 'Bitmap', 'BitmapIndex', 'BKTree', 'FuzzyIndex',
+           'AuthorIndex', 'SearchCache', 'PrefixTrie', 'AutocompleteIndex']
@@ -0,0 +1,95 @@
+from operator import attrgetter
+
+from models.Book import normalize_title
+from models.btree import BTree
+
+class AuthorIndex:
+    """Books by normalized author name, on a BTree keyed by (author, book_ID)
+
+    Exact, starts-with and by-year lookups are all range scans of the one
+    tree, and counts come from its order statistics, so every update and
+    count is O(log n). Each book's normalized author is worked out once on
+    add and kept by ID, so the tree's key function is a dict probe.
+    """
+
+    def __init__(self, t=16):
+        self._names = {}  # book_ID -> normalized author, as indexed
+        self._tree = BTree(t=t, key=self._author_key, normalize=normalize_title)
+
+    def _author_key(self, book):
+        return self._names[book.book_ID]
+
+    def __len__(self):
+        return len(self._tree)
+
+    def __contains__(self, book_ID):
+        return book_ID in self._names
+
+    def clear(self):
+        self._tree = BTree(t=self._tree.t, key=self._author_key, normalize=normalize_title)
+        self._names.clear()
+
+    def add(self, book):
+        """Index one book (replacing an earlier entry with the same ID)"""
+        self.remove(book.book_ID)
+        self._names[book.book_ID] = normalize_title(book.author)
+        self._tree.insert(book)
+
+    def add_many(self, books):
+        """Index a batch of books in one pass over the tree"""
+        books = {book.book_ID: book for book in books}  # The last copy of an ID wins, as with add
+        for book_ID in books:
+            self.remove(book_ID)
+        for book_ID, book in books.items():
+            self._names[book_ID] = normalize_title(book.author)
+        if len(self._tree):
+            self._tree.insert_many(books.values())
+        else:
+            self._tree.bulk_load(books.values())
+
+    def remove(self, book_ID):
+        """Drop a book from the index; returns True if it was indexed"""
+        if book_ID not in self._names:
+            return False
+        self._tree.delete_by_id(book_ID)
+        del self._names[book_ID]
+        return True
+
+    def ids(self, author):
+        """Sorted IDs of the books by exactly this author (case-insensitive)"""
+        return [book.book_ID for book in self._tree.find_all(author)]
+
+    def count(self, author):
+        """Number of books by exactly this author (O(log n))"""
+        author = normalize_title(author)
+        # Only author itself sorts in [author, author + "\0")
+        return self._tree.rank(author + "\0") - self._tree.rank(author)
+
+    def count_prefix(self, prefix):
+        """Number of books whose author starts with prefix (O(log n))"""
+        prefix = normalize_title(prefix)
+        return self._tree.rank(prefix + "\U0010ffff") - self._tree.rank(prefix)
+
+    def find(self, author):
+        """Books by exactly this author, ordered by book_ID"""
+        return self._tree.find_all(author)
+
+    def by_year(self, author):
+        """Books by exactly this author, ordered by publication year (then book_ID)"""
+        books = self._tree.find_all(author)
+        books.sort(key=attrgetter("publication_year"))  # Stable: IDs stay ordered within a year
+        return books
+
+    def authors(self, prefix=""):
+        """Distinct normalized author names starting with prefix, in order"""
+        names = self._names
+        found = []
+        for book in self._tree.prefix(prefix):
+            author = names[book.book_ID]
+            if not found or found[-1] != author:
+                found.append(author)
+        return found
+
+    def prefix(self, prefix):
+        """Books whose author starts with prefix, by author and then book_ID"""
+        return list(self._tree.prefix(prefix))
@@ -0,0 +1,274 @@
+from bisect import insort
+from heapq import nsmallest
+from operator import attrgetter
+
+from models.Book import normalize_title
+
+class _RadixNode:
+    __slots__ = ("edges", "term", "top")
+
+    def __init__(self):
+        self.edges = {}  # First character of an edge label -> [label, child]
+        self.term = None  # The term ending at this node, if any
+        self.top = []  # Best (-weight, term) entries of this subtree, at most k, best first
+
+class PrefixTrie:
+    """Radix tree of weighted terms that keeps the top-k completions at every node
+
+    Edges carry whole substrings, so the tree has at most two nodes per
+    term. Each node lists the k heaviest terms below it (ties in term
+    order), so completing a prefix is a walk down the prefix plus a slice.
+    Raising a weight only offers the term to the nodes on its path; lowering
+    one or removing a term rebuilds those nodes' lists bottom-up from their
+    children's lists.
+    """
+
+    def __init__(self, k=8):
+        self.k = k
+        self._root = _RadixNode()
+        self._weights = {}  # term -> weight
+        self._counts = {}  # term -> number of add() calls not yet removed
+        self._display = {}  # term -> text shown for it (the first one added)
+
+    def __len__(self):
+        return len(self._weights)
+
+    def __contains__(self, term):
+        return term in self._weights
+
+    def clear(self):
+        self._root = _RadixNode()
+        self._weights.clear()
+        self._counts.clear()
+        self._display.clear()
+
+    def weight(self, term):
+        return self._weights.get(term, 0)
+
+    def add(self, term, display=None, weight=0):
+        """Add one occurrence of term, adding weight to it"""
+        if term in self._weights:
+            self._counts[term] += 1
+            self.adjust(term, weight)
+            return
+        self._weights[term] = weight
+        self._counts[term] = 1
+        self._display[term] = term if display is None else display
+        path = self._insert_path(term)
+        path[-1].term = term
+        self._offer(path, (-weight, term))
+
+    def remove(self, term, weight=0):
+        """Remove one occurrence of term and the weight it brought; returns True if it was there"""
+        if term not in self._weights:
+            return False
+        self._counts[term] -= 1
+        if self._counts[term]:
+            self.adjust(term, -weight)
+            return True
+        del self._weights[term], self._counts[term], self._display[term]
+        path = self._find_path(term)
+        node = path[-1]
+        node.term = None
+        # Prune empty leaves, and fold a node left with a single edge into its parent's edge
+        while len(path) > 1 and node.term is None and len(node.edges) <= 1:
+            parent = path[-2]
+            first = next(first for first, edge in parent.edges.items() if edge[1] is node)
+            path.pop()
+            if node.edges:
+                (label, child), = node.edges.values()
+                parent.edges[first] = [parent.edges[first][0] + label, child]
+                break
+            del parent.edges[first]
+            node = parent
+        self._refill(path)
+        return True
+
+    def add_many(self, items):
+        """Add (term, display, weight) items, then rank every node in one bottom-up pass"""
+        weights, counts = self._weights, self._counts
+        for term, display, weight in items:
+            if term in weights:
+                counts[term] += 1
+                weights[term] += weight
+                continue
+            weights[term] = weight
+            counts[term] = 1
+            self._display[term] = term if display is None else display
+            self._insert_path(term)[-1].term = term
+        # Post-order over the whole tree: children are ranked before their parent
+        order, stack = [], [self._root]
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            stack.extend(child for _, child in node.edges.values())
+        self._refill(order)
+
+    def adjust(self, term, delta):
+        """Change a term's weight by delta"""
+        if not delta or term not in self._weights:
+            return
+        weight = self._weights[term] = self._weights[term] + delta
+        path = self._find_path(term)
+        if delta > 0:
+            self._offer(path, (-weight, term))
+        else:
+            self._refill(path)
+
+    def complete(self, prefix, limit=None):
+        """Display texts of the heaviest terms starting with prefix, best first"""
+        node, i = self._root, 0
+        while i < len(prefix):
+            edge = node.edges.get(prefix[i])
+            if edge is None:
+                return []
+            label, child = edge
+            if prefix.startswith(label, i):
+                i += len(label)
+            elif not label.startswith(prefix[i:]):
+                return []
+            else:
+                i = len(prefix)  # The prefix ends inside this edge: child's subtree matches
+            node = child
+        top = node.top if limit is None else node.top[:limit]
+        return [self._display[term] for _, term in top]
+
+    def _insert_path(self, term):
+        """Nodes from the root to the node for term, splitting an edge where needed"""
+        node, path, i = self._root, [self._root], 0
+        while i < len(term):
+            edge = node.edges.get(term[i])
+            if edge is None:
+                child = _RadixNode()
+                node.edges[term[i]] = [term[i:], child]
+                path.append(child)
+                return path
+            label, child = edge
+            j, end = 1, min(len(label), len(term) - i)
+            while j < end and label[j] == term[i + j]:
+                j += 1
+            if j < len(label):
+                # Split: the new middle node covers exactly the old child's subtree
+                middle = _RadixNode()
+                middle.edges[label[j]] = [label[j:], child]
+                middle.top = list(child.top)
+                edge[0], edge[1] = label[:j], middle
+                child = middle
+            node = child
+            path.append(node)
+            i += j
+        return path
+
+    def _find_path(self, term):
+        node, path, i = self._root, [self._root], 0
+        while i < len(term):
+            label, node = node.edges[term[i]]
+            path.append(node)
+            i += len(label)
+        return path
+
+    def _offer(self, path, entry):
+        """Put an entry whose weight rose (or is new) into the lists along its path"""
+        k, term = self.k, entry[1]
+        for node in reversed(path):
+            top = node.top
+            for i, (_, other) in enumerate(top):
+                if other == term:
+                    del top[i]
+                    break
+            else:
+                if len(top) >= k and not entry < top[-1]:
+                    break  # An ancestor's list is at least as good: it will not qualify there either
+            insort(top, entry)
+            del top[k:]
+
+    def _refill(self, path):
+        """Recompute the lists along a path from the node's own term and its children's lists"""
+        weights = self._weights
+        for node in reversed(path):
+            entries = [] if node.term is None else [(-weights[node.term], node.term)]
+            for _, child in node.edges.values():
+                entries.extend(child.top)
+            node.top = nsmallest(self.k, entries)
+
+class AutocompleteIndex:
+    """Type-ahead over titles and authors, ranked by how often the books were borrowed
+
+    One PrefixTrie per field holds the normalized texts. A term weighs the
+    total borrow_count of the books carrying it, so an author ranks by all
+    of their loans together. Call update(book) after its borrow_count
+    changes.
+    """
+
+    K = 8  # Completions kept per trie node
+
+    def __init__(self, k=None, fields=None):
+        """fields maps a field name to a function returning the book's display text"""
+        self.k = self.K if k is None else k
+        self.fields = fields or {"title": attrgetter("title"), "author": attrgetter("author")}
+        self._tries = {field: PrefixTrie(self.k) for field in self.fields}
+        self._entries = {}  # book_ID -> (book, {field: term}, borrow_count counted so far)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, book_ID):
+        return book_ID in self._entries
+
+    def clear(self):
+        for trie in self._tries.values():
+            trie.clear()
+        self._entries.clear()
+
+    def add(self, book):
+        """Index one book (replacing an earlier entry with the same ID)"""
+        if book.book_ID in self._entries:
+            self.remove(book.book_ID)
+        terms = {}
+        for field, extract in self.fields.items():
+            display = extract(book)
+            terms[field] = term = normalize_title(display)
+            self._tries[field].add(term, display, book.borrow_count)
+        self._entries[book.book_ID] = (book, terms, book.borrow_count)
+
+    def add_many(self, books):
+        """Index a batch of books, ranking each trie once at the end"""
+        books = {book.book_ID: book for book in books}  # The last copy of an ID wins, as with add
+        for book_ID in books:
+            self.remove(book_ID)
+        items = {field: [] for field in self.fields}
+        for book_ID, book in books.items():
+            terms = {}
+            for field, extract in self.fields.items():
+                display = extract(book)
+                terms[field] = term = normalize_title(display)
+                items[field].append((term, display, book.borrow_count))
+            self._entries[book_ID] = (book, terms, book.borrow_count)
+        for field, trie in self._tries.items():
+            trie.add_many(items[field])
+
+    def remove(self, book_ID):
+        """Drop a book; returns True if it was indexed"""
+        entry = self._entries.pop(book_ID, None)
+        if entry is None:
+            return False
+        _, terms, counted = entry
+        for field, term in terms.items():
+            self._tries[field].remove(term, counted)
+        return True
+
+    def update(self, book):
+        """Re-rank a book after its borrow_count changed"""
+        entry = self._entries.get(book.book_ID)
+        if entry is None:
+            return
+        _, terms, counted = entry
+        delta = book.borrow_count - counted
+        if delta:
+            for field, term in terms.items():
+                self._tries[field].adjust(term, delta)
+            self._entries[book.book_ID] = (book, terms, book.borrow_count)
+
+    def suggest(self, field, prefix, limit=None):
+        """Most borrowed titles (or authors) starting with prefix, case-insensitively"""
+        return self._tries[field].complete(normalize_title(prefix), limit)
@@ -0,0 +1,262 @@
+from itertools import compress
+from operator import attrgetter
+
+# Positions of the set bits of every byte value, for iterating a bitmap a byte at a time
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+def _count_ones(bits):
+    return bin(bits).count("1")
+
+_popcount = getattr(int, "bit_count", _count_ones)  # int.bit_count needs Python 3.10
+
+_BIT_FLAGS = bytes.maketrans(b"01", b"\x00\x01")
+
+def _flags(bits):
+    """One 0/1 byte per bit position, lowest bit first"""
+    return bin(bits)[:1:-1].encode().translate(_BIT_FLAGS)
+
+class Bitmap:
+    """Set of small non-negative integers stored as the bits of one Python int
+
+    &, | and - combine whole bitmaps with single big-integer operations.
+    Single-slot updates and membership tests go to a little-endian bytearray
+    copy of the bits instead, so they cost O(1) rather than rebuilding an
+    n-bit int; the int is rebuilt from the bytes the next time it is read.
+    """
+
+    __slots__ = ("_bits", "_data")
+
+    def __init__(self, bits=0):
+        self._bits = bits  # None while _data holds changes not yet folded back in
+        self._data = None  # bytearray copy of the bits, made on the first single-slot access
+
+    @property
+    def bits(self):
+        if self._bits is None:
+            self._bits = int.from_bytes(self._data, "little")
+        return self._bits
+
+    def _bytes(self, size=0):
+        """The bytearray copy, grown (by doubling) to hold at least size bytes"""
+        data = self._data
+        if data is None:
+            bits = self._bits
+            data = self._data = bytearray(bits.to_bytes((bits.bit_length() + 7) // 8, "little"))
+        if size > len(data):
+            data.extend(bytes(max(size - len(data), len(data))))
+        return data
+
+    def add(self, slot):
+        data = self._bytes((slot >> 3) + 1)
+        data[slot >> 3] |= 1 << (slot & 7)
+        self._bits = None
+
+    def update(self, slots):
+        """Add many slots, converting to and from the int at most once"""
+        slots = list(slots)
+        if not slots:
+            return
+        data = self._bytes((max(slots) >> 3) + 1)
+        for slot in slots:
+            data[slot >> 3] |= 1 << (slot & 7)
+        self._bits = None
+
+    def discard(self, slot):
+        data = self._bytes()
+        i = slot >> 3
+        if i < len(data) and data[i] >> (slot & 7) & 1:
+            data[i] ^= 1 << (slot & 7)
+            self._bits = None
+
+    def __contains__(self, slot):
+        data = self._bytes()
+        i = slot >> 3
+        return i < len(data) and data[i] >> (slot & 7) & 1 == 1
+
+    def __len__(self):
+        return _popcount(self.bits)
+
+    def __bool__(self):
+        return self.bits != 0
+
+    def __eq__(self, other):
+        return isinstance(other, Bitmap) and self.bits == other.bits
+
+    def __and__(self, other):
+        return Bitmap(self.bits & other.bits)
+
+    def __or__(self, other):
+        return Bitmap(self.bits | other.bits)
+
+    def __sub__(self, other):
+        return Bitmap(self.bits & ~other.bits)
+
+    def __iter__(self):
+        """Set slots in increasing order"""
+        bits = self.bits
+        data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+        for i, byte in enumerate(data):
+            if byte:
+                base = i * 8
+                for bit in _BYTE_BITS[byte]:
+                    yield base + bit
+
+    def select(self, k):
+        """The k-th smallest set slot (0-based), counting 512 bits at a time"""
+        if not 0 <= k < len(self):
+            raise IndexError("bitmap index out of range")
+        bits, base = self.bits, 0
+        while True:
+            block = bits & ((1 << 512) - 1)
+            count = _popcount(block)
+            if k < count:
+                break
+            k -= count
+            bits >>= 512
+            base += 512
+        for slot in Bitmap(block):
+            if k == 0:
+                return base + slot
+            k -= 1
+
+    def __repr__(self):
+        return f"Bitmap({list(self)!r})"
+
+class BitmapIndex:
+    """Genre and availability bitmaps over dense book slots
+
+    Every book gets a small integer slot (freed slots are reused), so the
+    bitmaps stay about as long as the catalog. Membership in each genre and
+    the available flag are bits; filters such as "SCIENCE and available"
+    are one AND of two integers. available_count is kept as a plain counter.
+    """
+
+    def __init__(self):
+        self.slots = {}  # book_ID -> slot
+        self.books = []  # slot -> Book (None for a free slot)
+        self._free = []  # Released slots, reused before the list grows
+        self.genres = {}  # Genre -> Bitmap of slots
+        self.available = Bitmap()
+        self.available_count = 0
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, book_ID):
+        return book_ID in self.slots
+
+    def clear(self):
+        self.slots.clear()
+        self.books.clear()
+        self._free.clear()
+        self.genres.clear()
+        self.available = Bitmap()
+        self.available_count = 0
+
+    def _take_slot(self, book):
+        """Assign a slot to a book (replacing an earlier entry with the same ID)"""
+        if book.book_ID in self.slots:
+            self.remove(book.book_ID)
+        if self._free:
+            slot = self._free.pop()
+            self.books[slot] = book
+        else:
+            slot = len(self.books)
+            self.books.append(book)
+        self.slots[book.book_ID] = slot
+        return slot
+
+    def add(self, book):
+        """Give a book a slot and set its genre and availability bits"""
+        slot = self._take_slot(book)
+        genre = self.genres.get(book.genre)
+        if genre is None:
+            genre = self.genres[book.genre] = Bitmap()
+        genre.add(slot)
+        if book.available:
+            self.available.add(slot)
+            self.available_count += 1
+
+    def add_many(self, books):
+        """Index many books, setting each genre's and the availability bits in one pass per bitmap"""
+        by_genre, available = {}, []
+        for book in {book.book_ID: book for book in books}.values():  # The last entry per ID wins
+            slot = self._take_slot(book)
+            by_genre.setdefault(book.genre, []).append(slot)
+            if book.available:
+                available.append(slot)
+        for genre, slots in by_genre.items():
+            bitmap = self.genres.get(genre)
+            if bitmap is None:
+                bitmap = self.genres[genre] = Bitmap()
+            bitmap.update(slots)
+        self.available.update(available)
+        self.available_count += len(available)
+
+    def remove(self, book_ID):
+        """Free a book's slot; returns True if it was indexed"""
+        slot = self.slots.pop(book_ID, None)
+        if slot is None:
+            return False
+        book = self.books[slot]
+        genre = self.genres[book.genre]
+        genre.discard(slot)
+        if not genre:
+            del self.genres[book.genre]
+        if slot in self.available:
+            self.available.discard(slot)
+            self.available_count -= 1
+        self.books[slot] = None
+        self._free.append(slot)
+        return True
+
+    def set_available(self, book_ID, available):
+        """Mirror a change of book.available; unknown IDs are ignored"""
+        slot = self.slots.get(book_ID)
+        if slot is None or (slot in self.available) == bool(available):
+            return
+        if available:
+            self.available.add(slot)
+            self.available_count += 1
+        else:
+            self.available.discard(slot)
+            self.available_count -= 1
+
+    def genre(self, genre):
+        """Slots of the books in a genre"""
+        return self.genres.get(genre) or Bitmap()
+
+    def mask(self, book_IDs):
+        """Bitmap of the slots of the given (indexed) books"""
+        slots = self.slots
+        bitmap = Bitmap()
+        bitmap.update(slots[book_ID] for book_ID in book_IDs if book_ID in slots)
+        return bitmap
+
+    def filter(self, books, bitmap):
+        """The books whose slots are set in bitmap, in their given order (unindexed ones are dropped)"""
+        slots, bits = self.slots, bitmap.bits
+        if len(books) * 64 < bits.bit_length():
+            # Few books: shift each slot's bit out of the integer
+            return [book for book in books
+                    if (slot := slots.get(book.book_ID)) is not None and bits >> slot & 1]
+        # Many books: expand the bitmap to one flag byte per slot once, then index it
+        flags = _flags(bits)
+        return [book for book in books
+                if (slot := slots.get(book.book_ID)) is not None and slot < len(flags) and flags[slot]]
+
+    def iter_books(self, bitmap):
+        """The books behind a bitmap's slots, in slot order"""
+        bits = bitmap.bits
+        if len(bitmap) * 8 >= bits.bit_length():
+            # Dense: let compress() walk one flag byte per slot instead of a Python loop per set bit
+            return compress(self.books, _flags(bits))
+        books = self.books
+        return (books[slot] for slot in bitmap)
+
+    def books_for(self, bitmap):
+        """The books behind a bitmap's slots, in title order"""
+        books = list(self.iter_books(bitmap))
+        books.sort(key=attrgetter("book_ID"))
+        books.sort(key=attrgetter("title_key"))  # Stable: (title_key, book_ID) like Book.__lt__
+        return books
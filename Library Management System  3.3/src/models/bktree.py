@@ -0,0 +1,264 @@
+from heapq import nsmallest
+from operator import attrgetter
+
+from models.Book import normalize_title
+
+def _author_key(book):
+    return normalize_title(book.author)
+
+def _pattern_masks(pattern):
+    """Character -> bitmask of the positions where it occurs in pattern"""
+    masks = {}
+    for i, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | 1 << i
+    return masks
+
+def _distance(masks, length, text):
+    """Levenshtein distance from the pattern behind masks to text (Myers' bit-parallel algorithm)
+
+    Every column of the edit-distance matrix is held as two bit vectors of
+    +1/-1 vertical deltas, so each character of text costs a handful of
+    integer operations whatever the pattern length.
+    """
+    if not length:
+        return len(text)
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    pv, mv, score = full, 0, length
+    for char in text:
+        eq = masks.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ph << 1 | 1
+        pv = (mh << 1 | ~(xv | ph)) & full
+        mv = ph & xv
+    return score
+
+def levenshtein(a, b):
+    """Edit distance between two strings (insertions, deletions and substitutions)"""
+    if len(a) < len(b):
+        a, b = b, a
+    return _distance(_pattern_masks(b), len(b), a)
+
+class BKTree:
+    """Burkhard-Keller tree of terms under edit distance, each term carrying a set of book IDs
+
+    Children hang off a node by their distance to it, so the triangle
+    inequality lets a query within distance d skip every child edge outside
+    [dist - d, dist + d]. Removing a term's last ID leaves its node in place
+    as a dead routing node; the tree is rebuilt once dead nodes outnumber
+    live ones.
+    """
+
+    def __init__(self):
+        self._root = None  # Node: [term, set of book IDs, {distance: child}]
+        self._nodes = {}  # term -> node
+        self._dead = 0  # Nodes whose ID set is empty
+
+    def __len__(self):
+        """Number of distinct live terms"""
+        return len(self._nodes) - self._dead
+
+    def __contains__(self, term):
+        node = self._nodes.get(term)
+        return node is not None and bool(node[1])
+
+    def clear(self):
+        self._root = None
+        self._nodes.clear()
+        self._dead = 0
+
+    def add(self, term, book_ID):
+        node = self._nodes.get(term)
+        if node is not None:
+            if not node[1]:
+                self._dead -= 1
+            node[1].add(book_ID)
+            return
+        node = self._nodes[term] = [term, {book_ID}, {}]
+        if self._root is None:
+            self._root = node
+            return
+        masks, length = _pattern_masks(term), len(term)
+        parent = self._root
+        while True:
+            dist = _distance(masks, length, parent[0])
+            child = parent[2].get(dist)
+            if child is None:
+                parent[2][dist] = node
+                return
+            parent = child
+
+    def remove(self, term, book_ID):
+        """Drop book_ID from term; returns True if it was there"""
+        node = self._nodes.get(term)
+        if node is None or book_ID not in node[1]:
+            return False
+        node[1].discard(book_ID)
+        if not node[1]:
+            self._dead += 1
+            if self._dead > len(self._nodes) - self._dead:
+                self._rebuild()
+        return True
+
+    def _rebuild(self):
+        live = [(term, ids) for term, (_, ids, _) in self._nodes.items() if ids]
+        self.clear()
+        for term, ids in live:
+            for book_ID in ids:
+                self.add(term, book_ID)
+
+    def search(self, term, max_distance):
+        """(distance, term, book IDs) for every live term within max_distance of term"""
+        if self._root is None:
+            return []
+        masks, length = _pattern_masks(term), len(term)
+        found = []
+        stack = [self._root]
+        while stack:
+            node_term, ids, children = stack.pop()
+            # The distance is at least the length difference; skip the bit-parallel pass
+            # when that alone puts the node out of range and it has no children to route to
+            if not children and abs(len(node_term) - length) > max_distance:
+                continue
+            dist = _distance(masks, length, node_term)
+            if dist <= max_distance and ids:
+                found.append((dist, node_term, ids))
+            low, high = dist - max_distance, dist + max_distance
+            for edge, child in children.items():
+                if low <= edge <= high:
+                    stack.append(child)
+        return found
+
+class FuzzyIndex:
+    """Typo-tolerant title/author lookup: a BK-tree over the words of normalized text per field
+
+    Each query word may be up to word_tolerance(word) edits away from a
+    word of the book, so "tolstoi" finds "Leo Tolstoy" and "nihgt" finds
+    "Night". A book matches when every query word matches one of its words
+    and those edits add up to at most max_distance; the sum is the book's
+    distance. The trees hold distinct words only and are built on the first
+    fuzzy search, so bulk loads do not pay for them.
+    """
+
+    MAX_DISTANCE = 2
+    LIMIT = 20
+
+    def __init__(self, fields=None):
+        """fields maps a field name to a function returning the book's normalized text"""
+        self.fields = fields or {"title": attrgetter("title_key"), "author": _author_key}
+        self._words = {field: {} for field in self.fields}  # field -> book_ID -> distinct words
+        self._trees = dict.fromkeys(self.fields)  # field -> BKTree of words, None until first searched
+        self._books = {}  # book_ID -> Book
+
+    def __len__(self):
+        return len(self._books)
+
+    def __contains__(self, book_ID):
+        return book_ID in self._books
+
+    def clear(self):
+        for field in self.fields:
+            self._words[field].clear()
+            self._trees[field] = None
+        self._books.clear()
+
+    @staticmethod
+    def word_tolerance(word):
+        """Edits allowed in one query word: none below three characters, two from five
+
+        A transposed pair of letters costs two edits, so a single swap in a
+        word of five or more characters is still found.
+        """
+        return 0 if len(word) < 3 else 1 if len(word) < 5 else 2
+
+    def add(self, book):
+        """Index one book (replacing an earlier entry with the same ID)"""
+        book_ID = book.book_ID
+        if book_ID in self._books:
+            self.remove(book_ID)
+        self._books[book_ID] = book
+        for field, extract in self.fields.items():
+            words = self._words[field][book_ID] = frozenset(extract(book).split())
+            tree = self._trees[field]
+            if tree is not None:
+                for word in words:
+                    tree.add(word, book_ID)
+
+    def add_many(self, books):
+        for book in books:
+            self.add(book)
+
+    def remove(self, book_ID):
+        """Drop a book from the index; returns True if it was indexed"""
+        if self._books.pop(book_ID, None) is None:
+            return False
+        for field in self.fields:
+            words = self._words[field].pop(book_ID)
+            tree = self._trees[field]
+            if tree is not None:
+                for word in words:
+                    tree.remove(word, book_ID)
+        return True
+
+    def _tree_for(self, field):
+        tree = self._trees[field]
+        if tree is None:
+            tree = self._trees[field] = BKTree()
+            for book_ID, words in self._words[field].items():
+                for word in words:
+                    tree.add(word, book_ID)
+        return tree
+
+    def search(self, field, term, max_distance=None, limit=None):
+        """Up to limit books matching every word of term within max_distance edits in total, nearest first
+
+        Ties are broken in title order.
+        """
+        max_distance = self.MAX_DISTANCE if max_distance is None else max_distance
+        limit = self.LIMIT if limit is None else limit
+        tree = self._tree_for(field)
+
+        # Nearest distance per book for each query word
+        per_word = []
+        for word in dict.fromkeys(normalize_title(term).split()):
+            best = {}
+            for dist, _, ids in tree.search(word, min(max_distance, self.word_tolerance(word))):
+                for book_ID in ids:
+                    if dist < best.get(book_ID, dist + 1):
+                        best[book_ID] = dist
+            if not best:
+                return []
+            per_word.append(best)
+        if not per_word:
+            return []
+
+        # AND across words, starting from the word with the fewest books; a book whose
+        # edits add up to more than max_distance is dropped. Bucket the rest by total distance
+        per_word.sort(key=len)
+        buckets = {}
+        for book_ID, total in per_word[0].items():
+            for best in per_word[1:]:
+                dist = best.get(book_ID)
+                if dist is None or total + dist > max_distance:
+                    break
+                total += dist
+            else:
+                buckets.setdefault(total, []).append(book_ID)
+
+        books, results = self._books, []
+        for dist in sorted(buckets):
+            group = [books[book_ID] for book_ID in buckets[dist]]
+            room = limit - len(results)
+            if len(group) > room:
+                results.extend(nsmallest(room, group))
+                break
+            group.sort()
+            results.extend(group)
+        return results
@@ -0,0 +1,80 @@
+import math
+import sys
+
+_MASK = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15  # Fibonacci hashing: spreads weak hashes (small ints hash to themselves)
+
+class CountingBloomFilter:
+    """Bloom filter with one-byte counters instead of bits, so items can be removed
+
+    Membership answers are "definitely not present" or "probably present".
+    Counters saturate at 255 and then stay put, which can only cause extra
+    false positives, never a false negative.
+
+    Every probe is a bytecode-level loop iteration, so the number of hash
+    functions is capped at MAX_HASHES and the table is widened to keep the
+    requested error rate (about 12 counters per item at 1% instead of 9.6).
+    """
+
+    MAX_HASHES = 3
+
+    __slots__ = ("capacity", "error_rate", "size", "hashes", "count", "_counters")
+
+    def __init__(self, capacity=1024, error_rate=0.01):
+        """Size the filter for capacity items at the given false-positive rate"""
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        # k hash functions (optimal is -log2 p), then the m that gives p: p = (1 - e^(-kn/m))^k
+        self.hashes = max(1, min(self.MAX_HASHES, round(-math.log2(error_rate))))
+        fill = 1 - error_rate ** (1 / self.hashes)
+        self.size = max(8, math.ceil(-self.hashes * self.capacity / math.log(fill)))
+        self.count = 0  # Items currently added
+        self._counters = bytearray(self.size)
+
+    def _positions(self, item):
+        """The k counter positions for item (double hashing)"""
+        h = hash(item) * _GOLDEN & _MASK
+        h1, h2 = h >> 32, h | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def add(self, item):
+        counters = self._counters
+        for pos in self._positions(item):
+            if counters[pos] < 255:
+                counters[pos] += 1
+        self.count += 1
+
+    def remove(self, item):
+        """Remove one occurrence of an item that was added earlier"""
+        counters = self._counters
+        for pos in self._positions(item):
+            if 0 < counters[pos] < 255:  # A saturated counter no longer knows its true count
+                counters[pos] -= 1
+        self.count -= 1
+
+    def __contains__(self, item):
+        h = hash(item) * _GOLDEN & _MASK
+        h1, h2 = h >> 32, h | 1
+        counters, size = self._counters, self.size
+        for i in range(self.hashes):
+            if not counters[(h1 + i * h2) % size]:
+                return False
+        return True
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self._counters = bytearray(self.size)
+        self.count = 0
+
+    @property
+    def false_positive_rate(self):
+        """Current false-positive probability, estimated from the share of non-zero counters"""
+        filled = self.size - self._counters.count(0)
+        return (filled / self.size) ** self.hashes
+
+    @property
+    def memory_bytes(self):
+        return sys.getsizeof(self._counters)
@@ -0,0 +1,383 @@
+
+from bisect import bisect_left, bisect_right
+from itertools import islice
+
+from models.Book import normalize_title
+from models.bplustreenode import BPlusTreeNode
+
+class BPlusTree:
+    """B+ tree organized by (title_key, book_ID): records live only in linked leaves
+
+    Title arguments are normalized with normalize_title, so lookups ignore case.
+    Every node counts the books in its subtree, so page() descends straight to
+    the leaf holding its offset instead of walking the leaf chain.
+    """
+
+    def __init__(self, t=3):
+        """Initialize B+ tree with minimum degree t (default=3)"""
+        self.root = BPlusTreeNode(True)
+        self.t = t  # Minimum degree
+        self._count = 0
+        self._key_by_id = {}  # book_ID -> composite key, for delete_by_id
+
+    @staticmethod
+    def _key(book):
+        """Composite index key: editions sharing a title are ordered by ID"""
+        return (book.title_key, book.book_ID)
+
+    # Core insertion operation
+    def insert(self, book):
+        """Insert a book, splitting overflowing nodes on the way back up"""
+        key = self._key(book)
+        leaf, path = self._find_leaf(key, bisect_right)
+        i = bisect_right(leaf.keys, key)
+        leaf.keys.insert(i, key)
+        leaf.books.insert(i, book)
+        leaf.size += 1
+        for ancestor, _ in path:
+            ancestor.size += 1
+        self._count += 1
+        self._key_by_id[book.book_ID] = key
+
+        node = leaf
+        while len(node.keys) > (2 * self.t) - 1:
+            separator, sibling = self._split(node)
+            if path:
+                parent, idx = path.pop()
+            else:  # Root split
+                parent, idx = BPlusTreeNode(False), 0
+                parent.children.append(node)
+                parent.size = node.size + sibling.size
+                self.root = parent
+            parent.keys.insert(idx, separator)
+            parent.children.insert(idx + 1, sibling)
+            node = parent
+
+    def _split(self, node):
+        """Split an overflowing node; returns (separator, new right sibling)"""
+        mid = len(node.keys) // 2
+        sibling = BPlusTreeNode(node.leaf)
+        if node.leaf:
+            # Leaves keep every record; the separator is a copy of the right half's first key
+            sibling.keys, node.keys = node.keys[mid:], node.keys[:mid]
+            sibling.books, node.books = node.books[mid:], node.books[:mid]
+            sibling.next, node.next = node.next, sibling
+            sibling.size, node.size = len(sibling.books), len(node.books)
+            return sibling.keys[0], sibling
+        separator = node.keys[mid]
+        sibling.keys, node.keys = node.keys[mid + 1:], node.keys[:mid]
+        sibling.children, node.children = node.children[mid + 1:], node.children[:mid + 1]
+        sibling.size = sum(child.size for child in sibling.children)
+        node.size -= sibling.size
+        return separator, sibling
+
+    def _find_leaf(self, key, bisect):
+        """Descend to the leaf for key; returns (leaf, [(parent, child_index), ...])"""
+        path = []
+        node = self.root
+        while not node.leaf:
+            i = bisect(node.keys, key)
+            path.append((node, i))
+            node = node.children[i]
+        return node, path
+
+    # Bottom-up bulk construction
+    def bulk_load(self, books):
+        """Replace the tree contents with books: fill linked leaves, then index them"""
+        t = self.t
+        items = sorted(books, key=self._key)
+        self._count = len(items)
+        self._key_by_id = {book.book_ID: self._key(book) for book in items}
+        if not items:
+            self.root = BPlusTreeNode(True)
+            return
+
+        leaf_count = -(-len(items) // (2 * t - 1))
+        base, extra = divmod(len(items), leaf_count)
+        nodes, pos = [], 0
+        for j in range(leaf_count):
+            size = base + (1 if j < extra else 0)
+            leaf = BPlusTreeNode(True)
+            leaf.books = items[pos:pos + size]
+            leaf.keys = [self._key(book) for book in leaf.books]
+            leaf.size = size
+            if nodes:
+                nodes[-1].next = leaf
+            nodes.append(leaf)
+            pos += size
+        separators = [leaf.keys[0] for leaf in nodes[1:]]
+
+        # Internal levels: group up to 2t children per node until one root remains
+        while len(nodes) > 1:
+            node_count = -(-len(nodes) // (2 * t))
+            base, extra = divmod(len(nodes), node_count)
+            parents, promoted = [], []
+            child_pos = key_pos = 0
+            for j in range(node_count):
+                fanout = base + (1 if j < extra else 0)
+                parent = BPlusTreeNode(False)
+                parent.children = nodes[child_pos:child_pos + fanout]
+                parent.keys = separators[key_pos:key_pos + fanout - 1]
+                parent.size = sum(child.size for child in parent.children)
+                child_pos += fanout
+                key_pos += fanout - 1
+                parents.append(parent)
+                if j < node_count - 1:
+                    promoted.append(separators[key_pos])
+                    key_pos += 1
+            nodes, separators = parents, promoted
+
+        self.root = nodes[0]
+
+    # Search operations
+    def search(self, title):
+        """Search by title (O(log n) time); the lowest book_ID wins among editions"""
+        entry = self._search_entry(title)
+        return None if entry is None else entry[0]
+
+    def _search_entry(self, title):
+        """(book, stored key) of the first edition with this title, or None"""
+        title = normalize_title(title)
+        leaf, i = self._lower_bound((title,))
+        if leaf is None or leaf.keys[i][0] != title:
+            return None
+        return leaf.books[i], leaf.keys[i]
+
+    def _lower_bound(self, lo):
+        """(leaf, index) of the first stored key >= lo, or (None, 0) past the end"""
+        leaf, _ = self._find_leaf(lo, bisect_left)
+        i = bisect_left(leaf.keys, lo)
+        while leaf is not None and i == len(leaf.keys):
+            leaf, i = leaf.next, 0
+        return leaf, i
+
+    def find_all(self, title):
+        """All editions with exactly this title, ordered by book_ID"""
+        return list(self.range(title, title, inclusive=True))
+
+    def update_availability(self, title, available):
+        """Update book availability (O(log n))"""
+        book = self.search(title)
+        if book:
+            book.available = available
+            return True
+        return False
+
+    # Deletion
+    def delete(self, title):
+        """Delete the first edition with this title; returns True if a book was removed"""
+        entry = self._search_entry(title)
+        if entry is None:
+            return False
+        return self._delete_key(entry[1])
+
+    def delete_by_id(self, book_ID):
+        """Delete the book with this ID (O(log n)); returns True if it was removed"""
+        key = self._key_by_id.get(book_ID)
+        if key is None:
+            return False
+        return self._delete_key(key)
+
+    # Batches: applied one key at a time, in key order
+    def insert_many(self, books):
+        """Insert a batch of books; returns how many were inserted"""
+        books = sorted(books, key=self._key)
+        for book in books:
+            self.insert(book)
+        return len(books)
+
+    def delete_many(self, values):
+        """Delete the first edition for each title; returns how many were removed"""
+        return sum(self.delete(title) for title in sorted({normalize_title(value) for value in values}))
+
+    def delete_many_by_id(self, book_IDs):
+        """Delete the books with these IDs; returns how many were removed"""
+        keys = sorted(key for key in map(self._key_by_id.get, set(book_IDs)) if key is not None)
+        return sum(self._delete_key(key) for key in keys)
+
+    def update_availability_many(self, updates):
+        """Apply (title, available) pairs; returns how many books matched"""
+        wanted = {normalize_title(title): available for title, available in updates}
+        return sum(self.update_availability(title, available) for title, available in sorted(wanted.items()))
+
+    def _delete_key(self, key):
+        """Remove one record with this exact key and rebalance upwards"""
+        # Identical keys may straddle a separator, so try both routings
+        for bisect in (bisect_right, bisect_left):
+            leaf, path = self._find_leaf(key, bisect)
+            i = bisect_left(leaf.keys, key)
+            if i < len(leaf.keys) and leaf.keys[i] == key:
+                break
+        else:
+            return False
+
+        del leaf.keys[i]
+        del leaf.books[i]
+        leaf.size -= 1
+        for ancestor, _ in path:
+            ancestor.size -= 1
+        self._count -= 1
+        self._rebalance(leaf, path)
+        if self._key_by_id.get(key[1]) == key and self._find_key(key) is None:
+            del self._key_by_id[key[1]]
+        return True
+
+    def _find_key(self, key):
+        """Exact lookup against the stored leaf keys"""
+        leaf, i = self._lower_bound(key)
+        return leaf.books[i] if leaf is not None and leaf.keys[i] == key else None
+
+    def _rebalance(self, node, path):
+        """Fix underflow from node upwards by borrowing from or merging with a sibling"""
+        min_keys = self.t - 1
+        while path and len(node.keys) < min_keys:
+            parent, idx = path.pop()
+            left = parent.children[idx - 1] if idx > 0 else None
+            right = parent.children[idx + 1] if idx + 1 < len(parent.children) else None
+
+            if left is not None and len(left.keys) > min_keys:
+                self._borrow_from_prev(parent, idx, left, node)
+            elif right is not None and len(right.keys) > min_keys:
+                self._borrow_from_next(parent, idx, node, right)
+            elif left is not None:
+                self._merge(parent, idx - 1, left, node)
+            else:
+                self._merge(parent, idx, node, right)
+            node = parent
+
+        # Shrink the tree when the root runs out of separators
+        if not self.root.leaf and not self.root.keys:
+            self.root = self.root.children[0]
+
+    def _borrow_from_prev(self, parent, idx, left, node):
+        """Move the last entry of the left sibling into node"""
+        if node.leaf:
+            node.keys.insert(0, left.keys.pop())
+            node.books.insert(0, left.books.pop())
+            parent.keys[idx - 1] = node.keys[0]
+            moved = 1
+        else:
+            node.keys.insert(0, parent.keys[idx - 1])
+            parent.keys[idx - 1] = left.keys.pop()
+            node.children.insert(0, left.children.pop())
+            moved = node.children[0].size
+        node.size += moved
+        left.size -= moved
+
+    def _borrow_from_next(self, parent, idx, node, right):
+        """Move the first entry of the right sibling into node"""
+        if node.leaf:
+            node.keys.append(right.keys.pop(0))
+            node.books.append(right.books.pop(0))
+            parent.keys[idx] = right.keys[0]
+            moved = 1
+        else:
+            node.keys.append(parent.keys[idx])
+            parent.keys[idx] = right.keys.pop(0)
+            node.children.append(right.children.pop(0))
+            moved = node.children[-1].size
+        node.size += moved
+        right.size -= moved
+
+    def _merge(self, parent, idx, left, right):
+        """Merge right into left, dropping the separator parent.keys[idx]"""
+        separator = parent.keys.pop(idx)
+        parent.children.pop(idx + 1)
+        left.size += right.size
+        if left.leaf:
+            left.keys.extend(right.keys)
+            left.books.extend(right.books)
+            left.next = right.next
+        else:
+            left.keys.append(separator)
+            left.keys.extend(right.keys)
+            left.children.extend(right.children)
+
+    def snapshot(self):
+        """Independent copy of the current contents
+
+        Unlike BTree.snapshot() this is not O(1): linked leaves cannot be
+        path-copied, so every call lists all n books and bulk-loads a new
+        tree, costing O(n log n) time for the sort and O(n) extra memory.
+        """
+        view = BPlusTree(self.t)
+        view.bulk_load(list(self))
+        return view
+
+    # Sequential access along the leaf chain
+    def traverse(self, callback=None):
+        """Visit books in title order; returns a list when no callback is given"""
+        if callback is None:
+            return list(self)
+        for book in self:
+            callback(book)
+        return None
+
+    def __iter__(self):
+        """Yield every book in title order"""
+        node = self.root
+        while not node.leaf:
+            node = node.children[0]
+        return self._scan(node, 0)
+
+    def __len__(self):
+        """Number of books in the tree (O(1))"""
+        return self._count
+
+    def range(self, lo=None, hi=None, inclusive=False):
+        """Yield books with lo <= title < hi (<= hi if inclusive) in title order"""
+        books = iter(self) if lo is None else self._scan_from((normalize_title(lo),))
+        if hi is not None:
+            hi = normalize_title(hi)
+        for book in books:
+            if hi is not None and (book.title_key > hi if inclusive else book.title_key >= hi):
+                return
+            yield book
+
+    def prefix(self, prefix):
+        """Yield books whose title starts with prefix in title order"""
+        prefix = normalize_title(prefix)
+        for book in self._scan_from((prefix,)):
+            if not book.title_key.startswith(prefix):
+                return
+            yield book
+
+    def page(self, offset, limit):
+        """Books at positions offset .. offset+limit-1: descend by subtree sizes, then follow the leaves"""
+        offset = max(offset, 0)
+        if offset >= self._count:
+            return []
+        node = self.root
+        while not node.leaf:
+            for child in node.children:
+                if offset < child.size:
+                    break
+                offset -= child.size
+            node = child
+        return list(islice(self._scan(node, offset), limit))
+
+    def _scan_from(self, lo):
+        """Descend once to the first key >= lo, then follow the leaf chain"""
+        leaf, _ = self._find_leaf(lo, bisect_left)
+        return self._scan(leaf, bisect_left(leaf.keys, lo))
+
+    @staticmethod
+    def _scan(leaf, i):
+        """Yield books from position i of leaf onwards, leaf to leaf"""
+        while leaf is not None:
+            books = leaf.books
+            for j in range(i, len(books)):
+                yield books[j]
+            leaf, i = leaf.next, 0
+
+    def print_tree(self, node=None, level=0):
+        """Print the B+ tree structure with titles"""
+        if node is None:
+            node = self.root
+
+        if node.leaf:
+            print("  " * level + "|-- " + str([book.title for book in node.books]))
+        else:
+            print("  " * level + "|-- " + str([key[0] for key in node.keys]))
+            for child in node.children:
+                self.print_tree(child, level + 1)
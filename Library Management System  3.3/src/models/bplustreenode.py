@@ -0,0 +1,10 @@
+class BPlusTreeNode:
+    __slots__ = ("keys", "books", "children", "next", "size", "leaf")
+
+    def __init__(self, leaf=False):
+        self.keys = []  # Record keys in leaves, separator keys in internal nodes
+        self.books = []  # List of books (leaves only)
+        self.children = []  # List of child nodes (internal nodes only)
+        self.next = None  # Next leaf in key order (leaves only)
+        self.size = 0  # Number of books in this subtree
+        self.leaf = leaf
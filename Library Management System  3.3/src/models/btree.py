@@ -1,169 +1,534 @@
 
+from bisect import bisect_left, bisect_right
+from functools import total_ordering
+from itertools import islice
+from operator import attrgetter, itemgetter
+
+from models.Book import normalize_title
+from models.bloomfilter import CountingBloomFilter
 from models.btreenode import BTreeNode
 
+def _identity(value):
+    return value
+
+
+# Work counters reported by stats(); they only move while a tree is instrumented
+_COUNTERS = ("comparisons", "splits", "merges", "borrows")
+
+
+@total_ordering
+class Descending:
+    """Key wrapper that sorts in reverse, e.g. key=lambda b: (b.author, Descending(b.publication_year))"""
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, Descending) and self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __repr__(self):
+        return f"Descending({self.value!r})"
+
+
 class BTree:
-    """Complete B-tree implementation organized by book titles"""
-    
-    def __init__(self, t=3):
-        """Initialize B-tree with minimum degree t (default=3)"""
-        self.root = BTreeNode(t, True)
+    """Complete B-tree implementation organized by (key(book), book_ID)
+
+    key defaults to the case-folded title (Book.title_key). Any orderable
+    value works, including tuples for composite keys and Descending(...)
+    components for reversed order. Query values pass through normalize
+    first; for the default key that is normalize_title, so title lookups
+    ignore case.
+
+    With lazy_delete, deletions only mark entries as tombstones (subtree
+    sizes count live entries only) and compact() removes them physically.
+    Compaction runs compact_budget tombstones at a time once they exceed
+    compact_ratio of the stored entries, or whenever the caller is idle.
+
+    With bloom_filter, a counting Bloom filter over the key values of live
+    entries answers most lookups for absent values without descending the
+    tree; it doubles its capacity as the tree grows.
+
+    With instrument (or by setting instrumented later), the tree counts key
+    comparisons, splits, merges and borrows for stats(). While it is off,
+    probes go straight to the C bisect and restructurings skip the counters.
+    """
+
+    # Batches smaller than len(tree) / SPARSE_BATCH rarely share a node, so
+    # insert_many and the batch deletes go key by key instead of walking once
+    SPARSE_BATCH = 25
+
+    def __init__(self, t=3, key=None, normalize=None, lazy_delete=False, compact_ratio=0.5,
+                 compact_budget=256, bloom_filter=False, instrument=False):
+        """Initialize B-tree with minimum degree t (default=3) and an optional key function"""
         self.t = t  # Minimum degree
+        if key is None:
+            key, normalize = attrgetter("title_key"), normalize or normalize_title
+        self.key = key
+        self.normalize = normalize or _identity
+        self.lazy_delete = lazy_delete
+        self.compact_ratio = compact_ratio
+        self.compact_budget = compact_budget
+        self._tombstones = set()  # Keys of entries deleted lazily but still stored
+        self._tombstones_shared = False  # A snapshot holds _tombstones; copy it before changing it
+        self._bloom = CountingBloomFilter() if bloom_filter else None  # Over key values
+        self._bloom_rejects = 0  # Lookups answered by the filter alone
+        self._key_by_id = {}  # book_ID -> composite key, for delete_by_id
+        self._epoch = 0  # Nodes from an older epoch are shared with a snapshot
+        self._counters = dict.fromkeys(_COUNTERS, 0)  # Only updated while instrumented
+        self._instrument = bool(instrument)
+        self.root = self._new_node(True)
+
+    def _key(self, book):
+        """Composite index key: books sharing a key value are ordered by ID"""
+        return (self.key(book), book.book_ID)
+
+    # Copy-on-write support for snapshots
+    def snapshot(self):
+        """O(1) read-only view of the current contents; later writes copy shared nodes
+
+        The tombstone set is shared too and copied by the first write that changes it.
+        """
+        view = BTreeSnapshot(self.root, self.t, self.key, self.normalize, self._tombstones)
+        self._tombstones_shared = True
+        self._epoch += 1
+        return view
+
+    def _writable_tombstones(self):
+        """The tombstone set, copied first if a snapshot shares it"""
+        if self._tombstones_shared:
+            self._tombstones = set(self._tombstones)
+            self._tombstones_shared = False
+        return self._tombstones
+
+    def _new_node(self, leaf):
+        """Create a node owned by the current epoch"""
+        node = BTreeNode(leaf)
+        node.epoch = self._epoch
+        return node
+
+    def _copy_node(self, node):
+        """Path copying: clone a node that a snapshot may still be reading"""
+        copy = self._new_node(node.leaf)
+        copy.books = node.books[:]
+        copy.keys = node.keys[:]
+        copy.children = node.children[:]
+        copy.size = node.size
+        return copy
+
+    def _writable_root(self):
+        """Root node safe to modify in place"""
+        if self.root.epoch != self._epoch:
+            self.root = self._copy_node(self.root)
+        return self.root
+
+    def _writable_child(self, parent, i):
+        """Child i of a writable parent, copied first if a snapshot shares it"""
+        child = parent.children[i]
+        if child.epoch != self._epoch:
+            child = parent.children[i] = self._copy_node(child)
+        return child
+
+    # Tombstones (lazy delete)
+    def _weight(self, key):
+        """How much an entry contributes to subtree sizes: 0 for a tombstone"""
+        return 0 if self._tombstones and key in self._tombstones else 1
+
+    def _live_count(self, keys):
+        """Number of keys that are not tombstones"""
+        dead = self._tombstones
+        if not dead:
+            return len(keys)
+        return sum(1 for key in keys if key not in dead)
+
+    @property
+    def tombstones(self):
+        """Number of lazily deleted entries still stored in the tree"""
+        return len(self._tombstones)
+
+    def _tombstone(self, key):
+        """Mark the entry dead and take it out of the sizes on its path; no restructuring"""
+        if self._find_key(key) is None:
+            return False
+        node = self._writable_root()
+        while True:
+            node.size -= 1
+            i = self._bisect_left(node.keys, key)
+            if i < len(node.keys) and node.keys[i] == key:
+                break
+            node = self._writable_child(node, i)
+        self._writable_tombstones().add(key)
+        if self._bloom is not None:
+            self._bloom.remove(key[0])
+        if self._key_by_id.get(key[1]) == key:
+            del self._key_by_id[key[1]]
+        if len(self._tombstones) > self.compact_ratio * (self.root.size + len(self._tombstones)):
+            self.compact(self.compact_budget)
+        return True
+
+    def _revive(self, key, book):
+        """Re-inserting a tombstoned key reuses its stored slot"""
+        self._writable_tombstones().discard(key)
+        node = self._writable_root()
+        while True:
+            node.size += 1
+            i = self._bisect_left(node.keys, key)
+            if i < len(node.keys) and node.keys[i] == key:
+                node.books[i] = book
+                break
+            node = self._writable_child(node, i)
+        self._key_by_id[book.book_ID] = key
+
+    def compact(self, budget=None):
+        """Physically remove up to budget tombstones (all if None); returns how many were removed"""
+        if not self._tombstones:
+            return 0
+        keys = sorted(self._tombstones if budget is None else islice(self._tombstones, budget))
+        self._delete_batch(self._writable_root(), keys)
+        while not self.root.books and not self.root.leaf:
+            self.root = self.root.children[0]
+        self._writable_tombstones().difference_update(keys)
+        return len(keys)
+
+    # Negative-lookup filter
+    def _reserve_bloom(self, extra):
+        """Make room for extra more values, rebuilding the filter from the live entries if full"""
+        bloom = self._bloom
+        if bloom.count + extra > bloom.capacity:
+            capacity = max(2 * bloom.capacity, bloom.count + extra)
+            self._bloom = CountingBloomFilter(capacity, bloom.error_rate)
+            for book in self:
+                self._bloom.add(self.key(book))
+
+    def bloom_stats(self):
+        """Size and accuracy of the negative-lookup filter, or None when it is disabled"""
+        bloom = self._bloom
+        if bloom is None:
+            return None
+        return {
+            "items": bloom.count,
+            "capacity": bloom.capacity,
+            "hashes": bloom.hashes,
+            "false_positive_rate": bloom.false_positive_rate,
+            "memory_bytes": bloom.memory_bytes,
+            "rejected_lookups": self._bloom_rejects,
+        }
 
     # Core insertion operation
     def insert(self, book):
-        """Insert a book (organized by title)"""
-        root = self.root
+        """Insert a book (organized by key)"""
+        key = self._key(book)
+        if self._bloom is not None:
+            self._reserve_bloom(1)
+            self._bloom.add(key[0])
+        if key in self._tombstones:
+            self._revive(key, book)
+            return
+        self._insert_non_full(self._writable_root_with_room(), book, key)
+        self._key_by_id[book.book_ID] = key  # Shares the tuple stored in the leaf
+
+    def _writable_root_with_room(self):
+        """The writable root, split first if it is full"""
+        root = self._writable_root()
         if len(root.books) == (2 * self.t) - 1:  # Root is full
-            new_root = BTreeNode(self.t, False)
+            new_root = self._new_node(False)
             new_root.children.append(root)
+            new_root.size = root.size
             self._split_child(new_root, 0)
             self.root = new_root
-            self._insert_non_full(new_root, book)
-        else:
-            self._insert_non_full(root, book)
+            root = new_root
+        return root
 
-    def _insert_non_full(self, node, book):
-        """Insert into a non-full node"""
-        i = len(node.books) - 1
-        if node.leaf:
-            # Insert into leaf node
-            node.books.append(None)  # Temporary placeholder
-            while i >= 0 and book.title < node.books[i].title:
-                node.books[i + 1] = node.books[i]
-                i -= 1
-            node.books[i + 1] = book
-        else:
+    def _insert_non_full(self, node, book, key):
+        """Insert into a non-full node, splitting full children on the way down"""
+        max_keys = (2 * self.t) - 1
+        while not node.leaf:
+            node.size += 1
             # Find appropriate child
-            while i >= 0 and book.title < node.books[i].title:
-                i -= 1
-            i += 1
+            i = self._bisect_right(node.keys, key)
             # Split child if full
-            if len(node.children[i].books) == (2 * self.t) - 1:
+            if len(node.children[i].books) == max_keys:
                 self._split_child(node, i)
-                if book.title > node.books[i].title:
+                if node.keys[i] <= key:
                     i += 1
-            self._insert_non_full(node.children[i], book)
+            node = self._writable_child(node, i)
+        # Insert into leaf node after any equal keys
+        node.size += 1
+        i = self._bisect_right(node.keys, key)
+        node.keys.insert(i, key)
+        node.books.insert(i, book)
 
     def _split_child(self, parent, index):
         """Split a full child node"""
         t = self.t
-        child = parent.children[index]
-        new_child = BTreeNode(t, child.leaf)
-        
+        child = self._writable_child(parent, index)
+        new_child = self._new_node(child.leaf)
+
         # Move median to parent
         parent.books.insert(index, child.books[t - 1])
-        
+        parent.keys.insert(index, child.keys[t - 1])
+
         # Split books and children
         new_child.books = child.books[t:(2 * t - 1)]
+        new_child.keys = child.keys[t:(2 * t - 1)]
         child.books = child.books[0:(t - 1)]
-        
+        child.keys = child.keys[0:(t - 1)]
+
         if not child.leaf:
             new_child.children = child.children[t:(2 * t)]
             child.children = child.children[0:t]
-        
+
+        # Parent's subtree size is unchanged; re-derive the two halves
+        new_child.size = self._live_count(new_child.keys) + sum(c.size for c in new_child.children)
+        child.size -= new_child.size + self._weight(parent.keys[index])
+
         parent.children.insert(index + 1, new_child)
+        if self._instrument:
+            self._count("splits")
+
+    # Bottom-up bulk construction
+    def bulk_load(self, books):
+        """Replace the tree contents with books, built level by level (O(n) after one sort)"""
+        t = self.t
+        # Each key tuple is built once and shared by the nodes and _key_by_id
+        entries = sorted(((self._key(book), book) for book in books), key=itemgetter(0))
+        keys = [entry[0] for entry in entries]
+        items = [entry[1] for entry in entries]
+        del entries
+        self._key_by_id = {key[1]: key for key in keys}
+        self._tombstones, self._tombstones_shared = set(), False
+        if self._bloom is not None:
+            self._bloom = CountingBloomFilter(max(self._bloom.capacity, len(keys)), self._bloom.error_rate)
+            for key in keys:
+                self._bloom.add(key[0])
+        if not items:
+            self.root = self._new_node(True)
+            return
+
+        # Leaf level: each leaf takes up to 2t-1 books, the book after it is promoted
+        leaf_count = -(-(len(items) + 1) // (2 * t))
+        nodes, separators = [], []  # Separators are positions in items
+        base, extra = divmod(len(items) - (leaf_count - 1), leaf_count)
+        pos = 0
+        for j in range(leaf_count):
+            size = base + (1 if j < extra else 0)
+            leaf = self._new_node(True)
+            leaf.books = items[pos:pos + size]
+            leaf.keys = keys[pos:pos + size]
+            leaf.size = size
+            pos += size
+            nodes.append(leaf)
+            if j < leaf_count - 1:
+                separators.append(pos)
+                pos += 1
+
+        # Internal levels: group up to 2t children per node until one root remains
+        while len(nodes) > 1:
+            node_count = -(-len(nodes) // (2 * t))
+            base, extra = divmod(len(nodes), node_count)
+            parents, promoted = [], []
+            child_pos = key_pos = 0
+            for j in range(node_count):
+                fanout = base + (1 if j < extra else 0)
+                parent = self._new_node(False)
+                parent.children = nodes[child_pos:child_pos + fanout]
+                parent.books = [items[k] for k in separators[key_pos:key_pos + fanout - 1]]
+                parent.keys = [keys[k] for k in separators[key_pos:key_pos + fanout - 1]]
+                parent.size = len(parent.books) + sum(c.size for c in parent.children)
+                child_pos += fanout
+                key_pos += fanout - 1
+                parents.append(parent)
+                if j < node_count - 1:
+                    promoted.append(separators[key_pos])
+                    key_pos += 1
+            nodes, separators = parents, promoted
+
+        self.root = nodes[0]
 
     # Optimized search operations
-    def search(self, title):
-        """Search by title (O(log n) time)"""
-        return self._search_node(self.root, title)
+    def search(self, value):
+        """Search by key value (O(log n) time); the lowest book_ID wins among matches"""
+        entry = self._search_entry(value)
+        return None if entry is None else entry[0]
 
-    def _search_node(self, node, title):
-        """Recursive node search"""
-        if not node:
+    def _search_entry(self, value):
+        """(book, stored key) of the first live entry with this key value, or None"""
+        value = self.normalize(value)
+        if self._bloom is not None and value not in self._bloom:
+            self._bloom_rejects += 1
             return None
-        i = 0
-        while i < len(node.books) and title > node.books[i].title:
-            i += 1
-        if i < len(node.books) and title == node.books[i].title:
-            return node.books[i]
+        if self._tombstones:  # The first stored match may be dead; take the first live one
+            dead = self._tombstones
+            for book, key in self._entries_from(self.root, (value,)):
+                if key[0] != value:
+                    return None
+                if key not in dead:
+                    return book, key
+            return None
+        return self._search_node(self.root, value)
+
+    def _entries_from(self, node, lo):
+        """Yield (book, stored key) pairs of the subtree at node with key >= lo, tombstones included"""
+        i = self._bisect_left(node.keys, lo)
         if node.leaf:
+            for j in range(i, len(node.keys)):
+                yield node.books[j], node.keys[j]
+            return
+        yield from self._entries_from(node.children[i], lo)
+        for j in range(i, len(node.keys)):
+            yield node.books[j], node.keys[j]
+            yield from self._entries_from(node.children[j + 1], lo)  # Every key there is >= lo
+
+    def _search_node(self, node, value):
+        """Iterative lower-bound search for the first entry with this key value"""
+        probe = (value,)  # Sorts before every (value, book_ID)
+        found = None
+        while node:
+            keys = node.keys
+            i = self._bisect_left(keys, probe)
+            if i < len(keys) and keys[i][0] == value:
+                found = (node.books[i], keys[i])  # Any smaller match lies in children[i]
+            if node.leaf:
+                return found
+            node = node.children[i]
+        return found
+
+    def find_all(self, value):
+        """All books with exactly this key value, ordered by book_ID"""
+        if self._bloom is not None and self.normalize(value) not in self._bloom:
+            self._bloom_rejects += 1
+            return []
+        return list(self.range(value, value, inclusive=True))
+
+    def _find_key(self, key):
+        """Exact composite-key lookup (tombstones are not found)"""
+        if key in self._tombstones:
             return None
-        return self._search_node(node.children[i], title)
+        node = self.root
+        while True:
+            i = self._bisect_left(node.keys, key)
+            if i < len(node.keys) and node.keys[i] == key:
+                return node.books[i]
+            if node.leaf:
+                return None
+            node = node.children[i]
 
     # Efficient update operation
-    def update_availability(self, title, available):
+    def update_availability(self, value, available):
         """Update book availability (O(log n))"""
-        book = self.search(title)
+        book = self.search(value)
         if book:
             book.available = available
             return True
         return False
 
     # Complete B-tree deletion
-    def delete(self, title):
-        """Delete book by title"""
-        self._delete(self.root, title)
+    def delete(self, value):
+        """Delete the first book with this key value; returns True if a book was removed"""
+        entry = self._search_entry(value)
+        if entry is None:
+            return False
+        return self._delete_key(entry[1])
+
+    def delete_by_id(self, book_ID):
+        """Delete the book with this ID (O(log n)); returns True if it was removed"""
+        key = self._key_by_id.get(book_ID)
+        if key is None:
+            return False
+        return self._delete_key(key)
+
+    def _delete_key(self, key):
+        """Delete one entry with this exact composite key"""
+        if self.lazy_delete:
+            return self._tombstone(key)
+        deleted = self._delete(self._writable_root(), key)
         # Update root if it becomes empty
         if len(self.root.books) == 0 and not self.root.leaf:
             self.root = self.root.children[0]
+        if deleted and self._bloom is not None:
+            self._bloom.remove(key[0])
+        if deleted and self._key_by_id.get(key[1]) == key and self._find_key(key) is None:
+            del self._key_by_id[key[1]]
+        return deleted
+
+    def _delete(self, node, key):
+        """Delete from the subtree at node, topping up children on the way down"""
+        t = self.t
+        path = []  # (node, weight): subtree sizes shrink by weight if the key is found
+        weight = self._weight(key)  # Tombstones are already excluded from sizes
+        while True:
+            # Find key position
+            idx = self._bisect_left(node.keys, key)
+
+            # Case 1: Key in current node
+            if idx < len(node.keys) and node.keys[idx] == key:
+                if node.leaf:
+                    self._delete_from_leaf(node, idx)
+                    node.size -= weight
+                    for ancestor, w in path:
+                        ancestor.size -= w
+                    return True
+                path.append((node, weight))
+                node, key = self._delete_from_non_leaf(node, idx)
+                weight = self._weight(key)
+                continue
 
-    def _delete(self, node, title):
-        """Delete from node"""
-        # Find key position
-        idx = 0
-        while idx < len(node.books) and title > node.books[idx].title:
-            idx += 1
-        
-        # Case 1: Key in current node
-        if idx < len(node.books) and node.books[idx].title == title:
-            if node.leaf:
-                self._delete_from_leaf(node, idx)
-            else:
-                self._delete_from_non_leaf(node, idx)
-        else:
             # Case 2: Key in subtree
             if node.leaf:
-                return  # Key doesn't exist
-            
+                return False  # Key doesn't exist
+
             # Ensure child has enough keys
-            if len(node.children[idx].books) < self.t:
+            if len(node.children[idx].books) < t:
                 self._fill_child(node, idx)
-            
+
             # Determine which child to continue with
             if idx > len(node.books):
-                self._delete(node.children[idx - 1], title)
-            else:
-                self._delete(node.children[idx], title)
+                idx -= 1
+            path.append((node, weight))
+            node = self._writable_child(node, idx)
 
     def _delete_from_leaf(self, node, idx):
-        """Delete from leaf node"""
+        """Delete from leaf node (the caller adjusts sizes)"""
         node.books.pop(idx)
+        node.keys.pop(idx)
 
     def _delete_from_non_leaf(self, node, idx):
-        """Delete from internal node"""
-        title = node.books[idx].title
-        
+        """Delete from internal node; returns the (child, key) still to delete"""
+        key = node.keys[idx]
+
         # Case 3a: Left child has enough keys
         if len(node.children[idx].books) >= self.t:
-            predecessor = self._get_predecessor(node, idx)
-            node.books[idx] = predecessor
-            self._delete(node.children[idx], predecessor.title)
-        
+            node.books[idx], node.keys[idx] = self._get_predecessor(node, idx)
+            return self._writable_child(node, idx), node.keys[idx]
+
         # Case 3b: Right child has enough keys
-        elif len(node.children[idx + 1].books) >= self.t:
-            successor = self._get_successor(node, idx)
-            node.books[idx] = successor
-            self._delete(node.children[idx + 1], successor.title)
-        
+        if len(node.children[idx + 1].books) >= self.t:
+            node.books[idx], node.keys[idx] = self._get_successor(node, idx)
+            return self._writable_child(node, idx + 1), node.keys[idx]
+
         # Case 3c: Merge children
-        else:
-            self._merge_children(node, idx)
-            self._delete(node.children[idx], title)
+        self._merge_children(node, idx)
+        return self._writable_child(node, idx), key
 
     def _get_predecessor(self, node, idx):
-        """Get predecessor key"""
+        """Get the predecessor entry as (book, stored key)"""
         current = node.children[idx]
         while not current.leaf:
             current = current.children[-1]
-        return current.books[-1]
+        return current.books[-1], current.keys[-1]
 
     def _get_successor(self, node, idx):
-        """Get successor key"""
+        """Get the successor entry as (book, stored key)"""
         current = node.children[idx + 1]
         while not current.leaf:
             current = current.children[0]
-        return current.books[0]
+        return current.books[0], current.keys[0]
 
     def _fill_child(self, node, idx):
         """Fill underflowing child"""
@@ -179,74 +544,569 @@ class BTree:
 
     def _borrow_from_prev(self, node, idx):
         """Borrow from left sibling"""
-        child = node.children[idx]
-        sibling = node.children[idx - 1]
-        
+        child = self._writable_child(node, idx)
+        sibling = self._writable_child(node, idx - 1)
+
         # Shift keys and children
         child.books.insert(0, node.books[idx - 1])
+        child.keys.insert(0, node.keys[idx - 1])
+        moved = 0
         if not child.leaf:
             child.children.insert(0, sibling.children.pop())
-        
+            moved = child.children[0].size
+        child.size += moved + self._weight(node.keys[idx - 1])
+        sibling.size -= moved + self._weight(sibling.keys[-1])
+
         node.books[idx - 1] = sibling.books.pop()
+        node.keys[idx - 1] = sibling.keys.pop()
+        if self._instrument:
+            self._count("borrows")
 
     def _borrow_from_next(self, node, idx):
         """Borrow from right sibling"""
-        child = node.children[idx]
-        sibling = node.children[idx + 1]
-        
+        child = self._writable_child(node, idx)
+        sibling = self._writable_child(node, idx + 1)
+
         # Shift keys and children
         child.books.append(node.books[idx])
+        child.keys.append(node.keys[idx])
+        moved = 0
         if not child.leaf:
             child.children.append(sibling.children.pop(0))
-        
+            moved = child.children[-1].size
+        child.size += moved + self._weight(node.keys[idx])
+        sibling.size -= moved + self._weight(sibling.keys[0])
+
         node.books[idx] = sibling.books.pop(0)
+        node.keys[idx] = sibling.keys.pop(0)
+        if self._instrument:
+            self._count("borrows")
 
     def _merge_children(self, node, idx):
-        """Merge two children"""
-        child = node.children[idx]
+        """Merge two children (the absorbed sibling is only read)"""
+        child = self._writable_child(node, idx)
         sibling = node.children[idx + 1]
-        
+
         # Move key from parent to child
+        separator = node.keys.pop(idx)
         child.books.append(node.books.pop(idx))
-        
+        child.keys.append(separator)
+
         # Merge keys
         child.books.extend(sibling.books)
-        
+        child.keys.extend(sibling.keys)
+        child.size += self._weight(separator) + sibling.size
+
         # Merge children if not leaf
         if not child.leaf:
             child.children.extend(sibling.children)
-        
+
         # Remove merged sibling
         node.children.pop(idx + 1)
+        if self._instrument:
+            self._count("merges")
 
-    # Traversal with callback (memory efficient)
-    def traverse(self, callback=None):
-        if callback is not None:
-          self._inorder_traverse(self.root, callback)
-          return None
-        else:
-          results = []
-          self._inorder_traverse(self.root, lambda book: results.append(book))
-          return results    
-    def _inorder_traverse(self, node, callback):
-           
-        if node is None:
+    # Batch operations: one walk per batch, rebalancing each touched node once
+    def insert_many(self, books):
+        """Insert a batch of books in one pass; returns how many were inserted"""
+        entries = sorted(((self._key(book), book) for book in books), key=itemgetter(0))
+        count = len(entries)
+        if self._bloom is not None:
+            self._reserve_bloom(count)
+            for key, _ in entries:
+                self._bloom.add(key[0])
+        if self._tombstones:  # Tombstoned keys are revived in place rather than stored twice
+            dead = [entry for entry in entries if entry[0] in self._tombstones]
+            for key, book in dead:
+                self._revive(key, book)
+            revived = {key for key, _ in dead}
+            entries = [entry for entry in entries if entry[0] not in revived]
+        if not entries:
+            return count
+        if len(entries) * self.SPARSE_BATCH < len(self):
+            for key, book in entries:
+                self._insert_non_full(self._writable_root_with_room(), book, key)
+                self._key_by_id[key[1]] = key
+            return count
+        self._insert_batch(self._writable_root(), entries)
+        while len(self.root.books) > (2 * self.t) - 1:  # Grow until the root fits
+            size = self.root.size
+            nodes, books, keys = self._split_wide(self.root)
+            self.root = self._new_node(False)
+            self.root.children, self.root.books, self.root.keys = nodes, books, keys
+            self.root.size = size
+        for key, _ in entries:
+            self._key_by_id[key[1]] = key
+        return count
+
+    def delete_many(self, values):
+        """Delete the first book for each key value in one pass; returns how many were removed"""
+        found = self._search_many(sorted({self.normalize(value) for value in values}))
+        return self._delete_keys([key for _, key in found.values()])
+
+    def delete_many_by_id(self, book_IDs):
+        """Delete the books with these IDs in one pass; returns how many were removed"""
+        keys = (self._key_by_id.get(book_ID) for book_ID in book_IDs)
+        return self._delete_keys([key for key in keys if key is not None])
+
+    def update_availability_many(self, updates):
+        """Apply (value, available) pairs in one pass; returns how many books matched"""
+        wanted = {self.normalize(value): available for value, available in updates}
+        found = self._search_many(sorted(wanted))
+        for value, (book, _) in found.items():
+            book.available = wanted[value]
+        return len(found)
+
+    def _search_many(self, values):
+        """Lower-bound lookups for sorted key values; returns {value: (book, stored key)}
+
+        Each value gets its own descent: routing the whole batch down
+        together cost more in per-node grouping than the shared upper
+        levels saved. Sorted order keeps consecutive descents on
+        neighbouring nodes, and the Bloom filter drops absent values first.
+        """
+        if self._bloom is not None:
+            values = [value for value in values if value in self._bloom]
+        found = {}
+        root = self.root
+        for value in values:
+            entry = self._search_node(root, value)
+            if entry is not None:
+                found[value] = entry
+        if self._tombstones:  # A dead lower bound falls back to the live-aware search
+            for value, (_, key) in list(found.items()):
+                if key in self._tombstones:
+                    entry = self._search_entry(value)
+                    if entry is None:
+                        del found[value]
+                    else:
+                        found[value] = entry
+        return found
+
+    def _insert_batch(self, node, entries):
+        """Merge sorted (key, book) entries into a writable subtree, splitting children once"""
+        node.size += len(entries)
+        if node.leaf:
+            if len(entries) == 1:  # The usual case for a batch spread over a large tree
+                key, book = entries[0]
+                i = self._bisect_right(node.keys, key)
+                node.keys.insert(i, key)
+                node.books.insert(i, book)
+                return
+            # Two sorted runs: the stable sort merges them in C, leaf entries first on ties
+            merged = list(zip(node.keys, node.books))
+            merged.extend(entries)
+            merged.sort(key=itemgetter(0))
+            node.keys = [entry[0] for entry in merged]
+            node.books = [entry[1] for entry in merged]
             return
-        for i in range(len(node.books)):
+        groups = {}
+        lo = 0
+        for entry in entries:
+            lo = self._bisect_right(node.keys, entry[0], lo)
+            groups.setdefault(lo, []).append(entry)
+        # Right to left, so splicing split pieces in keeps lower indices valid
+        for i in sorted(groups, reverse=True):
+            child = self._writable_child(node, i)
+            self._insert_batch(child, groups[i])
+            if len(child.books) > (2 * self.t) - 1:
+                nodes, books, keys = self._split_wide(child)
+                node.children[i:i + 1] = nodes
+                node.books[i:i] = books
+                node.keys[i:i] = keys
+
+    def _split_wide(self, node):
+        """Split an overfull writable node into legal nodes; returns (nodes, separator books, separator keys)"""
+        t = self.t
+        books, keys, children = node.books, node.keys, node.children
+        count = -(-(len(books) + 1) // (2 * t))
+        base, extra = divmod(len(books) - (count - 1), count)
+        nodes, sep_books, sep_keys = [], [], []
+        pos = 0
+        for j in range(count):
+            size = base + (1 if j < extra else 0)
+            piece = node if j == 0 else self._new_node(node.leaf)
+            piece.books = books[pos:pos + size]
+            piece.keys = keys[pos:pos + size]
             if not node.leaf:
-                self._inorder_traverse(node.children[i], callback)
-            callback(node.books[i])
-        if not node.leaf:
-            self._inorder_traverse(node.children[-1], callback)
+                piece.children = children[pos:pos + size + 1]
+            piece.size = self._live_count(piece.keys) + sum(child.size for child in piece.children)
+            nodes.append(piece)
+            pos += size
+            if j < count - 1:
+                sep_books.append(books[pos])
+                sep_keys.append(keys[pos])
+                pos += 1
+        if self._instrument:
+            self._count("splits", count - 1)
+        return nodes, sep_books, sep_keys
+
+    def _delete_keys(self, keys):
+        """Delete one entry per distinct exact key in a single walk"""
+        keys = sorted(set(keys))
+        if self.lazy_delete:
+            return sum(self._tombstone(key) for key in keys)
+        if not keys:
+            return 0
+        if len(keys) * self.SPARSE_BATCH < len(self):
+            return sum(self._delete_key(key) for key in keys)
+        removed = self._delete_batch(self._writable_root(), keys)
+        while not self.root.books and not self.root.leaf:
+            self.root = self.root.children[0]
+        for key in keys:  # Every key comes from a live entry, so all of them were removed
+            if self._bloom is not None:
+                self._bloom.remove(key[0])
+            if self._key_by_id.get(key[1]) == key:
+                del self._key_by_id[key[1]]
+        return removed
+
+    def _delete_batch(self, node, keys):
+        """Remove sorted keys from a writable subtree; returns how many were found
+
+        Afterwards every node below this one is legal, except that an
+        internal node left with no keys may hang on to a single underfull
+        child. The caller rebalances this node itself.
+        """
+        if node.leaf:
+            doomed = set(keys)
+            books, leaf_keys = [], []
+            for book, key in zip(node.books, node.keys):
+                if key in doomed:
+                    doomed.discard(key)  # One entry per key
+                else:
+                    books.append(book)
+                    leaf_keys.append(key)
+            removed = len(node.books) - len(books)
+            node.books, node.keys = books, leaf_keys
+            node.size = self._live_count(leaf_keys)
+            return removed
+
+        groups, separators = {}, []
+        lo = 0
+        for key in keys:
+            i = lo = self._bisect_left(node.keys, key, lo)
+            if i < len(node.keys) and node.keys[i] == key:
+                separators.append(i)
+            else:
+                groups.setdefault(i, []).append(key)
+        removed = 0
+        for i, group in groups.items():
+            removed += self._delete_batch(self._writable_child(node, i), group)
+        for i in reversed(separators):
+            self._drop_separator(node, i)
+        removed += len(separators)
+        self._rebalance_children(node)
+        node.size = self._live_count(node.keys) + sum(child.size for child in node.children)
+        return removed
+
+    def _drop_separator(self, node, i):
+        """Remove separator i, refilling it from the neighbouring subtrees"""
+        if self._holds_entries(node.children[i]):
+            book, key = self._pop_edge(self._writable_child(node, i), last=True)
+        elif self._holds_entries(node.children[i + 1]):
+            book, key = self._pop_edge(self._writable_child(node, i + 1), last=False)
+        else:  # Both sides are empty: drop one of them with the separator
+            node.books.pop(i)
+            node.keys.pop(i)
+            node.children.pop(i + 1)
+            return
+        node.books[i] = book
+        node.keys[i] = key
 
+    @staticmethod
+    def _holds_entries(node):
+        """Whether a subtree stores anything, tombstones included (size counts only live keys)"""
+        while not node.books and not node.leaf:
+            node = node.children[0]
+        return bool(node.books)
 
+    def _pop_edge(self, node, last):
+        """Remove the largest (or smallest) entry from a writable subtree"""
+        path = []
+        while not node.leaf:
+            path.append(node)
+            node = self._writable_child(node, len(node.children) - 1 if last else 0)
+        i = len(node.books) - 1 if last else 0
+        book, key = node.books.pop(i), node.keys.pop(i)
+        node.size = self._live_count(node.keys)
+        for parent in reversed(path):
+            self._rebalance_children(parent)
+            parent.size = self._live_count(parent.keys) + sum(child.size for child in parent.children)
+        return book, key
+
+    def _rebalance_children(self, node):
+        """Merge or redistribute underfull children of node, left to right"""
+        t = self.t
+        i = 0
+        while i < len(node.children):
+            if len(node.children[i].books) >= t - 1 or len(node.children) == 1:
+                i += 1
+                continue
+            j = i if i + 1 < len(node.children) else i - 1
+            self._merge_children(node, j)
+            merged = node.children[j]
+            if not merged.leaf:  # The seam between the two halves may be underfull
+                self._rebalance_children(merged)
+            if len(merged.books) > (2 * t) - 1:
+                nodes, books, keys = self._split_wide(merged)
+                node.children[j:j + 1] = nodes
+                node.books[j:j] = books
+                node.keys[j:j] = keys
+            i = j
+
+    # Traversal with callback (memory efficient)
+    def traverse(self, callback=None):
+        """Visit books in key order; returns a list when no callback is given"""
+        if callback is None:
+            return list(self)
+        for book in self:
+            callback(book)
+        return None
+
+    # Lazy iteration and range scans
+    def __iter__(self):
+        """Yield every book in key order"""
+        return self._iter_from(None)
+
+    def range(self, lo=None, hi=None, inclusive=False):
+        """Yield books with lo <= key < hi (<= hi if inclusive) in key order"""
+        key = self.key
+        if hi is not None:
+            hi = self.normalize(hi)
+        for book in self._iter_from(None if lo is None else (self.normalize(lo),)):
+            if hi is not None:
+                value = key(book)
+                if value > hi if inclusive else value >= hi:
+                    return
+            yield book
+
+    def prefix(self, prefix):
+        """Yield books whose (string) key starts with prefix in key order"""
+        key = self.key
+        prefix = self.normalize(prefix)
+        for book in self._iter_from((prefix,)):
+            if not key(book).startswith(prefix):
+                return
+            yield book
+
+    def _iter_from(self, lo):
+        """In-order cursor: descend once to the first key >= lo, then walk lazily"""
+        # Each frame is (node, i): the next thing to emit from node is books[i]
+        stack = []
+        node = self.root
+        while True:
+            i = 0 if lo is None else self._bisect_left(node.keys, lo)
+            stack.append((node, i))
+            if node.leaf:
+                break
+            node = node.children[i]
+        return self._walk(stack)
+
+    def _iter_at(self, k):
+        """In-order cursor positioned at the k-th book (0-based) using subtree sizes"""
+        if k >= self.root.size:
+            return iter(())
+        dead = self._tombstones  # Sizes count live entries only
+        stack = []
+        node = self.root
+        k = max(k, 0)
+        while not node.leaf:
+            i = 0
+            while True:
+                child_size = node.children[i].size
+                if k < child_size:
+                    break
+                k -= child_size
+                if not dead or node.keys[i] not in dead:
+                    if k == 0:  # The separator after child i is the k-th book
+                        stack.append((node, i))
+                        return self._walk(stack)
+                    k -= 1
+                i += 1
+            stack.append((node, i))
+            node = node.children[i]
+        if dead:  # Step over tombstones to the k-th live entry of the leaf
+            for j, key in enumerate(node.keys):
+                if key not in dead:
+                    if k == 0:
+                        break
+                    k -= 1
+            k = j
+        stack.append((node, k))
+        return self._walk(stack)
+
+    def _walk(self, stack):
+        """Yield books in order starting from a cursor stack, skipping tombstones"""
+        dead = self._tombstones
+        while stack:
+            node, i = stack.pop()
+            if node.leaf:
+                if dead:
+                    for j in range(i, len(node.books)):
+                        if node.keys[j] not in dead:
+                            yield node.books[j]
+                else:
+                    for j in range(i, len(node.books)):
+                        yield node.books[j]
+                continue
+            if i < len(node.books):
+                if not dead or node.keys[i] not in dead:
+                    yield node.books[i]
+                stack.append((node, i + 1))
+                child = node.children[i + 1]
+                while True:
+                    stack.append((child, 0))
+                    if child.leaf:
+                        break
+                    child = child.children[0]
+
+    # Order statistics (subtree sizes)
+    def __len__(self):
+        """Number of books in the tree (O(1))"""
+        return self.root.size
+
+    def select(self, k):
+        """Return the k-th book in key order (0-based)"""
+        for book in self._iter_at(k):
+            return book
+        raise IndexError(f"Book index {k} out of range")
+
+    def rank(self, value):
+        """Number of books whose key sorts before value"""
+        probe = (self.normalize(value),)
+        dead = self._tombstones
+        rank = 0
+        node = self.root
+        while True:
+            i = self._bisect_left(node.keys, probe)
+            rank += self._live_count(node.keys[:i]) if dead else i
+            if node.leaf:
+                return rank
+            for j in range(i):
+                rank += node.children[j].size
+            node = node.children[i]
+
+    def page(self, offset, limit):
+        """Books at positions offset .. offset+limit-1 in key order"""
+        return list(islice(self._iter_at(offset), limit))
+
+    # Instrumentation
+    @property
+    def instrumented(self):
+        """Whether comparisons, splits, merges and borrows are being counted"""
+        return self._instrument
+
+    @instrumented.setter
+    def instrumented(self, enabled):
+        self._instrument = bool(enabled)
+
+    def _count(self, counter, amount=1):
+        """Add to a work counter (callers check _instrument first)"""
+        self._counters[counter] += amount
+
+    def _bisect_left(self, a, x, lo=0):
+        """bisect_left, counting its key comparisons while instrumented"""
+        if not self._instrument:
+            return bisect_left(a, x, lo)
+        hi = len(a)
+        steps = 0
+        while lo < hi:
+            mid = (lo + hi) // 2
+            steps += 1
+            if a[mid] < x:
+                lo = mid + 1
+            else:
+                hi = mid
+        self._count("comparisons", steps)
+        return lo
+
+    def _bisect_right(self, a, x, lo=0):
+        """bisect_right, counting its key comparisons while instrumented"""
+        if not self._instrument:
+            return bisect_right(a, x, lo)
+        hi = len(a)
+        steps = 0
+        while lo < hi:
+            mid = (lo + hi) // 2
+            steps += 1
+            if x < a[mid]:
+                hi = mid
+            else:
+                lo = mid + 1
+        self._count("comparisons", steps)
+        return lo
+
+    def reset_counters(self):
+        """Zero the cumulative counters"""
+        self._counters.update(dict.fromkeys(_COUNTERS, 0))
+
+    def stats(self):
+        """Shape of the tree and its cumulative work counters
+
+        height counts levels (a lone root is 1). fill is keys stored over the
+        2t - 1 key capacity of the nodes, overall and per level from the root
+        down. The counters only move while the tree is instrumented.
+        """
+        max_keys = (2 * self.t) - 1
+        levels = []
+        level = [self.root]
+        while level:
+            keys = sum(len(node.keys) for node in level)
+            levels.append({"nodes": len(level), "keys": keys, "fill": keys / (len(level) * max_keys)})
+            level = [child for node in level for child in node.children]
+        nodes = sum(level["nodes"] for level in levels)
+        keys = sum(level["keys"] for level in levels)
+        return {
+            "t": self.t,
+            "height": len(levels),
+            "nodes": nodes,
+            "entries": len(self),
+            "tombstones": len(self._tombstones),
+            "fill": keys / (nodes * max_keys),
+            "levels": levels,
+            "instrumented": self.instrumented,
+            **self._counters,
+            "bloom": self.bloom_stats(),
+        }
 
     def print_tree(self, node=None, level=0):
-        """Print the B-tree structure with titles"""
+        """Print the B-tree structure with key values"""
         if node is None:
             node = self.root
 
-        print("  " * level + "|-- " + str([book.title for book in node.books]))
+        print("  " * level + "|-- " + str([key[0] for key in node.keys]))
         if not node.leaf:
             for child in node.children:
                 self.print_tree(child, level + 1)
+
+
+class BTreeSnapshot(BTree):
+    """Immutable view of a BTree as it was when snapshot() was called
+
+    Structure (membership and order) is frozen; Book records themselves are
+    shared with the live tree, and so is the tombstone set until the live
+    tree next changes it.
+    """
+
+    def __init__(self, root, t, key, normalize, tombstones):
+        self.root = root
+        self.t = t
+        self.key = key
+        self.normalize = normalize
+        self.lazy_delete = False
+        self._tombstones = tombstones
+        self._bloom = None  # The live tree's filter keeps changing
+        self._counters = dict.fromkeys(_COUNTERS, 0)
+        self._instrument = False
+        self._key_by_id = {}
+        self._epoch = -1  # Never matches a node, so nothing is writable
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("BTree snapshots are read-only")
+
+    insert = bulk_load = delete = delete_by_id = update_availability = _read_only
+    insert_many = delete_many = delete_many_by_id = update_availability_many = compact = _read_only
+
+    def snapshot(self):
+        """A snapshot is already immutable"""
+        return self
@@ -1,6 +1,12 @@
+_NO_CHILDREN = ()  # Shared by every leaf instead of an empty list per leaf
+
 class BTreeNode:
-    def __init__(self, t, leaf=False):
-        self.t = t  # Minimum degree (defines the range for number of keys)
+    __slots__ = ("books", "keys", "children", "size", "leaf", "epoch")
+
+    def __init__(self, leaf=False):
         self.books = []  # List of books
-        self.children = []  # List of child nodes
+        self.keys = []  # Parallel sorted (key, book_ID) keys for binary search
+        self.children = _NO_CHILDREN if leaf else []  # List of child nodes
+        self.size = 0  # Number of books in this subtree
         self.leaf = leaf
+        self.epoch = 0  # Tree epoch that owns this node (copy-on-write)
@@ -0,0 +1,325 @@
+import threading
+
+from models.btree import BTree
+from models.btreenode import BTreeNode
+
+class RWLatch:
+    """Reader-writer latch: many readers or one writer, waiting writers go first"""
+    __slots__ = ("_cond", "_readers", "_writer", "_waiting_writers")
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+
+class LatchedBTreeNode(BTreeNode):
+    """B-tree node carrying its own reader-writer latch"""
+    __slots__ = ("latch",)
+
+    def __init__(self, leaf=False):
+        super().__init__(leaf)
+        self.latch = RWLatch()
+
+
+class ConcurrentBTree(BTree):
+    """Thread-safe BTree using per-node latches with top-down lock coupling
+
+    Searches take shared latches hand over hand, so they never block each
+    other. Writers split or refill children before stepping into them, which
+    keeps every restructuring local to the parent/child pair they hold.
+    Scans (iteration, range, prefix, page, rank) run on an O(1) snapshot.
+    """
+
+    def __init__(self, t=3, key=None, normalize=None, key_stripes=64):
+        """Initialize an empty concurrent B-tree with minimum degree t"""
+        self._root_latch = RWLatch()  # Guards the root pointer
+        self._gate = RWLatch()  # Shared by writers; exclusive for snapshot and bulk_load
+        self._meta_lock = threading.Lock()  # Guards _key_by_id
+        self._counter_lock = threading.Lock()  # Guards the work counters while instrumented
+        self._key_locks = [threading.Lock() for _ in range(key_stripes)]  # Same-key deletes
+        super().__init__(t, key, normalize)
+
+    def _new_node(self, leaf):
+        node = LatchedBTreeNode(leaf)
+        node.epoch = self._epoch
+        return node
+
+    # Readers
+    def _search_entry(self, value):
+        """(book, stored key) of the first entry with this key value, with shared latch coupling"""
+        value = self.normalize(value)
+        probe = (value,)
+        found = None
+        node = self._latched_root()
+        while True:
+            i = self._bisect_left(node.keys, probe)
+            if i < len(node.keys) and node.keys[i][0] == value:
+                found = (node.books[i], node.keys[i])
+            if node.leaf:
+                node.latch.release_read()
+                return found
+            node = self._step_down(node, node.children[i])
+
+    def _find_key(self, key):
+        """Exact composite-key lookup with shared latch coupling"""
+        node = self._latched_root()
+        while True:
+            i = self._bisect_left(node.keys, key)
+            if i < len(node.keys) and node.keys[i] == key:
+                book = node.books[i]
+                node.latch.release_read()
+                return book
+            if node.leaf:
+                node.latch.release_read()
+                return None
+            node = self._step_down(node, node.children[i])
+
+    def _latched_root(self):
+        """Read-latch the current root"""
+        self._root_latch.acquire_read()
+        node = self.root
+        node.latch.acquire_read()
+        self._root_latch.release_read()
+        return node
+
+    def _count(self, counter, amount=1):
+        """Writers on different subtrees restructure at once, so updates take a lock"""
+        with self._counter_lock:
+            self._counters[counter] += amount
+
+    @staticmethod
+    def _step_down(node, child):
+        """Shared lock coupling: latch the child before letting go of the parent"""
+        child.latch.acquire_read()
+        node.latch.release_read()
+        return child
+
+    # Scans run against a stable version
+    def snapshot(self):
+        """O(1) read-only view; waits only for writers already in flight"""
+        self._gate.acquire_write()
+        try:
+            return super().snapshot()
+        finally:
+            self._gate.release_write()
+
+    def _iter_from(self, lo):
+        return self.snapshot()._iter_from(lo)
+
+    def _iter_at(self, k):
+        return self.snapshot()._iter_at(k)
+
+    def rank(self, value):
+        """Number of books whose key sorts before value"""
+        return self.snapshot().rank(value)
+
+    def stats(self):
+        """Shape of a consistent snapshot plus this tree's counters"""
+        stats = self.snapshot().stats()
+        stats.update(self._counters, instrumented=self.instrumented)
+        return stats
+
+    def bulk_load(self, books):
+        """Replace the contents while no writer is active"""
+        self._gate.acquire_write()
+        self._root_latch.acquire_write()
+        try:
+            super().bulk_load(books)
+        finally:
+            self._root_latch.release_write()
+            self._gate.release_write()
+
+    # Writers
+    def insert(self, book):
+        """Insert with exclusive lock coupling, splitting full children before entering them"""
+        key = self._key(book)
+        max_keys = (2 * self.t) - 1
+        self._gate.acquire_read()
+        try:
+            self._root_latch.acquire_write()
+            root = self._writable_root()
+            root.latch.acquire_write()
+            if len(root.books) == max_keys:  # Root is full
+                new_root = self._new_node(False)
+                new_root.children.append(root)
+                new_root.size = root.size
+                new_root.latch.acquire_write()
+                self._split_child(new_root, 0)
+                self.root = new_root
+                root.latch.release_write()
+                root = new_root
+            self._root_latch.release_write()
+
+            node = root
+            while not node.leaf:
+                node.size += 1
+                i = self._bisect_right(node.keys, key)
+                child = self._writable_child(node, i)
+                child.latch.acquire_write()
+                if len(child.books) == max_keys:
+                    self._split_child(node, i)
+                    if node.keys[i] <= key:
+                        child.latch.release_write()
+                        child = node.children[i + 1]
+                        child.latch.acquire_write()
+                node.latch.release_write()
+                node = child
+            node.size += 1
+            i = self._bisect_right(node.keys, key)
+            node.keys.insert(i, key)
+            node.books.insert(i, book)
+            node.latch.release_write()
+        finally:
+            self._gate.release_read()
+        with self._meta_lock:
+            self._key_by_id[book.book_ID] = key
+
+    # Batches run key by key so every step keeps its latch protocol
+    def insert_many(self, books):
+        """Insert books in key order; returns how many were inserted"""
+        books = sorted(books, key=self._key)
+        for book in books:
+            self.insert(book)
+        return len(books)
+
+    def delete_many(self, values):
+        """Delete the first book for each key value; returns how many were removed"""
+        return sum(self.delete(value) for value in {self.normalize(value) for value in values})
+
+    def delete_many_by_id(self, book_IDs):
+        """Delete the books with these IDs; returns how many were removed"""
+        return sum(self.delete_by_id(book_ID) for book_ID in set(book_IDs))
+
+    def update_availability_many(self, updates):
+        """Apply (value, available) pairs; returns how many books matched"""
+        wanted = {self.normalize(value): available for value, available in updates}
+        return sum(self.update_availability(value, available) for value, available in wanted.items())
+
+    def _delete_key(self, key):
+        """Delete one entry with this exact key"""
+        # Deletes of the same key are serialized so the existence check stays true
+        with self._key_locks[hash(key) % len(self._key_locks)]:
+            if self._find_key(key) is None:
+                return False
+            self._gate.acquire_read()
+            try:
+                self._delete_latched(key)
+            finally:
+                self._gate.release_read()
+            with self._meta_lock:
+                if self._key_by_id.get(key[1]) == key and self._find_key(key) is None:
+                    del self._key_by_id[key[1]]
+            return True
+
+    def _delete_latched(self, key):
+        """Top-down delete of a key known to exist, holding at most a parent/child pair"""
+        t = self.t
+        self._root_latch.acquire_write()
+        node = self._writable_root()
+        node.latch.acquire_write()
+        at_root = True
+        while True:
+            node.size -= 1
+            idx = self._bisect_left(node.keys, key)
+            if idx < len(node.keys) and node.keys[idx] == key:
+                if node.leaf:
+                    node.books.pop(idx)
+                    node.keys.pop(idx)
+                    break
+                left = self._writable_child(node, idx)
+                left.latch.acquire_write()
+                right = self._writable_child(node, idx + 1)
+                right.latch.acquire_write()
+                if len(left.books) >= t or len(right.books) >= t:
+                    # Replace with predecessor/successor; node stays latched so nothing
+                    # else can enter this subtree until the replacement is in place
+                    if at_root:
+                        self._root_latch.release_write()
+                        at_root = False
+                    use_left = len(left.books) >= t
+                    (right if use_left else left).latch.release_write()
+                    node.books[idx], node.keys[idx] = self._pop_extreme(left if use_left else right, use_left)
+                    break
+                self._merge_children(node, idx)
+                right.latch.release_write()
+                child = left
+            else:
+                child = self._writable_child(node, idx)
+                child.latch.acquire_write()
+                if len(child.books) < t:
+                    child = self._fill_latched(node, idx, child)
+
+            if at_root:
+                if not node.books and not node.leaf:  # Root emptied by a merge
+                    self.root = child
+                self._root_latch.release_write()
+                at_root = False
+            node.latch.release_write()
+            node = child
+
+        if at_root:
+            self._root_latch.release_write()
+        node.latch.release_write()
+
+    def _pop_extreme(self, node, last):
+        """Remove the largest (or smallest) entry under a latched node; returns (book, stored key)"""
+        t = self.t
+        while True:
+            node.size -= 1
+            if node.leaf:
+                i = len(node.books) - 1 if last else 0
+                key = node.keys.pop(i)
+                book = node.books.pop(i)
+                node.latch.release_write()
+                return book, key
+            idx = len(node.children) - 1 if last else 0
+            child = self._writable_child(node, idx)
+            child.latch.acquire_write()
+            if len(child.books) < t:
+                child = self._fill_latched(node, idx, child)
+            node.latch.release_write()
+            node = child
+
+    def _fill_latched(self, node, idx, child):
+        """Latch the siblings, top up child, and return the node to continue into"""
+        prev = nxt = None
+        if idx > 0:
+            prev = self._writable_child(node, idx - 1)
+            prev.latch.acquire_write()
+        if idx < len(node.children) - 1:
+            nxt = self._writable_child(node, idx + 1)
+            nxt.latch.acquire_write()
+        into_prev = nxt is None and len(prev.books) < self.t
+        self._fill_child(node, idx)
+        target = prev if into_prev else child
+        for sibling in (prev, child, nxt):
+            if sibling is not None and sibling is not target:
+                sibling.latch.release_write()
+        return target
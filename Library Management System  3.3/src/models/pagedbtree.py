@@ -0,0 +1,750 @@
+
+import mmap
+import os
+import struct
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from itertools import islice
+
+from models.Book import Book, normalize_title
+from models.Genre import Genre
+
+# Page 0: magic, version, page_size, t, root page, page count, free list head, record count,
+# first page of the ID map chain
+_HEADER = struct.Struct("<8sIIIIIIQI")
+_MAGIC = b"LIBBTREE"
+_VERSION = 4
+# Node page: leaf flag, number of records
+_NODE = struct.Struct("<BH")
+# Record: book_ID, publication_year, borrow_count, available, then 3 length-prefixed strings
+_RECORD = struct.Struct("<qiiB")
+_STR_LEN = struct.Struct("<H")
+_CHILD = struct.Struct("<I")
+# ID map log page: next (older) page of the chain (0 ends it), number of entries; each
+# entry is a live flag, book_ID and the length-prefixed normalized title (empty for a delete)
+_ID_PAGE = struct.Struct("<IH")
+_ID_ENTRY = struct.Struct("<BqH")
+# Log entries allowed beyond twice the live IDs before flush() rewrites the chain compactly
+_ID_LOG_SLACK = 64
+
+
+class _PageNode:
+    """Decoded B-tree node held in the buffer pool"""
+    __slots__ = ("page_id", "leaf", "keys", "books", "children")
+
+    def __init__(self, page_id, leaf):
+        self.page_id = page_id
+        self.leaf = leaf
+        self.keys = []  # Sorted (normalized title, book_ID) keys
+        self.books = []  # Parallel list of books
+        self.children = []  # Child page ids (internal nodes only)
+
+
+class PagedBTree:
+    """Persistent B-tree organized by (normalized title, book_ID), one node per fixed-size page
+
+    Pages are read through mmap and cached in an LRU buffer pool of at most
+    cache_pages decoded clean nodes. Modified nodes stay pinned in memory and
+    pages freed by deletes are not reused on disk until flush(), so between
+    flushes the file still holds exactly the tree of the last flush and a
+    crash loses only the unflushed changes. flush() itself (and bulk_load())
+    writes pages in place, so a crash part-way through one can still tear
+    the file. Titles are keyed by normalize_title like the in-memory
+    trees, so lookups ignore case. Books returned by lookups are decoded
+    copies, so change availability through update_availability() or
+    update_by_id() to persist it.
+
+    A book_ID -> normalized title map is kept as a log in a chain of pages
+    of its own, so delete_by_id() and update_by_id() are a single keyed
+    descent. The log is replayed on first use, so opening a file stays
+    O(1); flush() appends only the IDs added or removed since the last
+    flush and rewrites the chain once stale entries outnumber live ones.
+    """
+
+    def __init__(self, path, t=16, page_size=8192, cache_pages=256):
+        """Open the page file at path, creating it if needed"""
+        self.path = path
+        self.cache_pages = cache_pages
+        self._pool = OrderedDict()  # page_id -> _PageNode, least recently used first
+        self._dirty_pages = {}  # page_id -> modified node, pinned until flush()
+        self._freed = []  # Pages freed since the last flush, linked into the free list by flush()
+        self._writing = False  # Defer eviction while a mutation holds node references
+        self._ids = None  # book_ID -> normalized title; None until first needed
+        self._id_log = []  # (book_ID, title or None for a delete) since the last flush
+        self._id_rewrite = False  # Replace the whole chain at the next flush
+        self._id_entries = 0  # Entries in the on-disk chain, once the map is read
+        self._id_head_used = 0  # Bytes used in the chain's head page, once the map is read
+        self.hits = 0
+        self.misses = 0
+
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, "r+b" if exists else "w+b")
+        if exists:
+            header = self._file.read(_HEADER.size)
+            (magic, version, self.page_size, self.t, self._root_id,
+             self._page_count, self._free_head, self._count, self._id_head) = _HEADER.unpack(header)
+            if magic != _MAGIC or version != _VERSION:
+                self._file.close()
+                raise ValueError(f"{path} is not a catalog page file")
+            self._mm = mmap.mmap(self._file.fileno(), 0)
+        else:
+            self.page_size = page_size
+            self.t = t  # Minimum degree
+            self._file.truncate(page_size)
+            self._mm = mmap.mmap(self._file.fileno(), 0)
+            self._reset()
+
+    def _reset(self):
+        """Start an empty tree: header page plus an empty root leaf"""
+        self._pool.clear()
+        self._dirty_pages.clear()
+        self._freed.clear()
+        self._page_count = 1
+        self._free_head = 0
+        self._count = 0
+        self._id_head = 0
+        self._ids, self._id_log, self._id_rewrite = {}, [], False
+        self._id_entries = self._id_head_used = 0
+        self._root_id = self._new_node(True).page_id
+        self.flush()
+
+    # Page file management
+    def _grow(self, pages):
+        """Make sure the file (and mapping) holds at least pages pages"""
+        size = pages * self.page_size
+        if size <= len(self._mm):
+            return
+        size = max(size, 2 * len(self._mm))
+        self._mm.close()
+        self._file.truncate(size)
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+
+    def _alloc(self):
+        """Take a page freed since the last flush or from the free list, or append one"""
+        if self._freed:
+            return self._freed.pop()
+        if self._free_head:
+            page_id = self._free_head
+            offset = page_id * self.page_size
+            self._free_head = _CHILD.unpack_from(self._mm, offset)[0]
+            return page_id
+        page_id = self._page_count
+        self._page_count += 1
+        self._grow(self._page_count)
+        return page_id
+
+    def _free(self, page_id):
+        """Release a page; it joins the on-disk free list at the next flush"""
+        self._pool.pop(page_id, None)
+        self._dirty_pages.pop(page_id, None)
+        self._freed.append(page_id)
+
+    def _check_record(self, book):
+        """Reject a book whose record could overflow a full node's page
+
+        Every record must fit in an equal share of a page holding 2t - 1
+        records and 2t children, so any node of admitted books encodes
+        within page_size and flush() never meets an oversized node.
+        """
+        max_keys = (2 * self.t) - 1
+        budget = (self.page_size - _NODE.size - (max_keys + 1) * _CHILD.size) // max_keys
+        size = _RECORD.size + 3 * _STR_LEN.size + sum(
+            len(text.encode("utf-8")) for text in (book.title, book.author, book.genre.value))
+        if size > budget:
+            raise ValueError(f"Book {book.book_ID} needs {size} bytes but a record may use {budget} "
+                             f"in a {self.page_size}-byte page with t={self.t}")
+
+    def _encode(self, node):
+        """Serialize a node into one page"""
+        parts = [_NODE.pack(1 if node.leaf else 0, len(node.books))]
+        for book in node.books:
+            parts.append(_RECORD.pack(book.book_ID, book.publication_year,
+                                      book.borrow_count, 1 if book.available else 0))
+            for text in (book.title, book.author, book.genre.value):
+                raw = text.encode("utf-8")
+                parts.append(_STR_LEN.pack(len(raw)))
+                parts.append(raw)
+        for child in node.children:
+            parts.append(_CHILD.pack(child))
+        data = b"".join(parts)
+        if len(data) > self.page_size:
+            raise ValueError(f"Node needs {len(data)} bytes but pages hold {self.page_size}; "
+                             f"use a larger page_size or smaller t")
+        return data
+
+    def _decode(self, page_id):
+        """Read one page from the mapping into a node"""
+        mm = self._mm
+        offset = page_id * self.page_size
+        leaf, count = _NODE.unpack_from(mm, offset)
+        offset += _NODE.size
+        node = _PageNode(page_id, bool(leaf))
+        for _ in range(count):
+            book_ID, year, borrow_count, available = _RECORD.unpack_from(mm, offset)
+            offset += _RECORD.size
+            texts = []
+            for _ in range(3):
+                length = _STR_LEN.unpack_from(mm, offset)[0]
+                offset += _STR_LEN.size
+                texts.append(bytes(mm[offset:offset + length]).decode("utf-8"))
+                offset += length
+            book = Book(book_ID, texts[0], texts[1], Genre(texts[2]), year, bool(available))
+            book.borrow_count = borrow_count
+            node.books.append(book)
+            node.keys.append((book.title_key, book_ID))
+        if not node.leaf:
+            node.children = [_CHILD.unpack_from(mm, offset + i * _CHILD.size)[0]
+                             for i in range(count + 1)]
+        return node
+
+    def _id_map(self):
+        """The book_ID -> normalized title map, replayed from its log pages on first use"""
+        if self._ids is None:
+            pages, mm, page_id = [], self._mm, self._id_head
+            while page_id:
+                pages.append(page_id)
+                page_id = _ID_PAGE.unpack_from(mm, page_id * self.page_size)[0]
+            ids, self._id_entries, self._id_head_used = {}, 0, 0
+            for page_id in reversed(pages):  # Oldest page first
+                start = page_id * self.page_size
+                count = _ID_PAGE.unpack_from(mm, start)[1]
+                offset = start + _ID_PAGE.size
+                for _ in range(count):
+                    live, book_ID, length = _ID_ENTRY.unpack_from(mm, offset)
+                    offset += _ID_ENTRY.size
+                    if live:
+                        ids[book_ID] = bytes(mm[offset:offset + length]).decode("utf-8")
+                    else:
+                        ids.pop(book_ID, None)
+                    offset += length
+                self._id_entries += count
+                self._id_head_used = offset - start
+            self._ids = ids
+        return self._ids
+
+    def _id_entry(self, book_ID, title):
+        """Encode one log entry; title None records a delete"""
+        raw = b"" if title is None else title.encode("utf-8")
+        if _ID_PAGE.size + _ID_ENTRY.size + len(raw) > self.page_size:
+            raise ValueError(f"Title of book {book_ID} does not fit in a {self.page_size}-byte page")
+        return _ID_ENTRY.pack(title is not None, book_ID, len(raw)) + raw
+
+    def _append_id_log(self):
+        """Append the changes since the last flush to the head of the ID map chain"""
+        entries = [self._id_entry(book_ID, title) for book_ID, title in self._id_log]
+        self._id_entries += len(entries)
+        i = 0
+        if self._id_head:
+            # Fill the head page past its last entry; the previous flush never reads that space
+            start = self._id_head * self.page_size
+            following, count = _ID_PAGE.unpack_from(self._mm, start)
+            used = self._id_head_used
+            while i < len(entries) and used + len(entries[i]) <= self.page_size:
+                self._mm[start + used:start + used + len(entries[i])] = entries[i]
+                used += len(entries[i])
+                count += 1
+                i += 1
+            _ID_PAGE.pack_into(self._mm, start, following, count)
+            self._id_head_used = used
+        while i < len(entries):
+            page, used = [], _ID_PAGE.size
+            while i < len(entries) and used + len(entries[i]) <= self.page_size:
+                page.append(entries[i])
+                used += len(entries[i])
+                i += 1
+            page_id = self._alloc()
+            data = _ID_PAGE.pack(self._id_head, len(page)) + b"".join(page)
+            offset = page_id * self.page_size
+            self._mm[offset:offset + len(data)] = data
+            self._id_head, self._id_head_used = page_id, used
+        self._id_log = []
+
+    def _write_id_map(self):
+        """Replace the ID map's page chain with the live entries of the current map"""
+        old, page_id = [], self._id_head
+        while page_id:
+            old.append(page_id)
+            page_id = _ID_PAGE.unpack_from(self._mm, page_id * self.page_size)[0]
+        for page_id in old:
+            self._free(page_id)
+
+        pages, entries, used = [], [], _ID_PAGE.size
+        for book_ID, title in self._ids.items():
+            entry = self._id_entry(book_ID, title)
+            if used + len(entry) > self.page_size:
+                pages.append((entries, used))
+                entries, used = [], _ID_PAGE.size
+            entries.append(entry)
+            used += len(entry)
+        if entries:
+            pages.append((entries, used))
+
+        page_ids = [self._alloc() for _ in pages]
+        for j, (entries, used) in enumerate(pages):
+            following = page_ids[j + 1] if j + 1 < len(page_ids) else 0
+            data = _ID_PAGE.pack(following, len(entries)) + b"".join(entries)
+            offset = page_ids[j] * self.page_size
+            self._mm[offset:offset + len(data)] = data
+        self._id_head = page_ids[0] if page_ids else 0
+        self._id_head_used = pages[0][1] if pages else 0
+        self._id_entries = len(self._ids)
+        self._id_log, self._id_rewrite = [], False
+
+    def _write_page(self, node):
+        """Write a node's page into the mapping"""
+        data = self._encode(node)
+        offset = node.page_id * self.page_size
+        self._mm[offset:offset + len(data)] = data
+
+    # Buffer pool
+    def _node(self, page_id):
+        """Fetch a node through the LRU buffer pool"""
+        node = self._pool.get(page_id)
+        if node is not None:
+            self.hits += 1
+            self._pool.move_to_end(page_id)
+            return node
+        node = self._dirty_pages.get(page_id)  # Evicted from the pool but not yet flushed
+        if node is not None:
+            self.hits += 1
+            self._pool[page_id] = node
+            if not self._writing:
+                self._trim()
+            return node
+        self.misses += 1
+        node = self._decode(page_id)
+        self._pool[page_id] = node
+        if not self._writing:
+            self._trim()
+        return node
+
+    def _new_node(self, leaf):
+        """Allocate a page for a fresh node"""
+        node = _PageNode(self._alloc(), leaf)
+        self._pool[node.page_id] = node
+        self._dirty_pages[node.page_id] = node
+        return node
+
+    def _dirty(self, *nodes):
+        """Mark nodes as modified so they are written back"""
+        for node in nodes:
+            self._pool[node.page_id] = node
+            self._dirty_pages[node.page_id] = node
+
+    def _trim(self):
+        """Evict least recently used pages beyond the budget (dirty ones stay pinned until flush)"""
+        while len(self._pool) > self.cache_pages:
+            self._pool.popitem(last=False)
+
+    def flush(self):
+        """Write dirty pages, the ID map changes, the free list and the header to disk"""
+        if self._id_rewrite or (self._id_log and self._id_entries + len(self._id_log)
+                                > 2 * len(self._ids) + _ID_LOG_SLACK):
+            self._write_id_map()
+        elif self._id_log:
+            self._append_id_log()
+        for page_id in sorted(self._dirty_pages):
+            self._write_page(self._dirty_pages[page_id])
+        self._dirty_pages.clear()
+        for page_id in self._freed:
+            _CHILD.pack_into(self._mm, page_id * self.page_size, self._free_head)
+            self._free_head = page_id
+        self._freed.clear()
+        _HEADER.pack_into(self._mm, 0, _MAGIC, _VERSION, self.page_size, self.t, self._root_id,
+                          self._page_count, self._free_head, self._count, self._id_head)
+        self._mm.flush()
+
+    def close(self):
+        """Flush and release the page file"""
+        if self._mm.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._mm.close()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def cache_info(self):
+        """Buffer pool statistics"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "resident_pages": len(self._pool.keys() | self._dirty_pages.keys()),
+            "dirty_pages": len(self._dirty_pages),
+            "cache_pages": self.cache_pages,
+            "file_pages": self._page_count,
+        }
+
+    # Core insertion operation
+    def insert(self, book):
+        """Insert a book (organized by title)"""
+        self._check_record(book)
+        self._writing = True
+        try:
+            root = self._node(self._root_id)
+            if len(root.books) == (2 * self.t) - 1:  # Root is full
+                new_root = self._new_node(False)
+                new_root.children.append(root.page_id)
+                self._root_id = new_root.page_id
+                self._split_child(new_root, 0)
+                root = new_root
+            self._insert_non_full(root, book)
+            self._count += 1
+            self._id_map()[book.book_ID] = book.title_key
+            self._id_log.append((book.book_ID, book.title_key))
+        finally:
+            self._writing = False
+            self._trim()
+
+    def _insert_non_full(self, node, book):
+        """Insert into a non-full node, splitting full children on the way down"""
+        key = (book.title_key, book.book_ID)
+        max_keys = (2 * self.t) - 1
+        while not node.leaf:
+            i = bisect_right(node.keys, key)
+            if len(self._node(node.children[i]).books) == max_keys:
+                self._split_child(node, i)
+                if node.keys[i] <= key:
+                    i += 1
+            node = self._node(node.children[i])
+        i = bisect_right(node.keys, key)
+        node.keys.insert(i, key)
+        node.books.insert(i, book)
+        self._dirty(node)
+
+    def _split_child(self, parent, index):
+        """Split a full child node"""
+        t = self.t
+        child = self._node(parent.children[index])
+        new_child = self._new_node(child.leaf)
+
+        parent.books.insert(index, child.books[t - 1])
+        parent.keys.insert(index, child.keys[t - 1])
+        new_child.books, child.books = child.books[t:], child.books[:t - 1]
+        new_child.keys, child.keys = child.keys[t:], child.keys[:t - 1]
+        if not child.leaf:
+            new_child.children, child.children = child.children[t:], child.children[:t]
+        parent.children.insert(index + 1, new_child.page_id)
+        self._dirty(parent, child, new_child)
+
+    # Bottom-up bulk construction
+    def bulk_load(self, books):
+        """Replace the file contents with books, writing pages level by level"""
+        t = self.t
+        items = sorted(books, key=lambda book: (book.title_key, book.book_ID))
+        for book in items:
+            self._check_record(book)
+        self._pool.clear()
+        self._dirty_pages.clear()
+        self._freed.clear()
+        self._page_count = 1
+        self._free_head = 0
+        self._count = len(items)
+        self._id_head = 0  # The old chain's pages are overwritten with the rest of the file
+        self._ids = {book.book_ID: book.title_key for book in items}
+        self._id_log, self._id_rewrite = [], True
+
+        # Leaf level (same layout rule as BTree.bulk_load)
+        leaf_count = max(1, -(-(len(items) + 1) // (2 * t)))
+        base, extra = divmod(len(items) - (leaf_count - 1), leaf_count)
+        nodes, separators, pos = [], [], 0
+        for j in range(leaf_count):
+            size = base + (1 if j < extra else 0)
+            node = _PageNode(self._alloc(), True)
+            node.books = items[pos:pos + size]
+            pos += size
+            self._write_page(node)
+            nodes.append(node.page_id)
+            if j < leaf_count - 1:
+                separators.append(items[pos])
+                pos += 1
+
+        # Internal levels
+        while len(nodes) > 1:
+            node_count = -(-len(nodes) // (2 * t))
+            base, extra = divmod(len(nodes), node_count)
+            parents, promoted = [], []
+            child_pos = key_pos = 0
+            for j in range(node_count):
+                fanout = base + (1 if j < extra else 0)
+                node = _PageNode(self._alloc(), False)
+                node.children = nodes[child_pos:child_pos + fanout]
+                node.books = separators[key_pos:key_pos + fanout - 1]
+                child_pos += fanout
+                key_pos += fanout - 1
+                self._write_page(node)
+                parents.append(node.page_id)
+                if j < node_count - 1:
+                    promoted.append(separators[key_pos])
+                    key_pos += 1
+            nodes, separators = parents, promoted
+
+        self._root_id = nodes[0]
+        self.flush()
+
+    # Search operations
+    def search(self, title):
+        """Search by title (O(log n) page reads); the lowest book_ID wins among editions"""
+        title = normalize_title(title)
+        probe = (title,)
+        found = None
+        node = self._node(self._root_id)
+        while True:
+            i = bisect_left(node.keys, probe)
+            if i < len(node.keys) and node.keys[i][0] == title:
+                found = node.books[i]
+            if node.leaf:
+                return found
+            node = self._node(node.children[i])
+
+    def find_all(self, title):
+        """All editions with exactly this title, ordered by book_ID"""
+        return list(self.range(title, title, inclusive=True))
+
+    def _locate(self, key):
+        """(node, index) of the entry with exactly this key, or None"""
+        node = self._node(self._root_id)
+        while True:
+            i = bisect_left(node.keys, key)
+            if i < len(node.keys) and node.keys[i] == key:
+                return node, i
+            if node.leaf:
+                return None
+            node = self._node(node.children[i])
+
+    def update_by_id(self, book_ID, available, borrow_count=None):
+        """Update one book's availability (and borrow count) in place; returns True if found"""
+        title = self._id_map().get(book_ID)
+        found = None if title is None else self._locate((title, book_ID))
+        if found is None:
+            return False
+        node, i = found
+        node.books[i].available = available
+        if borrow_count is not None:
+            node.books[i].borrow_count = borrow_count
+        self._dirty(node)
+        return True
+
+    def update_availability(self, title, available):
+        """Update book availability in place and mark its page dirty"""
+        title = normalize_title(title)
+        probe = (title,)
+        found = None
+        node = self._node(self._root_id)
+        while True:
+            i = bisect_left(node.keys, probe)
+            if i < len(node.keys) and node.keys[i][0] == title:
+                found = (node, i)
+            if node.leaf:
+                break
+            node = self._node(node.children[i])
+        if found is None:
+            return False
+        node, i = found
+        node.books[i].available = available
+        self._dirty(node)
+        return True
+
+    # Complete B-tree deletion
+    def delete(self, title):
+        """Delete the first edition with this title; returns True if a book was removed"""
+        book = self.search(title)
+        if book is None:
+            return False
+        return self._delete_key((book.title_key, book.book_ID))
+
+    def delete_by_id(self, book_ID):
+        """Delete the book with this ID (its key comes from the ID map)"""
+        title = self._id_map().get(book_ID)
+        if title is None:
+            return False
+        return self._delete_key((title, book_ID))
+
+    def delete_many_by_id(self, book_IDs):
+        """Delete the books with these IDs in key order; returns how many were removed"""
+        ids = self._id_map()
+        keys = sorted((ids[book_ID], book_ID) for book_ID in set(book_IDs) if book_ID in ids)
+        return sum(self._delete_key(key) for key in keys)
+
+    def _delete_key(self, key):
+        """Delete one entry with this exact key (top-down, as in BTree)"""
+        self._writing = True
+        try:
+            deleted = self._delete(self._node(self._root_id), key)
+            root = self._node(self._root_id)
+            if not root.books and not root.leaf:
+                self._root_id = root.children[0]
+                self._free(root.page_id)
+            if deleted:
+                self._count -= 1
+                ids = self._id_map()
+                if ids.get(key[1]) == key[0]:
+                    del ids[key[1]]
+                    self._id_log.append((key[1], None))
+            return deleted
+        finally:
+            self._writing = False
+            self._trim()
+
+    def _delete(self, node, key):
+        """Delete from the subtree at node, topping up children on the way down"""
+        t = self.t
+        while True:
+            idx = bisect_left(node.keys, key)
+            if idx < len(node.keys) and node.keys[idx] == key:
+                if node.leaf:
+                    node.books.pop(idx)
+                    node.keys.pop(idx)
+                    self._dirty(node)
+                    return True
+                left = self._node(node.children[idx])
+                right = self._node(node.children[idx + 1])
+                if len(left.books) >= t:
+                    current = left
+                    while not current.leaf:
+                        current = self._node(current.children[-1])
+                    node.books[idx], node.keys[idx] = current.books[-1], current.keys[-1]
+                    self._dirty(node)
+                    node, key = left, current.keys[-1]
+                elif len(right.books) >= t:
+                    current = right
+                    while not current.leaf:
+                        current = self._node(current.children[0])
+                    node.books[idx], node.keys[idx] = current.books[0], current.keys[0]
+                    self._dirty(node)
+                    node, key = right, current.keys[0]
+                else:
+                    self._merge_children(node, idx)
+                    node = left
+                continue
+
+            if node.leaf:
+                return False
+            if len(self._node(node.children[idx]).books) < t:
+                self._fill_child(node, idx)
+            if idx > len(node.books):
+                idx -= 1
+            node = self._node(node.children[idx])
+
+    def _fill_child(self, node, idx):
+        """Fill underflowing child"""
+        t = self.t
+        if idx != 0 and len(self._node(node.children[idx - 1]).books) >= t:
+            self._borrow_from_prev(node, idx)
+        elif idx != len(node.children) - 1 and len(self._node(node.children[idx + 1]).books) >= t:
+            self._borrow_from_next(node, idx)
+        elif idx != len(node.children) - 1:
+            self._merge_children(node, idx)
+        else:
+            self._merge_children(node, idx - 1)
+
+    def _borrow_from_prev(self, node, idx):
+        """Borrow from left sibling"""
+        child = self._node(node.children[idx])
+        sibling = self._node(node.children[idx - 1])
+        child.books.insert(0, node.books[idx - 1])
+        child.keys.insert(0, node.keys[idx - 1])
+        if not child.leaf:
+            child.children.insert(0, sibling.children.pop())
+        node.books[idx - 1] = sibling.books.pop()
+        node.keys[idx - 1] = sibling.keys.pop()
+        self._dirty(node, child, sibling)
+
+    def _borrow_from_next(self, node, idx):
+        """Borrow from right sibling"""
+        child = self._node(node.children[idx])
+        sibling = self._node(node.children[idx + 1])
+        child.books.append(node.books[idx])
+        child.keys.append(node.keys[idx])
+        if not child.leaf:
+            child.children.append(sibling.children.pop(0))
+        node.books[idx] = sibling.books.pop(0)
+        node.keys[idx] = sibling.keys.pop(0)
+        self._dirty(node, child, sibling)
+
+    def _merge_children(self, node, idx):
+        """Merge two children and free the right one's page"""
+        child = self._node(node.children[idx])
+        sibling = self._node(node.children[idx + 1])
+        child.books.append(node.books.pop(idx))
+        child.keys.append(node.keys.pop(idx))
+        child.books.extend(sibling.books)
+        child.keys.extend(sibling.keys)
+        if not child.leaf:
+            child.children.extend(sibling.children)
+        node.children.pop(idx + 1)
+        self._dirty(node, child)
+        self._free(sibling.page_id)
+
+    # Traversal and range scans
+    def traverse(self, callback=None):
+        """Visit books in title order; returns a list when no callback is given"""
+        if callback is None:
+            return list(self)
+        for book in self:
+            callback(book)
+        return None
+
+    def __iter__(self):
+        """Yield every book in title order"""
+        return self._iter_from(None)
+
+    def __len__(self):
+        """Number of books in the file (O(1))"""
+        return self._count
+
+    def range(self, lo=None, hi=None, inclusive=False):
+        """Yield books with lo <= title < hi (<= hi if inclusive) in title order, ignoring case"""
+        if hi is not None:
+            hi = normalize_title(hi)
+        for book in self._iter_from(None if lo is None else (normalize_title(lo),)):
+            if hi is not None and (book.title_key > hi if inclusive else book.title_key >= hi):
+                return
+            yield book
+
+    def prefix(self, prefix):
+        """Yield books whose title starts with prefix in title order, ignoring case"""
+        prefix = normalize_title(prefix)
+        for book in self._iter_from((prefix,)):
+            if not book.title_key.startswith(prefix):
+                return
+            yield book
+
+    def page(self, offset, limit):
+        """Books at positions offset .. offset+limit-1 in title order"""
+        return list(islice(self._iter_from(None), max(offset, 0), max(offset, 0) + limit))
+
+    def _iter_from(self, lo):
+        """In-order cursor over pages, starting at the first key >= lo"""
+        stack = []
+        node = self._node(self._root_id)
+        while True:
+            i = 0 if lo is None else bisect_left(node.keys, lo)
+            stack.append((node, i))
+            if node.leaf:
+                break
+            node = self._node(node.children[i])
+
+        while stack:
+            node, i = stack.pop()
+            if node.leaf:
+                for j in range(i, len(node.books)):
+                    yield node.books[j]
+                continue
+            if i < len(node.books):
+                yield node.books[i]
+                stack.append((node, i + 1))
+                child = self._node(node.children[i + 1])
+                while True:
+                    stack.append((child, 0))
+                    if child.leaf:
+                        break
+                    child = self._node(child.children[0])
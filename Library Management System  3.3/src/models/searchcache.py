@@ -0,0 +1,70 @@
+from collections import OrderedDict
+
+class SearchCache:
+    """Bounded LRU cache of search results, invalidated by a catalog version counter
+
+    Every entry is stamped with the version it was computed at. invalidate()
+    only bumps the version, which is O(1) however full the cache is; an
+    entry from an older version is dropped when it is next looked up and is
+    never served.
+    """
+
+    def __init__(self, capacity=128):
+        self.capacity = max(1, capacity)
+        self.version = 0  # Catalog version; bumped on every change that can alter results
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0  # Misses caused by an entry from an older version
+        self._entries = OrderedDict()  # key -> (version, value), least recently used first
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] == self.version
+
+    def get(self, key):
+        """The cached value for key, or None if it is missing or stale"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] == self.version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+            self.stale += 1
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """Cache value for key at the current version, evicting the least recently used entry"""
+        self._entries[key] = (self.version, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """Mark every cached result stale (the catalog changed)"""
+        self.version += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = self.stale = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        """Size, version and hit/miss counters"""
+        return {
+            "capacity": self.capacity,
+            "size": len(self._entries),
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_rate": self.hit_rate,
+        }
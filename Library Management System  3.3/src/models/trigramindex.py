@@ -0,0 +1,132 @@
+from array import array
+from bisect import bisect_left
+from operator import attrgetter
+
+from models.Book import normalize_title
+
+def _author_key(book):
+    return normalize_title(book.author)
+
+def _trigrams(text):
+    """Distinct three-character substrings of text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class TrigramIndex:
+    """Inverted index from trigrams of normalized title/author text to book IDs
+
+    A substring query looks up the posting lists of its own trigrams,
+    intersects them starting from the shortest, and checks only the
+    surviving candidates with a real substring test. Posting lists are
+    sorted arrays of book IDs (8 bytes per entry) kept up to date by add and
+    remove. Terms shorter than three characters fall back to scanning the
+    stored normalized texts.
+    """
+
+    VERIFY_BELOW = 64  # Stop intersecting once this few candidates remain; checking them is cheaper
+
+    def __init__(self, fields=None):
+        """fields maps a field name to a function returning the book's normalized text"""
+        self.fields = fields or {"title": attrgetter("title_key"), "author": _author_key}
+        self._postings = {field: {} for field in self.fields}  # field -> trigram -> array of IDs
+        self._texts = {field: {} for field in self.fields}  # field -> book_ID -> normalized text
+        self._books = {}  # book_ID -> Book
+
+    def __len__(self):
+        return len(self._books)
+
+    def __contains__(self, book_ID):
+        return book_ID in self._books
+
+    def clear(self):
+        for field in self.fields:
+            self._postings[field].clear()
+            self._texts[field].clear()
+        self._books.clear()
+
+    def add(self, book):
+        """Index one book (replacing an earlier entry with the same ID)"""
+        book_ID = book.book_ID
+        if book_ID in self._books:
+            self.remove(book_ID)
+        self._books[book_ID] = book
+        for field, extract in self.fields.items():
+            text = extract(book)
+            self._texts[field][book_ID] = text
+            postings = self._postings[field]
+            for gram in _trigrams(text):
+                ids = postings.get(gram)
+                if ids is None:
+                    postings[gram] = array("q", (book_ID,))
+                elif ids[-1] < book_ID:  # IDs usually arrive in increasing order
+                    ids.append(book_ID)
+                else:
+                    ids.insert(bisect_left(ids, book_ID), book_ID)
+
+    def add_many(self, books):
+        """Index a batch of books, sorting each touched posting list once"""
+        books = {book.book_ID: book for book in books}  # The last copy of an ID wins, as with add
+        for book_ID in books:
+            self.remove(book_ID)
+        touched = {field: set() for field in self.fields}
+        for book_ID, book in books.items():
+            self._books[book_ID] = book
+            for field, extract in self.fields.items():
+                text = extract(book)
+                self._texts[field][book_ID] = text
+                postings = self._postings[field]
+                for gram in _trigrams(text):
+                    ids = postings.get(gram)
+                    if ids is None:
+                        ids = postings[gram] = array("q")
+                    ids.append(book_ID)
+                    touched[field].add(gram)
+        for field, grams in touched.items():
+            postings = self._postings[field]
+            for gram in grams:
+                postings[gram] = array("q", sorted(postings[gram]))
+
+    def remove(self, book_ID):
+        """Drop a book from the index; returns True if it was indexed"""
+        if self._books.pop(book_ID, None) is None:
+            return False
+        for field in self.fields:
+            text = self._texts[field].pop(book_ID)
+            postings = self._postings[field]
+            for gram in _trigrams(text):
+                ids = postings[gram]
+                del ids[bisect_left(ids, book_ID)]
+                if not ids:
+                    del postings[gram]
+        return True
+
+    def estimate(self, field, term):
+        """Upper bound on the number of matches for term: its shortest posting list"""
+        term = normalize_title(term)
+        if len(term) < 3:
+            return len(self._books)
+        postings = self._postings[field]
+        return min(len(postings.get(gram, ())) for gram in _trigrams(term))
+
+    def search(self, field, term):
+        """Books whose normalized field contains term, in title order"""
+        term = normalize_title(term)
+        texts = self._texts[field]
+        if len(term) < 3:
+            found = [book_ID for book_ID, text in texts.items() if term in text]
+        else:
+            postings = self._postings[field]
+            lists = sorted((postings.get(gram, ()) for gram in _trigrams(term)), key=len)
+            candidates = set(lists[0])
+            for ids in lists[1:]:
+                if len(candidates) < self.VERIFY_BELOW:
+                    break
+                if len(candidates) * 16 < len(ids):  # Few candidates: probe the long list instead
+                    end = len(ids)
+                    candidates = {book_ID for book_ID in candidates
+                                  if (i := bisect_left(ids, book_ID)) < end and ids[i] == book_ID}
+                else:
+                    candidates.intersection_update(ids)
+            found = [book_ID for book_ID in candidates if term in texts[book_ID]]
+        # Book order is (title_key, book_ID): sort the IDs, then stable-sort on the bare title key
+        found.sort()
+        return sorted((self._books[book_ID] for book_ID in found), key=attrgetter("title_key"))
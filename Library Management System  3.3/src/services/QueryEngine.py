@@ -0,0 +1,188 @@
+from itertools import islice
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from models.Book import Book, normalize_title
+from models.Genre import Genre
+from models.bitmap import Bitmap
+
+MATCH_TYPES = ("exact", "prefix", "contains", "fuzzy")
+
+class Predicate:
+    """One filter of a query: how to test a book and, if indexed, how to fetch candidates
+
+    estimate is the expected number of matching books, taken from index
+    statistics. fetch returns the matching books straight from an index;
+    bitmap returns their slots when the predicate is backed by a bitmap.
+    """
+
+    def __init__(self, name, test, estimate, fetch=None, bitmap=None):
+        self.name = name
+        self.test = test
+        self.estimate = estimate
+        self.fetch = fetch
+        self.bitmap = bitmap
+
+class QueryEngine:
+    """Multi-predicate book queries driven by the most selective index
+
+    Every filter becomes a Predicate with a selectivity estimate read from
+    its index: the ID dict, the title tree's order statistics, the author
+    index's counts, the genre and availability bitmaps' popcounts, or the
+    year tree. The cheapest indexed predicate produces the candidates, and
+    the others are only tested on those. When the cheapest one is a bitmap,
+    all bitmap predicates are ANDed first, so "available SCIENCE books" is
+    a single integer AND before any book is touched. "fuzzy" title and
+    author filters are answered by the FuzzyIndex, whose match count is
+    their estimate.
+
+    The engine only holds references, so build one per query (or after
+    the indexes are replaced) rather than keeping it around.
+    """
+
+    SAMPLE_CAP = 1024  # Rows counted when an index cannot count a range in O(log n)
+
+    def __init__(self, books: Dict[int, Book], title_index, author_index, bitmaps, year_index,
+                 text_index=None, fuzzy_index=None):
+        self.books = books  # book_ID -> Book
+        self.title_index = title_index
+        self.author_index = author_index
+        self.bitmaps = bitmaps
+        self.year_index = year_index
+        self.text_index = text_index  # Optional TrigramIndex for "contains" filters
+        self.fuzzy_index = fuzzy_index  # Optional FuzzyIndex, required for "fuzzy" filters
+        self.last_plan: Optional[Dict] = None
+
+    def find(self, book_id: Optional[int] = None, title: Optional[str] = None, title_match: str = "exact",
+             author: Optional[str] = None, author_match: str = "exact",
+             genre: Union[Genre, Iterable[Genre], None] = None,
+             year: Union[int, Tuple[Optional[int], Optional[int]], None] = None,
+             available: Optional[bool] = None, limit: Optional[int] = None) -> List[Book]:
+        """Books matching every given filter, in title order
+
+        genre may be one Genre or several (any of them matches); year may be
+        one year or an inclusive (lo, hi) range with None for an open end.
+        The chosen plan is left in last_plan.
+        """
+        predicates = self._predicates(book_id, title, title_match, author, author_match, genre, year, available)
+        plan, candidates, verify = self._plan(predicates)
+        found = [book for book in candidates if all(p.test(book) for p in verify)]
+        found.sort(key=attrgetter("book_ID"))
+        found.sort(key=attrgetter("title_key"))  # Stable: (title_key, book_ID) like Book.__lt__
+        plan["rows"] = len(found)
+        self.last_plan = plan
+        return found if limit is None else found[:limit]
+
+    def explain(self, **filters) -> Dict:
+        """The plan find() would choose for these filters, without running it"""
+        return self._plan(self._predicates(**filters))[0]
+
+    def _predicates(self, book_id=None, title=None, title_match="exact", author=None, author_match="exact",
+                    genre=None, year=None, available=None) -> List[Predicate]:
+        predicates = []
+        if book_id is not None:
+            book = self.books.get(book_id)
+            predicates.append(Predicate("id", lambda b: b.book_ID == book_id, int(book is not None),
+                                        fetch=lambda: [book] if book is not None else []))
+        if title is not None:
+            predicates.append(self._text_predicate("title", title, title_match))
+        if author is not None:
+            predicates.append(self._text_predicate("author", author, author_match))
+        if genre is not None:
+            genres = frozenset([genre] if isinstance(genre, Genre) else genre)
+            slots = Bitmap()
+            for g in genres:
+                slots = slots | self.bitmaps.genre(g)
+            predicates.append(Predicate("genre", lambda b: b.genre in genres, len(slots),
+                                        bitmap=lambda: slots))
+        if year is not None:
+            lo, hi = (year, year) if isinstance(year, int) else year
+            predicates.append(Predicate(
+                "year", lambda b: (lo is None or b.publication_year >= lo) and (hi is None or b.publication_year <= hi),
+                self._count_years(lo, hi), fetch=lambda: self.year_index.range(lo, hi, inclusive=True)))
+        if available is not None:
+            available = bool(available)
+            count = self.bitmaps.available_count
+            predicates.append(Predicate(
+                "available", lambda b: b.available == available,
+                count if available else len(self.bitmaps) - count,
+                bitmap=lambda: self.bitmaps.available if available else self._all_slots() - self.bitmaps.available))
+        return predicates
+
+    def _text_predicate(self, field, value, match) -> Predicate:
+        if match not in MATCH_TYPES:
+            raise ValueError(f"Unknown match type: {match}")
+        if match == "fuzzy":
+            if self.fuzzy_index is None:
+                raise ValueError("Fuzzy matching needs a fuzzy index")
+            # Every typo-tolerant match, not just the nearest few the search box shows
+            matches = self.fuzzy_index.search(field, value, limit=len(self.fuzzy_index))
+            ids = {book.book_ID for book in matches}
+            return Predicate(field, lambda b: b.book_ID in ids, len(matches), fetch=lambda: matches)
+        term = normalize_title(value)
+        text = attrgetter("title_key") if field == "title" else lambda b: normalize_title(b.author)
+        test = {
+            "exact": lambda b: text(b) == term,
+            "prefix": lambda b: text(b).startswith(term),
+            "contains": lambda b: term in text(b),
+        }[match]
+        if match == "contains":
+            if self.text_index is None:
+                return Predicate(field, test, len(self.books))  # Tested only, never drives
+            return Predicate(field, test, self.text_index.estimate(field, value),
+                             fetch=lambda: self.text_index.search(field, value))
+        if field == "author":
+            if match == "exact":
+                return Predicate(field, test, self.author_index.count(value),
+                                 fetch=lambda: self.author_index.find(value))
+            return Predicate(field, test, self.author_index.count_prefix(value),
+                             fetch=lambda: self.author_index.prefix(value))
+        fetch = (lambda: self.title_index.find_all(value)) if match == "exact" else \
+            (lambda: self.title_index.prefix(value))
+        rank = getattr(self.title_index, "rank", None)
+        if rank is None:  # No order statistics: count the first few matches instead
+            estimate = sum(1 for _ in islice(fetch(), self.SAMPLE_CAP))
+        else:
+            # Keys equal to term sort before term + "\0"; keys starting with it before term + U+10FFFF
+            estimate = rank(term + ("\0" if match == "exact" else "\U0010ffff")) - rank(term)
+        return Predicate(field, test, estimate, fetch=fetch)
+
+    def _count_years(self, lo, hi) -> int:
+        """Books with lo <= year <= hi from the year tree's order statistics"""
+        index = self.year_index
+        below_hi = len(index) if hi is None else index.rank(hi + 1)
+        return below_hi - (0 if lo is None else index.rank(lo))
+
+    def _all_slots(self) -> Bitmap:
+        slots = Bitmap()
+        for genre_slots in self.bitmaps.genres.values():
+            slots = slots | genre_slots
+        return slots
+
+    def _plan(self, predicates: List[Predicate]):
+        """Pick the driving predicate; returns (plan, candidate books, predicates left to test)"""
+        estimates = {p.name: p.estimate for p in predicates}
+        indexed = [p for p in predicates if p.fetch is not None or p.bitmap is not None]
+        if not indexed:
+            plan = {"driver": "scan", "estimated_rows": len(self.books), "estimates": estimates,
+                    "bitmap_and": [], "verify": [p.name for p in predicates]}
+            return plan, iter(self.title_index), predicates
+        driver = min(indexed, key=attrgetter("estimate"))
+        plan = {"driver": driver.name, "estimated_rows": driver.estimate, "estimates": estimates,
+                "bitmap_and": [], "verify": []}
+        if driver.estimate == 0:
+            return plan, [], []
+        if driver.bitmap is not None:
+            combined = [p for p in predicates if p.bitmap is not None]
+            slots = driver.bitmap()
+            for p in combined:
+                if p is not driver:
+                    slots = slots & p.bitmap()
+            plan["bitmap_and"] = [p.name for p in combined]
+            verify = [p for p in predicates if p.bitmap is None]
+            candidates = self.bitmaps.iter_books(slots)
+        else:
+            verify = [p for p in predicates if p is not driver]
+            candidates = driver.fetch()
+        verify.sort(key=attrgetter("estimate"))  # Most selective test first fails fastest
+        plan["verify"] = [p.name for p in verify]
+        return plan, candidates, verify
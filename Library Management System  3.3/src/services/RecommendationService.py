@@ -1,21 +1,35 @@
+from bisect import bisect_left, bisect_right, insort
 from collections import defaultdict
-from typing import Dict, List, Set
+from operator import attrgetter
+from typing import Dict, Iterator, List, Optional, Set
 from models.Book import Book
 from models.User import User
+from models.bitmap import Bitmap, BitmapIndex
 from models.btree import BTree
+from models.bplustree import BPlusTree
 import random
 
+# Title index implementations selectable by configuration
+INDEX_TYPES = {"btree": BTree, "bplustree": BPlusTree}
+
 class RecommendationService:
-    def __init__(self):
+    def __init__(self, index_type: str = "btree"):
         """Initialize recommendation service"""
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type: {index_type}")
+        self.index_type = index_type
         self.reset_books()
         self.user_data: Dict[str, User] = {}
     
     def reset_books(self):
         """Reset all book data"""
         self.book_data: Dict[int, Book] = {}
-        self.title_index = BTree(t=3)
+        self.title_index = INDEX_TYPES[self.index_type](t=3)
+        self.bitmaps = BitmapIndex()  # Genre and availability bits per book slot
+        self.year_index = BTree(t=3, key=attrgetter("publication_year"), normalize=int)
         self.genre_stats = defaultdict(int)
+        self.year_stats: Dict[int, int] = {}  # publication_year -> number of books
+        self._years: List[int] = []  # Keys of year_stats, sorted
     
     def add_user(self, user: User):
         """Add users to the system"""
@@ -29,16 +43,83 @@ class RecommendationService:
             raise ValueError("Only Book type objects can be added")
         self.book_data[book.book_ID] = book
         self.title_index.insert(book)
+        self.year_index.insert(book)
+        self.bitmaps.add(book)
         self.genre_stats[book.genre.value] += 1
+        self._count_year(book.publication_year, 1)
+    
+    def load_books(self, books: List[Book]):
+        """Add many books at once and rebuild the title index bottom-up"""
+        for book in books:
+            if not isinstance(book, Book):
+                raise ValueError("Only Book type objects can be added")
+            self.book_data[book.book_ID] = book
+            self.genre_stats[book.genre.value] += 1
+            self._count_year(book.publication_year, 1)
+        self.bitmaps.add_many(books)  # One OR per bitmap instead of one per book
+        self.title_index.bulk_load(list(self.book_data.values()))
+        self.year_index.bulk_load(list(self.book_data.values()))
+    
+    def add_books(self, books: List[Book]):
+        """Add many books to the current catalog with one batched index update"""
+        for book in books:
+            if not isinstance(book, Book):
+                raise ValueError("Only Book type objects can be added")
+        for book in books:
+            self.book_data[book.book_ID] = book
+            self.genre_stats[book.genre.value] += 1
+            self._count_year(book.publication_year, 1)
+        self.bitmaps.add_many(books)
+        self.title_index.insert_many(books)
+        self.year_index.insert_many(books)
+
+    def remove_books(self, book_ids: List[int]):
+        """Remove many books with one batched index update"""
+        known = [book_id for book_id in set(book_ids) if book_id in self.book_data]
+        self.title_index.delete_many_by_id(known)
+        self.year_index.delete_many_by_id(known)
+        for book_id in known:
+            book = self.book_data.pop(book_id)
+            self.bitmaps.remove(book_id)
+            self.genre_stats[book.genre.value] -= 1
+            self._count_year(book.publication_year, -1)
     
     def remove_book(self, book_id: int):
         """Remove books from the system"""
         if book_id in self.book_data:
             book = self.book_data[book_id]
-            self.title_index.delete(book.title)
+            self.title_index.delete_by_id(book_id)
+            self.year_index.delete_by_id(book_id)
+            self.bitmaps.remove(book_id)
             self.genre_stats[book.genre.value] -= 1
+            self._count_year(book.publication_year, -1)
             del self.book_data[book_id]
     
+    def _count_year(self, year: int, delta: int):
+        """Adjust the per-year count, keeping the sorted list of years in step"""
+        count = self.year_stats.get(year, 0) + delta
+        if count > 0:
+            if year not in self.year_stats:
+                insort(self._years, year)
+            self.year_stats[year] = count
+        elif year in self.year_stats:
+            del self.year_stats[year]
+            del self._years[bisect_left(self._years, year)]
+
+    def books_published_between(self, lo: Optional[int] = None, hi: Optional[int] = None) -> Iterator[Book]:
+        """Stream books with lo <= publication_year <= hi in year order (then by ID); None leaves an end open"""
+        return self.year_index.range(lo, hi, inclusive=True)
+
+    def books_per_year(self, lo: Optional[int] = None, hi: Optional[int] = None) -> Dict[int, int]:
+        """Number of books per publication year in [lo, hi], in year order"""
+        start = 0 if lo is None else bisect_left(self._years, lo)
+        end = len(self._years) if hi is None else bisect_right(self._years, hi)
+        return {year: self.year_stats[year] for year in self._years[start:end]}
+
+    def count_published_between(self, lo: Optional[int] = None, hi: Optional[int] = None) -> int:
+        """Number of books with lo <= publication_year <= hi, from the per-year counts"""
+        return sum(self.books_per_year(lo, hi).values())
+
     def record_borrow(self, user_id: str, book_id: int):
         """Record borrowing behavior and update user preferences"""
         if user_id in self.user_data and book_id in self.book_data:
@@ -47,6 +128,7 @@ class RecommendationService:
             
             user.add_borrowed_book(book_id)
             book.available = False
+            self.bitmaps.set_available(book_id, False)
             
             # Update type preference
             genre = book.genre.value
@@ -56,6 +138,47 @@ class RecommendationService:
         """Record the act of returning books"""
         if user_id in self.user_data and book_id in self.book_data:
             self.book_data[book_id].available = True
+            self.bitmaps.set_available(book_id, True)
+
+    def record_borrows(self, user_id: str, book_ids: List[int]):
+        """Record a batch of borrows by one user"""
+        for book_id in book_ids:
+            self.record_borrow(user_id, book_id)
+
+    def record_returns(self, user_id: str, book_ids: List[int]):
+        """Record a batch of returns by one user"""
+        for book_id in book_ids:
+            self.record_return(user_id, book_id)
+
+    def update_availability(self, book_ids: List[int], available: bool):
+        """Set availability for books borrowed or returned outside a user session"""
+        for book_id in book_ids:
+            if book_id in self.book_data:
+                self.book_data[book_id].available = available
+                self.bitmaps.set_available(book_id, available)
+
+    def available_count(self) -> int:
+        """Number of available books (O(1))"""
+        return self.bitmaps.available_count
+
+    def available_books(self, title_order: bool = False) -> List[Book]:
+        """Available books, read off the availability bitmap instead of scanning every book"""
+        if title_order:
+            return self.bitmaps.books_for(self.bitmaps.available)
+        return list(self.bitmaps.iter_books(self.bitmaps.available))
+
+    def filter_available(self, books: List[Book]) -> List[Book]:
+        """The available ones of books, in their given order, tested against the availability bitmap"""
+        return self.bitmaps.filter(books, self.bitmaps.available)
+
+    def books_in_genres(self, genres, available_only: bool = False) -> List[Book]:
+        """Books in any of the given genres in title order, optionally only available ones"""
+        slots = Bitmap()
+        for genre in genres:
+            slots = slots | self.bitmaps.genre(genre)
+        if available_only:
+            slots = slots & self.bitmaps.available
+        return self.bitmaps.books_for(slots)
     
     def recommend_books(self, user_id: str, top_n: int = 5) -> List[Book]:
         """Pure preference recommendation based on author and type"""
@@ -65,13 +188,10 @@ class RecommendationService:
         user = self.user_data[user_id]
         borrowed_books = set(user.borrow_history)
         
-        # Get recommended books
-        available_books = [
-            book for book in self.book_data.values()
-            if book.book_ID not in borrowed_books and book.available
-        ]
+        # Candidates: available books the user has not borrowed, straight from the bitmaps
+        candidates = self.bitmaps.available - self.bitmaps.mask(borrowed_books)
         
-        if not available_books:
+        if not candidates:
             return []
         
         # Calculate author preferences
@@ -82,22 +202,21 @@ class RecommendationService:
         
         # Recommendation when there is no historical record
         if not author_prefs:
-            return self._recommend_by_genre_diversity(available_books, top_n)
+            return self._recommend_by_genre_diversity(candidates, top_n)
         
         # Recommendations when there are historical records
+        available_books = list(self.bitmaps.iter_books(candidates))
         return self._recommend_by_preferences(user, available_books, author_prefs, top_n)
     
-    def _recommend_by_genre_diversity(self, books: List[Book], top_n: int) -> List[Book]:
-        """Recommended by Type Diversity"""
-        genre_groups = defaultdict(list)
-        for book in books:
-            genre_groups[book.genre.value].append(book)
-        
+    def _recommend_by_genre_diversity(self, candidates: Bitmap, top_n: int) -> List[Book]:
+        """Recommended by Type Diversity: a random candidate from each genre"""
         recommended = []
-        for genre in genre_groups:
+        for genre_slots in self.bitmaps.genres.values():
             if len(recommended) >= top_n:
                 break
-            recommended.append(random.choice(genre_groups[genre]))
+            pool = genre_slots & candidates
+            if pool:
+                recommended.append(self.bitmaps.books[pool.select(random.randrange(len(pool)))])
         
         return recommended
     
@@ -0,0 +1,87 @@
+import os
+import random
+import sys
+import unittest
+
+# Add the src directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'src'))
+
+from models.authorindex import AuthorIndex
+from models.Book import Book, normalize_title
+from models.Genre import Genre
+
+class TestAuthorIndex(unittest.TestCase):
+    def setUp(self):
+        """Set up an index over a few books"""
+        self.books = [
+            Book(1, "Anna Karenina", "Leo Tolstoy", Genre.FICTION, 1878),
+            Book(2, "War and Peace", "Leo Tolstoy", Genre.FICTION, 1869),
+            Book(3, "Emma", "Jane Austen", Genre.FICTION, 1815),
+            Book(4, "Persuasion", "JANE AUSTEN", Genre.FICTION, 1817),
+            Book(5, "Pride and Prejudice", "Jane Austen", Genre.FICTION, 1813),
+            Book(6, "Dune", "Frank Herbert", Genre.SCIENCE, 1965),
+        ]
+        self.index = AuthorIndex()
+        for book in reversed(self.books):
+            self.index.add(book)
+
+    def test_exact(self):
+        """Test case-insensitive exact author lookups ordered by ID and by year"""
+        self.assertEqual(self.index.ids("jane austen"), [3, 4, 5])
+        self.assertEqual(self.index.find("Jane Austen"), self.books[2:5])
+        self.assertEqual([b.book_ID for b in self.index.by_year("JANE austen")], [5, 3, 4])
+        self.assertEqual([b.book_ID for b in self.index.by_year("Leo Tolstoy")], [2, 1])
+        self.assertEqual(self.index.find("Jane"), [])
+        self.assertEqual(self.index.by_year("Nobody"), [])
+
+    def test_prefix(self):
+        """Test starts-with lookups grouped by author"""
+        self.index.add(Book(7, "Sense and Sensibility", "Jane Smith", Genre.FICTION, 1811))
+        self.assertEqual(self.index.authors("jane"), ["jane austen", "jane smith"])
+        self.assertEqual([b.book_ID for b in self.index.prefix("Jane")], [3, 4, 5, 7])
+        self.assertEqual([b.book_ID for b in self.index.prefix("")], [6, 3, 4, 5, 7, 1, 2])
+        self.assertEqual(self.index.prefix("x"), [])
+
+    def test_remove_and_replace(self):
+        """Test that removals and re-adds keep every view consistent"""
+        self.assertTrue(self.index.remove(6))
+        self.assertFalse(self.index.remove(6))
+        self.assertEqual(self.index.authors("f"), [])
+        self.index.add(Book(2, "War and Peace", "Lev Tolstoy", Genre.FICTION, 1869))
+        self.assertEqual(self.index.ids("leo tolstoy"), [1])
+        self.assertEqual(self.index.ids("lev tolstoy"), [2])
+        self.assertEqual(len(self.index), 5)
+        self.index.clear()
+        self.assertEqual(self.index.prefix(""), [])
+
+    def test_matches_scan(self):
+        """Test add_many and incremental changes against a scan of the live books"""
+        rng = random.Random(3)
+        authors = ["Ann Lee", "Ann Leigh", "Bo Yang", "bo yang", "Cy Twombly", "Ann"]
+        books = {i: Book(i, f"T{i}", rng.choice(authors), Genre.FICTION, rng.randint(1900, 1910))
+                 for i in range(300)}
+        index = AuthorIndex()
+        index.add_many(books.values())
+        for step in range(300):
+            book_ID = rng.randrange(400)
+            if book_ID in books and rng.random() < 0.5:
+                index.remove(book_ID)
+                del books[book_ID]
+            else:
+                books[book_ID] = Book(book_ID, f"T{book_ID}", rng.choice(authors), Genre.FICTION,
+                                      rng.randint(1900, 1910))
+                index.add(books[book_ID])
+        for author in set(map(normalize_title, authors)):
+            mine = [b for b in books.values() if normalize_title(b.author) == author]
+            self.assertEqual(index.ids(author), sorted(b.book_ID for b in mine))
+            self.assertEqual(index.count(author.upper()), len(mine))
+            self.assertEqual([b.book_ID for b in index.by_year(author)],
+                             [b.book_ID for b in sorted(mine, key=lambda b: (b.publication_year, b.book_ID))])
+        self.assertEqual(sorted(b.book_ID for b in index.prefix("ann")),
+                         sorted(i for i, b in books.items() if normalize_title(b.author).startswith("ann")))
+        self.assertEqual(index.count_prefix("Ann"), len(index.prefix("ann")))
+        self.assertEqual(index.count_prefix(""), len(books))
+        self.assertEqual(len(index), len(books))
+
+if __name__ == '__main__':
+    unittest.main()
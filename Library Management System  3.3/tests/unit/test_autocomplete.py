@@ -0,0 +1,100 @@
+import os
+import random
+import sys
+import unittest
+
+# Add the src directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'src'))
+
+from models.autocomplete import AutocompleteIndex, PrefixTrie
+from models.Book import Book
+from models.Genre import Genre
+
+class TestPrefixTrie(unittest.TestCase):
+    def test_matches_brute_force(self):
+        """Test completions against a sorted scan while terms are added, re-weighted and removed"""
+        rng = random.Random(9)
+        words = ["".join(rng.choice("abc") for _ in range(rng.randint(0, 6))) for _ in range(60)]
+        trie, live = PrefixTrie(k=3), {}  # term -> [occurrences, weight]
+        initial = [(word, None, rng.randint(0, 5)) for word in rng.sample(words, 20)]
+        trie.add_many(initial)
+        for word, _, weight in initial:
+            entry = live.setdefault(word, [0, 0])
+            entry[0] += 1
+            entry[1] += weight
+        for _ in range(1500):
+            word, op = rng.choice(words), rng.random()
+            if op < 0.45:
+                weight = rng.randint(0, 5)
+                trie.add(word, None, weight)
+                entry = live.setdefault(word, [0, 0])
+                entry[0] += 1
+                entry[1] += weight
+            elif op < 0.75:
+                if word in live:
+                    count, weight = live[word]
+                    taken = weight if count == 1 else rng.randint(0, weight)
+                    self.assertTrue(trie.remove(word, taken))
+                    live[word] = [count - 1, weight - taken]
+                    if count == 1:
+                        del live[word]
+                else:
+                    self.assertFalse(trie.remove(word))
+            elif word in live:
+                delta = rng.randint(-live[word][1], 4)
+                trie.adjust(word, delta)
+                live[word][1] += delta
+            prefix = "".join(rng.choice("abc") for _ in range(rng.randint(0, 3)))
+            expected = sorted((-weight, term) for term, (_, weight) in live.items() if term.startswith(prefix))
+            self.assertEqual(trie.complete(prefix), [term for _, term in expected[:3]])
+            self.assertEqual(len(trie), len(live))
+
+    def test_prefix_inside_edge(self):
+        """Test prefixes that end part-way along a compressed edge"""
+        trie = PrefixTrie()
+        trie.add("romance", "Romance", 1)
+        trie.add("romantic", "Romantic", 3)
+        self.assertEqual(trie.complete("r"), ["Romantic", "Romance"])
+        self.assertEqual(trie.complete("romanc"), ["Romance"])
+        self.assertEqual(trie.complete("romz"), [])
+        self.assertEqual(trie.complete("romances"), [])
+
+class TestAutocompleteIndex(unittest.TestCase):
+    def setUp(self):
+        """Set up an index over a few books with borrow counts"""
+        self.books = [
+            Book(1, "Dune", "Frank Herbert", Genre.SCIENCE, 1965),
+            Book(2, "Dune Messiah", "Frank Herbert", Genre.SCIENCE, 1969),
+            Book(3, "Dracula", "Bram Stoker", Genre.FICTION, 1897),
+            Book(4, "Don Quixote", "Miguel de Cervantes", Genre.FICTION, 1605),
+        ]
+        for book, count in zip(self.books, [5, 1, 3, 0]):
+            book.borrow_count = count
+        self.index = AutocompleteIndex(k=3)
+        self.index.add_many(self.books)
+
+    def test_ranked_by_borrows(self):
+        """Test that suggestions come most borrowed first and keep their original spelling"""
+        self.assertEqual(self.index.suggest("title", "d"), ["Dune", "Dracula", "Dune Messiah"])
+        self.assertEqual(self.index.suggest("title", "DUNE "), ["Dune Messiah"])
+        self.assertEqual(self.index.suggest("title", "d", limit=1), ["Dune"])
+        self.assertEqual(self.index.suggest("author", "fr"), ["Frank Herbert"])
+        self.assertEqual(self.index.suggest("title", "x"), [])
+
+    def test_incremental_updates(self):
+        """Test that borrows, additions and deletions re-rank suggestions"""
+        quixote = self.books[3]
+        quixote.borrow_count = 9
+        self.index.update(quixote)
+        self.assertEqual(self.index.suggest("title", "d"), ["Don Quixote", "Dune", "Dracula"])
+        self.assertEqual(self.index.suggest("author", ""), ["Miguel de Cervantes", "Frank Herbert", "Bram Stoker"])
+        self.assertTrue(self.index.remove(4))
+        self.assertFalse(self.index.remove(4))
+        self.assertEqual(self.index.suggest("title", "d"), ["Dune", "Dracula", "Dune Messiah"])
+        self.index.add(Book(5, "Dubliners", "James Joyce", Genre.FICTION, 1914))
+        self.assertEqual(self.index.suggest("title", "du"), ["Dune", "Dune Messiah", "Dubliners"])
+        self.index.clear()
+        self.assertEqual((len(self.index), self.index.suggest("title", "d")), (0, []))
+
+if __name__ == '__main__':
+    unittest.main()
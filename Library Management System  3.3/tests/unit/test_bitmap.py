@@ -0,0 +1,152 @@
+import os
+import random
+import sys
+import unittest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from models.bitmap import Bitmap, BitmapIndex
+from models.Book import Book
+from models.Genre import Genre
+
+class TestBitmap(unittest.TestCase):
+    def test_set_operations(self):
+        """Test add, discard, membership and the bitwise combinations"""
+        a, b = Bitmap(), Bitmap()
+        for slot in (0, 3, 64, 1000):
+            a.add(slot)
+        for slot in (3, 1000, 2000):
+            b.add(slot)
+        a.discard(0)
+        a.discard(5)  # Not set: no effect
+        self.assertEqual(list(a), [3, 64, 1000])
+        self.assertIn(64, a)
+        self.assertNotIn(0, a)
+        self.assertEqual(len(a), 3)
+        self.assertEqual(list(a & b), [3, 1000])
+        self.assertEqual(list(a | b), [3, 64, 1000, 2000])
+        self.assertEqual(list(a - b), [64])
+        self.assertFalse(Bitmap())
+
+    def test_single_slot_updates_on_a_combined_bitmap(self):
+        """Test that byte-level updates and whole-int operations see each other's changes"""
+        a = Bitmap(0b1010)
+        self.assertIn(3, a)
+        self.assertNotIn(4000, a)
+        a.add(100)
+        self.assertEqual(a.bits, 0b1010 | 1 << 100)
+        combined = a | Bitmap(1 << 7)
+        combined.discard(3)
+        combined.update([9, 2000])
+        self.assertEqual(list(combined), [1, 7, 9, 100, 2000])
+        a.discard(1)
+        a.discard(5000)
+        self.assertEqual(list(a & combined), [100])
+        self.assertEqual(a, Bitmap(1 << 3 | 1 << 100))
+
+    def test_select(self):
+        """Test finding the k-th set slot across 512-bit blocks"""
+        rng = random.Random(3)
+        slots = sorted(rng.sample(range(5000), 700))
+        bitmap = Bitmap()
+        for slot in slots:
+            bitmap.add(slot)
+        for k in range(len(slots)):
+            self.assertEqual(bitmap.select(k), slots[k])
+        with self.assertRaises(IndexError):
+            bitmap.select(len(slots))
+
+class TestBitmapIndex(unittest.TestCase):
+    def setUp(self):
+        """Set up an index over books of every genre"""
+        genres = list(Genre)
+        self.books = [Book(i, f"Book {i:03d}", "Author", genres[i % 4], 2000, available=i % 3 != 0)
+                      for i in range(100)]
+        self.index = BitmapIndex()
+        for book in self.books:
+            self.index.add(book)
+
+    def _ids(self, bitmap):
+        return sorted(self.index.books[slot].book_ID for slot in bitmap)
+
+    def test_genre_and_availability(self):
+        """Test genre and genre-and-available filters against a scan"""
+        for genre in Genre:
+            self.assertEqual(self._ids(self.index.genre(genre)),
+                             [b.book_ID for b in self.books if b.genre == genre])
+            self.assertEqual(self._ids(self.index.genre(genre) & self.index.available),
+                             [b.book_ID for b in self.books if b.genre == genre and b.available])
+        self.index.set_available(0, True)
+        self.index.set_available(1, False)
+        self.index.set_available(999, True)  # Unknown IDs are ignored
+        self.assertIn(self.index.slots[0], self.index.available)
+        self.assertNotIn(self.index.slots[1], self.index.available)
+
+    def test_available_count(self):
+        """Test that the available counter follows adds, removals and repeated flips"""
+        def count():
+            return sum(1 for b in self.books if b.available and b.book_ID in self.index)
+        self.assertEqual(self.index.available_count, count())
+        self.assertEqual(self.index.available_count, len(self.index.available))
+        for book_ID, available in [(1, False), (1, False), (0, True), (0, True), (3, False)]:
+            self.books[book_ID].available = available
+            self.index.set_available(book_ID, available)
+        self.index.remove(2)
+        self.index.remove(4)
+        self.assertEqual(self.index.available_count, count())
+        self.assertEqual(self.index.available_count, len(self.index.available))
+        self.assertEqual([b.book_ID for b in self.index.iter_books(self.index.available)],
+                         self._ids(self.index.available))
+        self.index.clear()
+        self.assertEqual(self.index.available_count, 0)
+
+    def test_remove_reuses_slots(self):
+        """Test that removed books free their slots and bits"""
+        slot = self.index.slots[10]
+        self.assertTrue(self.index.remove(10))
+        self.assertFalse(self.index.remove(10))
+        self.assertNotIn(slot, self.index.genre(self.books[10].genre))
+        self.assertNotIn(slot, self.index.available)
+        book = Book(500, "New Book", "Author", Genre.HISTORY, 2020)
+        self.index.add(book)
+        self.assertEqual(self.index.slots[500], slot)
+        self.assertIn(slot, self.index.genre(Genre.HISTORY))
+        self.assertEqual(len(self.index), 100)
+
+    def test_add_many_matches_add(self):
+        """Test that a batch build sets the same bits as adding books one at a time"""
+        index = BitmapIndex()
+        index.add(self.books[0])
+        replaced = Book(0, "Book 000", "Author", Genre.HISTORY, 2000)
+        index.add_many(self.books[1:60] + [replaced] + self.books[60:] + [self.books[5]])
+        books = [replaced] + self.books[1:]
+        ids = lambda bitmap: sorted(index.books[slot].book_ID for slot in bitmap)
+        self.assertEqual(len(index), 100)
+        for genre in Genre:
+            self.assertEqual(ids(index.genre(genre)), sorted(b.book_ID for b in books if b.genre == genre))
+        self.assertEqual(ids(index.available), sorted(b.book_ID for b in books if b.available))
+        self.assertEqual(index.available_count, len(index.available))
+
+    def test_books_for_and_mask(self):
+        """Test mapping bitmaps back to books in title order"""
+        mask = self.index.mask([5, 1, 3, 12345])
+        self.assertEqual([b.book_ID for b in self.index.books_for(mask)], [1, 3, 5])
+        self.index.clear()
+        self.assertEqual(len(self.index), 0)
+        self.assertEqual(list(self.index.genre(Genre.FICTION)), [])
+
+    def test_filter(self):
+        """Test keeping the books whose slots are in a bitmap, sparse and dense, in input order"""
+        outsider = Book(999, "Not Indexed", "Author", Genre.FICTION, 2000)
+        for book, kept in ((self.books[98], True), (self.books[99], False), (outsider, False)):
+            self.assertEqual(self.index.filter([book], self.index.available), [book] if kept else [])
+        few = [self.books[7], self.books[3], outsider, self.books[4]]
+        self.assertEqual([b.book_ID for b in self.index.filter(few, self.index.available)], [7, 4])
+        many = self.books[::-1] + [outsider]
+        self.assertEqual([b.book_ID for b in self.index.filter(many, self.index.available)],
+                         [b.book_ID for b in self.books[::-1] if b.available])
+        self.assertEqual(self.index.filter(many, Bitmap()), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import random
+import sys
+import unittest
+
+# Add the src directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'src'))
+
+from models.bktree import BKTree, FuzzyIndex, levenshtein
+from models.Book import Book
+from models.Genre import Genre
+
+def _edit_distance(a, b):
+    """Textbook dynamic-programming Levenshtein distance, for cross-checking"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+class TestLevenshtein(unittest.TestCase):
+    def test_known_distances(self):
+        """Test a few textbook distances"""
+        self.assertEqual(levenshtein("kitten", "sitting"), 3)
+        self.assertEqual(levenshtein("", "abc"), 3)
+        self.assertEqual(levenshtein("abc", "abc"), 0)
+        self.assertEqual(levenshtein("night", "nihgt"), 2)
+
+    def test_matches_dynamic_programming(self):
+        """Test the bit-parallel distance against the quadratic algorithm, including long words"""
+        rng = random.Random(5)
+        for _ in range(2000):
+            a = "".join(rng.choice("abc ") for _ in range(rng.randint(0, 12)))
+            b = "".join(rng.choice("abc ") for _ in range(rng.randint(0, 80)))
+            self.assertEqual(levenshtein(a, b), _edit_distance(a, b), (a, b))
+
+class TestBKTree(unittest.TestCase):
+    def test_search_matches_brute_force(self):
+        """Test range queries against a scan while terms come and go"""
+        rng = random.Random(11)
+        words = ["".join(rng.choice("abcd") for _ in range(rng.randint(0, 7))) for _ in range(200)]
+        tree, live = BKTree(), {}
+        for step in range(3000):
+            word, book_ID = rng.choice(words), rng.randrange(20)
+            if rng.random() < 0.6:
+                tree.add(word, book_ID)
+                live.setdefault(word, set()).add(book_ID)
+            else:
+                self.assertEqual(tree.remove(word, book_ID), book_ID in live.get(word, ()))
+                live.get(word, set()).discard(book_ID)
+            if step % 100 == 0:
+                query, max_distance = rng.choice(words), rng.randint(0, 3)
+                found = sorted((dist, term, sorted(ids)) for dist, term, ids in tree.search(query, max_distance))
+                expected = sorted((_edit_distance(query, term), term, sorted(ids)) for term, ids in live.items()
+                                  if ids and _edit_distance(query, term) <= max_distance)
+                self.assertEqual(found, expected)
+                self.assertEqual(len(tree), sum(1 for ids in live.values() if ids))
+
+class TestFuzzyIndex(unittest.TestCase):
+    def setUp(self):
+        """Set up an index over a few books"""
+        self.books = [
+            Book(1, "War and Peace", "Leo Tolstoy", Genre.FICTION, 1869),
+            Book(2, "The Night Watch", "Sergei Lukyanenko", Genre.FICTION, 1998),
+            Book(3, "Night", "Elie Wiesel", Genre.HISTORY, 1956),
+            Book(4, "Anna Karenina", "Leo Tolstoy", Genre.FICTION, 1878),
+        ]
+        self.index = FuzzyIndex()
+        self.index.add_many(self.books)
+
+    def test_typos(self):
+        """Test that misspelt words still find their books, nearest first"""
+        self.assertEqual(self.index.search("title", "war and paece"), [self.books[0]])
+        self.assertEqual(self.index.search("title", "nihgt"), [self.books[2], self.books[1]])
+        self.assertEqual(self.index.search("title", "nihgt watch"), [self.books[1]])
+        self.assertEqual(self.index.search("author", "tolstoi"), [self.books[3], self.books[0]])
+        self.assertEqual(self.index.search("title", "zzzzz"), [])
+        self.assertEqual(self.index.search("title", ""), [])
+
+    def test_ranking_and_limits(self):
+        """Test that exact words rank before near misses and that limit and max_distance apply"""
+        self.index.add(Book(5, "Nights", "Anon", Genre.FICTION, 2000))
+        self.assertEqual([b.book_ID for b in self.index.search("title", "night")], [3, 2, 5])
+        self.assertEqual([b.book_ID for b in self.index.search("title", "night", limit=1)], [3])
+        self.assertEqual(self.index.search("title", "nihgt", max_distance=1), [])
+
+    def test_total_distance_capped(self):
+        """Test that the edits of all query words together stay within max_distance"""
+        book = Book(5, "Python Programming", "John Doe", Genre.SCIENCE, 2001)
+        self.index.add(book)
+        self.assertEqual(self.index.search("title", "pyhton programming"), [book])
+        # Two edits in "pyhton" plus one in "progamming" make three
+        self.assertEqual(self.index.search("title", "pyhton progamming"), [])
+        self.assertEqual([b.book_ID for b in self.index.search("title", "pyhton progamming", max_distance=3)], [5])
+        self.assertEqual(self.index.search("title", "war and paece", max_distance=1), [])
+
+    def test_add_and_remove(self):
+        """Test that the index follows adds, replacements and removals after it is built"""
+        self.assertEqual(len(self.index.search("title", "nigt")), 2)
+        self.assertTrue(self.index.remove(3))
+        self.assertFalse(self.index.remove(3))
+        self.assertEqual(self.index.search("title", "nigt"), [self.books[1]])
+        self.index.add(Book(2, "Day Watch", "Sergei Lukyanenko", Genre.FICTION, 2000))
+        self.assertEqual(self.index.search("title", "nigt"), [])
+        self.assertEqual([b.book_ID for b in self.index.search("title", "watch")], [2])
+        self.index.clear()
+        self.assertEqual(len(self.index), 0)
+        self.assertEqual(self.index.search("author", "tolstoy"), [])
+
+if __name__ == '__main__':
+    unittest.main()
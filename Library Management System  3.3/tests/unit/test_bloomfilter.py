@@ -0,0 +1,70 @@
+import os
+import sys
+import unittest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from models.bloomfilter import CountingBloomFilter
+
+class TestCountingBloomFilter(unittest.TestCase):
+    def setUp(self):
+        self.bloom = CountingBloomFilter(capacity=1000, error_rate=0.01)
+
+    def test_sizing(self):
+        """Test that the table is sized for the requested error rate"""
+        self.assertLessEqual(self.bloom.hashes, CountingBloomFilter.MAX_HASHES)
+        self.assertGreater(self.bloom.size, 9 * 1000)
+        self.assertEqual(self.bloom.false_positive_rate, 0.0)
+        self.assertGreaterEqual(self.bloom.memory_bytes, self.bloom.size)
+
+    def test_no_false_negatives(self):
+        """Test that every added item is reported present"""
+        items = [f"title {i}" for i in range(1000)] + list(range(500)) + [(1, "a"), (2, "b")]
+        for item in items:
+            self.bloom.add(item)
+        self.assertEqual(len(self.bloom), len(items))
+        for item in items:
+            self.assertIn(item, self.bloom)
+
+    def test_false_positive_rate(self):
+        """Test that the measured and estimated false-positive rates stay near the target"""
+        for i in range(1000):
+            self.bloom.add(f"title {i}")
+        misses = sum(f"missing {i}" in self.bloom for i in range(20000))
+        self.assertLess(misses / 20000, 0.03)
+        self.assertLess(self.bloom.false_positive_rate, 0.03)
+
+    def test_remove(self):
+        """Test that removal restores the counters, keeping duplicates until their last copy"""
+        empty = bytes(self.bloom._counters)
+        self.bloom.add("dune")
+        self.bloom.add("dune")
+        self.bloom.add("emma")
+        self.bloom.remove("dune")
+        self.assertIn("dune", self.bloom)
+        self.bloom.remove("dune")
+        self.bloom.remove("emma")
+        self.assertNotIn("dune", self.bloom)
+        self.assertEqual(bytes(self.bloom._counters), empty)
+        self.assertEqual(len(self.bloom), 0)
+
+    def test_saturated_counters_stay_put(self):
+        """Test that counters stop at 255 and never underflow into false negatives"""
+        for _ in range(300):
+            self.bloom.add("popular")
+        self.bloom.add("rare")
+        self.assertEqual(max(self.bloom._counters), 255)
+        for _ in range(300):
+            self.bloom.remove("popular")
+        self.assertIn("rare", self.bloom)
+
+    def test_clear(self):
+        """Test that clear empties the filter"""
+        self.bloom.add("dune")
+        self.bloom.clear()
+        self.assertNotIn("dune", self.bloom)
+        self.assertEqual(len(self.bloom), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -46,4 +46,22 @@ class TestBook(unittest.TestCase):
         book2 = Book(2, "B Title", "Author", Genre.FICTION, 2020)
         
         self.assertLess(book1, book2)
-        self.assertGreater(book2, book1)
\ No newline at end of file
+        self.assertGreater(book2, book1)
+
+    def test_book_comparison_breaks_ties_by_id(self):
+        """Test that books with the same title order by book_ID"""
+        book1 = Book(1, "Same Title", "Author", Genre.FICTION, 2020)
+        book2 = Book(2, "Same Title", "Author", Genre.FICTION, 2021)
+
+        self.assertLess(book1, book2)
+        self.assertFalse(book2 < book1)
+
+    def test_title_key(self):
+        """Test the cached case-folded, NFKC-normalized title key"""
+        book = Book(1, "Straße ＡＢＣ", "Author", Genre.FICTION, 2020)
+        self.assertEqual(book.title_key, "strasse abc")
+        book.title = "The Hobbit"
+        self.assertEqual(book.title_key, "the hobbit")
+        plain = Book(2, "already plain", "Author", Genre.FICTION, 2020)
+        self.assertIs(plain.title_key, plain.title)
+        self.assertLess(Book(3, "apple", "A", Genre.FICTION, 2020), Book(4, "Banana", "A", Genre.FICTION, 2020))
\ No newline at end of file
@@ -0,0 +1,175 @@
+import random
+import unittest
+from models.bplustree import BPlusTree
+from models.Book import Book
+from models.Genre import Genre
+
+class TestBPlusTree(unittest.TestCase):
+    def setUp(self):
+        """Initialize a B+ tree and sample books for testing"""
+        self.tree = BPlusTree(t=3)
+        self.books = [Book(i, f"Book {i:03d}", f"Author {i}", Genre.FICTION, 2000 + i) for i in range(200)]
+
+    def _assert_valid_structure(self, tree):
+        """Check fill bounds, subtree sizes, uniform leaf depth and the leaf chain"""
+        leaves = []
+
+        def walk(node, depth, is_root):
+            if not is_root:
+                self.assertGreaterEqual(len(node.keys), tree.t - 1)
+            self.assertLessEqual(len(node.keys), 2 * tree.t - 1)
+            if node.leaf:
+                self.assertEqual(len(node.keys), len(node.books))
+                self.assertEqual(node.size, len(node.books))
+                leaves.append((depth, node))
+            else:
+                self.assertEqual(len(node.children), len(node.keys) + 1)
+                for child in node.children:
+                    walk(child, depth + 1, False)
+                self.assertEqual(node.size, sum(child.size for child in node.children))
+
+        walk(tree.root, 0, True)
+        self.assertEqual(len({depth for depth, _ in leaves}), 1)
+        for (_, leaf), (_, following) in zip(leaves, leaves[1:]):
+            self.assertIs(leaf.next, following)
+        self.assertIsNone(leaves[-1][1].next)
+        keys = [key for _, leaf in leaves for key in leaf.keys]
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(len(keys), len(tree))
+
+    def test_empty_tree(self):
+        """Test operations on an empty tree"""
+        self.assertEqual(self.tree.traverse(), [])
+        self.assertIsNone(self.tree.search("Any Book"))
+        self.assertFalse(self.tree.update_availability("Any Book", True))
+        self.assertFalse(self.tree.delete("Any Book"))
+        self.assertEqual(len(self.tree), 0)
+
+    def test_insert_search_traverse(self):
+        """Test inserted books are found and scanned in title order"""
+        shuffled = self.books[:]
+        random.Random(1).shuffle(shuffled)
+        for book in shuffled:
+            self.tree.insert(book)
+        self._assert_valid_structure(self.tree)
+        self.assertEqual(self.tree.traverse(), self.books)
+        for book in self.books:
+            self.assertIs(self.tree.search(book.title), book)
+        self.assertIsNone(self.tree.search("Nonexistent Book"))
+
+    def test_update_availability(self):
+        """Test updating a book's availability status"""
+        self.tree.bulk_load(self.books)
+        self.assertTrue(self.tree.update_availability("Book 010", False))
+        self.assertFalse(self.tree.search("Book 010").available)
+
+    def test_range_prefix_and_page(self):
+        """Test leaf-chain range scans and paging"""
+        self.tree.bulk_load(self.books)
+        self.assertEqual([book.book_ID for book in self.tree.range("Book 050", "Book 060")],
+                         list(range(50, 60)))
+        self.assertEqual([book.book_ID for book in self.tree.prefix("Book 12")], list(range(120, 130)))
+        self.assertEqual([book.book_ID for book in self.tree.page(195, 10)], list(range(195, 200)))
+        self.assertEqual(self.tree.page(500, 10), [])
+
+    def test_case_insensitive_lookup(self):
+        """Test title lookups and scans by the case-folded title key"""
+        self.tree.bulk_load(self.books)
+        self.assertIs(self.tree.search("BOOK 007"), self.books[7])
+        self.assertEqual(len(list(self.tree.prefix("book 01"))), 10)
+        self.assertEqual(len(list(self.tree.range("BOOK 010", "book 020"))), 10)
+        self.assertTrue(self.tree.delete("bOoK 007"))
+        self.assertIsNone(self.tree.search("Book 007"))
+
+    def test_batch_operations(self):
+        """Test the batch mutation API"""
+        self.assertEqual(self.tree.insert_many(self.books), 200)
+        self._assert_valid_structure(self.tree)
+        self.assertEqual(self.tree.update_availability_many([("book 001", False), ("nope", False)]), 1)
+        self.assertFalse(self.books[1].available)
+        self.assertEqual(self.tree.delete_many_by_id(list(range(0, 200, 2)) + [999]), 100)
+        self.assertEqual(self.tree.delete_many(["Book 001", "BOOK 001", "Book 003"]), 2)
+        self._assert_valid_structure(self.tree)
+        self.assertEqual(len(self.tree), 98)
+
+    def test_bulk_load(self):
+        """Test bottom-up construction for several sizes and degrees"""
+        for t in [2, 3, 5]:
+            for n in [0, 1, 2 * t - 1, 2 * t, 57, 1000]:
+                tree = BPlusTree(t=t)
+                tree.bulk_load([Book(i, f"T{i:05d}", "A", Genre.FICTION, 2000) for i in reversed(range(n))])
+                if n:
+                    self._assert_valid_structure(tree)
+                self.assertEqual(len(tree.traverse()), n)
+
+    def test_duplicate_titles_and_delete_by_id(self):
+        """Test editions sharing a title"""
+        self.tree.bulk_load(self.books)
+        for i in range(30, 0, -1):
+            self.tree.insert(Book(1000 + i, "1984", "Orwell", Genre.FICTION, 1949))
+        self.assertEqual([book.book_ID for book in self.tree.find_all("1984")],
+                         list(range(1001, 1031)))
+        self.assertTrue(self.tree.delete_by_id(1010))
+        self.assertFalse(self.tree.delete_by_id(1010))
+        self.assertTrue(self.tree.delete("1984"))
+        self.assertEqual(self.tree.search("1984").book_ID, 1002)
+        self.assertEqual(len(self.tree.find_all("1984")), 28)
+        self._assert_valid_structure(self.tree)
+
+    def test_random_operations(self):
+        """Test mixed inserts and deletes against a reference set"""
+        rng = random.Random(42)
+        for t in [2, 3, 16]:
+            tree = BPlusTree(t=t)
+            live = {}
+            for _ in range(3000):
+                i = rng.randrange(400)
+                if i in live and rng.random() < 0.5:
+                    self.assertTrue(tree.delete_by_id(i))
+                    del live[i]
+                elif i not in live:
+                    live[i] = Book(i, f"Book {i:03d}", "Author", Genre.FICTION, 2000)
+                    tree.insert(live[i])
+            if live:
+                self._assert_valid_structure(tree)
+            self.assertEqual([book.book_ID for book in tree], sorted(live))
+            for offset in range(0, len(live), 37):
+                self.assertEqual([book.book_ID for book in tree.page(offset, 5)], sorted(live)[offset:offset + 5])
+            for i in sorted(live)[:50]:
+                tree.delete(f"Book {i:03d}")
+            self.assertEqual(len(tree), max(len(live) - 50, 0))
+
+    def test_deletes_use_stored_keys(self):
+        """Test that deletes find books by their stored keys after a title changed behind the tree's back"""
+        self.tree.bulk_load(self.books)
+        for book in self.books[::2]:
+            book.title = f"Renamed {book.book_ID}"
+        self.assertIs(self.tree.search("Book 004"), self.books[4])
+        self.assertTrue(self.tree.delete("Book 004"))
+        self.assertEqual(self.tree.delete_many(["Book 006", "Book 007"]), 2)
+        for i in range(0, 200, 10):
+            self.assertTrue(self.tree.delete_by_id(i))
+        self.assertFalse(self.tree.delete_by_id(4))
+        self._assert_valid_structure(self.tree)
+        deleted = {4, 6, 7} | set(range(0, 200, 10))
+        self.assertEqual([book.book_ID for book in self.tree], [i for i in range(200) if i not in deleted])
+
+    def test_snapshot_is_independent(self):
+        """Test that a snapshot does not see later changes"""
+        self.tree.bulk_load(self.books)
+        snap = self.tree.snapshot()
+        self.tree.delete("Book 000")
+        self.tree.insert(Book(999, "Zed", "Author", Genre.FICTION, 2000))
+        self.assertEqual(snap.traverse(), self.books)
+        self.assertEqual(len(self.tree), len(self.books))
+
+    def test_delete_all_books(self):
+        """Test deleting every book collapses the tree"""
+        self.tree.bulk_load(self.books)
+        for book in self.books:
+            self.assertTrue(self.tree.delete(book.title))
+        self.assertEqual(len(self.tree), 0)
+        self.assertTrue(self.tree.root.leaf)
+
+if __name__ == '__main__':
+    unittest.main()
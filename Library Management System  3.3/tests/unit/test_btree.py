@@ -1,6 +1,7 @@
+import pickle
 import unittest
 import time
-from src.models.btree import BTree
+from src.models.btree import BTree, Descending
 from src.models.Book import Book
 from src.models.Genre import Genre
 
@@ -212,6 +213,498 @@ class TestBTree(unittest.TestCase):
         titles = [book.title for book in remaining_books]
         self.assertEqual(titles, sorted(titles))
 
+    def _assert_valid_structure(self, btree):
+        """Check key counts, leaf depth and ordering of every node"""
+        leaf_depths = set()
+
+        def walk(node, depth, is_root):
+            if not is_root:
+                self.assertGreaterEqual(len(node.books), btree.t - 1)
+            self.assertLessEqual(len(node.books), 2 * btree.t - 1)
+            if node.leaf:
+                leaf_depths.add(depth)
+            else:
+                self.assertEqual(len(node.children), len(node.books) + 1)
+                for child in node.children:
+                    walk(child, depth + 1, False)
+
+        walk(btree.root, 0, True)
+        self.assertLessEqual(len(leaf_depths), 1)
+        keys = [btree._key(book) for book in btree.traverse()]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_bulk_load(self):
+        """Test bottom-up construction for several sizes and degrees"""
+        for t in [2, 3, 5]:
+            for n in [0, 1, 2 * t - 1, 2 * t, 57, 1000]:
+                btree = BTree(t=t)
+                books = [Book(i, f"Book {i:05d}", "Author", Genre.FICTION, 2000) for i in range(n)]
+                btree.bulk_load(reversed(books))
+                self._assert_valid_structure(btree)
+                self.assertEqual(len(btree.traverse()), n)
+                for book in books[::7]:
+                    self.assertIs(btree.search(book.title), book)
+
+    def test_bulk_load_then_mutate(self):
+        """Test that a bulk-loaded tree supports regular inserts and deletes"""
+        books = [Book(i, f"Book {i:04d}", "Author", Genre.FICTION, 2000) for i in range(0, 400, 2)]
+        self.btree.bulk_load(books)
+        for i in range(1, 400, 2):
+            self.btree.insert(Book(i, f"Book {i:04d}", "Author", Genre.FICTION, 2000))
+        for i in range(0, 400, 3):
+            self.btree.delete(f"Book {i:04d}")
+        self._assert_valid_structure(self.btree)
+        self.assertEqual(len(self.btree.traverse()), 400 - len(range(0, 400, 3)))
+
+    def test_random_operations_keep_keys_in_sync(self):
+        """Test that the per-node key list mirrors the books after random churn"""
+        import random
+        rng = random.Random(42)
+        for t in [2, 3, 32]:
+            btree = BTree(t=t)
+            live = {}
+            for step in range(3000):
+                i = rng.randrange(500)
+                title = f"Book {i:03d}"
+                if title in live and rng.random() < 0.5:
+                    btree.delete(title)
+                    del live[title]
+                elif title not in live:
+                    live[title] = Book(i, title, "Author", Genre.FICTION, 2000)
+                    btree.insert(live[title])
+
+            def walk(node):
+                self.assertEqual(node.keys, [btree._key(book) for book in node.books])
+                self.assertEqual(node.size, len(node.books) + sum(c.size for c in node.children))
+                for child in node.children:
+                    walk(child)
+
+            walk(btree.root)
+            self._assert_valid_structure(btree)
+            self.assertEqual([book.title for book in btree], sorted(live))
+            for title, book in live.items():
+                self.assertIs(btree.search(title), book)
+
+    def test_deletes_move_stored_keys(self):
+        """Test that separators move with their stored keys when a book's title changed after insert"""
+        from src.models.Book import normalize_title
+
+        def stored_keys(node):
+            if node.leaf:
+                return list(node.keys)
+            keys = []
+            for child, key in zip(node.children, node.keys + [None]):
+                keys.extend(stored_keys(child))
+                if key is not None:
+                    keys.append(key)
+            return keys
+
+        for t in [2, 3]:
+            btree = BTree(t=t)
+            books = [Book(i, f"Book {i:04d}", "Author", Genre.FICTION, 2000) for i in range(300)]
+            for book in books:
+                btree.insert(book)
+            for book in books[::5]:
+                book.title = f"Renamed {book.book_ID}"  # Changed behind the index's back
+            deleted = set(range(1, 300, 5)) | {2, 3, 7}
+            for i in range(1, 300, 5):
+                self.assertTrue(btree.delete_by_id(i))
+            self.assertEqual(btree.delete_many(["Book 0002", "Book 0003"]), 2)
+            self.assertTrue(btree.delete("Book 0007"))
+            self.assertEqual(stored_keys(btree.root),
+                             [(normalize_title(f"Book {i:04d}"), i) for i in range(300) if i not in deleted])
+            for book in books[::5]:
+                self.assertTrue(btree.delete_by_id(book.book_ID))
+            self.assertEqual(len(btree), 300 - len(deleted) - 60)
+
+    def test_duplicate_titles(self):
+        """Test that editions sharing a title are indexed and deleted individually"""
+        editions = [Book(i, "1984", f"Printer {i}", Genre.FICTION, 1949 + i) for i in range(40, 0, -1)]
+        for i in range(60):
+            self.btree.insert(Book(100 + i, f"Book {i:02d}", "Author", Genre.FICTION, 2000))
+        for book in editions:
+            self.btree.insert(book)
+
+        self.assertEqual([book.book_ID for book in self.btree.find_all("1984")], list(range(1, 41)))
+        self.assertEqual(self.btree.search("1984").book_ID, 1)
+        self.assertEqual(self.btree.find_all("1985"), [])
+
+        self.assertTrue(self.btree.delete_by_id(17))
+        self.assertFalse(self.btree.delete_by_id(17))
+        self.assertFalse(self.btree.delete_by_id(9999))
+        remaining = [book.book_ID for book in self.btree.find_all("1984")]
+        self.assertNotIn(17, remaining)
+        self.assertEqual(len(remaining), 39)
+
+        self.assertTrue(self.btree.delete("1984"))  # Removes the lowest ID
+        self.assertEqual(self.btree.search("1984").book_ID, 2)
+        self.assertTrue(self.btree.delete_by_id(105))
+        self.assertIsNone(self.btree.search("Book 05"))
+        self.assertEqual(len(self.btree), 60 + 40 - 3)
+        self._assert_valid_structure(self.btree)
+
+    def test_insert_many(self):
+        """Test batch insertion into empty and populated trees, merged or (when sparse) key by key"""
+        import random
+        rng = random.Random(13)
+        for t in [2, 3, 5]:
+            btree = BTree(t=t)
+            self.assertEqual(btree.insert_many([]), 0)
+            live = []
+            for batch_size in [1, 7, 300, 40, 1000, 20]:
+                batch = [Book(len(live) + i, f"Book {rng.randrange(500):03d}", "Author", Genre.FICTION, 2000)
+                         for i in range(batch_size)]
+                self.assertEqual(btree.insert_many(batch), batch_size)
+                live.extend(batch)
+                self._assert_valid_structure(btree)
+                self.assertEqual(len(btree), len(live))
+            self.assertEqual([btree._key(book) for book in btree], sorted(btree._key(book) for book in live))
+            self.assertTrue(btree.delete_by_id(live[-1].book_ID))
+
+    def test_delete_many(self):
+        """Test batch deletion by ID and by title, including internal separators"""
+        import random
+        rng = random.Random(14)
+        for t in [2, 3, 5]:
+            btree = BTree(t=t)
+            books = [Book(i, f"Book {i:04d}", "Author", Genre.FICTION, 2000) for i in range(2000)]
+            btree.bulk_load(books)
+            live = {book.book_ID for book in books}
+            for batch in [rng.sample(sorted(live), 50), list(range(300, 900)), rng.sample(sorted(live), 900)]:
+                expected = len(live & set(batch))
+                self.assertEqual(btree.delete_many_by_id(batch + [99999]), expected)
+                live -= set(batch)
+                self._assert_valid_structure(btree)
+                self.assertEqual(sorted(book.book_ID for book in btree), sorted(live))
+                self.assertEqual(len(btree), len(live))
+            titles = [f"BOOK {i:04d}" for i in sorted(live)[::2]] + ["No Such Book"]
+            self.assertEqual(btree.delete_many(titles), len(titles) - 1)
+            self._assert_valid_structure(btree)
+            remaining = [book.book_ID for book in btree]
+            self.assertEqual(btree.delete_many_by_id(remaining), len(remaining))
+            self.assertEqual(btree._key_by_id, {})
+            self.assertEqual(len(btree), 0)
+            self.assertEqual(btree.traverse(), [])
+
+    def test_update_availability_many(self):
+        """Test batch availability updates"""
+        books = [Book(i, f"Book {i:03d}", "Author", Genre.FICTION, 2000) for i in range(300)]
+        self.btree.bulk_load(books)
+        updates = [(f"book {i:03d}", False) for i in range(0, 300, 3)] + [("Missing", False)]
+        self.assertEqual(self.btree.update_availability_many(updates), 100)
+        self.assertEqual([book.book_ID for book in books if not book.available], list(range(0, 300, 3)))
+
+    def test_lazy_delete(self):
+        """Test that tombstoned books are hidden everywhere but stay in place until compaction"""
+        btree = BTree(t=3, lazy_delete=True, compact_ratio=1.0)
+        books = [Book(i, f"Book {i:04d}", "Author", Genre.FICTION, 2000) for i in range(500)]
+        btree.bulk_load(books)
+        snapshot = btree.snapshot()
+        height = lambda node: 0 if node.leaf else 1 + height(node.children[0])
+        before = height(btree.root)
+        self.assertTrue(btree.delete("book 0000"))
+        self.assertEqual(btree.delete_many_by_id(range(100, 300)), 200)
+        self.assertFalse(btree.delete_by_id(150))
+        self.assertEqual(btree.tombstones, 201)
+        self.assertEqual(height(btree.root), before)
+        live = [book for book in books if book.book_ID != 0 and not 100 <= book.book_ID < 300]
+        self.assertEqual(list(btree), live)
+        self.assertEqual(len(btree), len(live))
+        self.assertIsNone(btree.search("Book 0150"))
+        self.assertEqual(btree.search("Book 0300"), books[300])
+        self.assertEqual(btree.select(99), books[300])
+        self.assertEqual(btree.page(98, 3), [books[99], books[300], books[301]])
+        self.assertEqual(btree.rank("Book 0300"), 99)
+        self.assertEqual(list(btree.range("Book 0298", "Book 0302")), books[300:302])
+        self.assertEqual(len(snapshot), 500)
+        later = btree.snapshot()  # Shares the tombstones but not the ID map
+        self.assertIs(later._tombstones, btree._tombstones)  # No copy until the tree changes them
+        self.assertIs(later.search("Book 0300"), books[300])
+        self.assertIsNone(later.search("Book 0150"))
+        self.assertIs(snapshot.search("Book 0150"), books[150])
+
+        btree.insert(books[150])  # Revives the tombstone in place
+        self.assertEqual(btree.tombstones, 200)
+        self.assertEqual(btree.search("Book 0150"), books[150])
+        self.assertEqual(btree.insert_many(books[100:110]), 10)
+        self.assertEqual(btree.tombstones, 190)
+        self.assertEqual(len(btree), len(live) + 11)
+
+        self.assertEqual(btree.compact(50), 50)
+        self.assertEqual(btree.tombstones, 140)
+        self._assert_valid_structure(btree)
+        btree.compact()
+        self.assertEqual(btree.tombstones, 0)
+        self._assert_valid_structure(btree)
+        self.assertEqual(len(btree), len(live) + 11)
+        self.assertEqual([book.book_ID for book in snapshot], list(range(500)))
+        self.assertEqual(later.tombstones, 201)
+        self.assertIsNone(later.search("Book 0150"))
+        self.assertEqual(list(later), live)
+
+    def test_lazy_delete_search_skips_dead_editions(self):
+        """Test that search on a lazy tree and its snapshots returns the first live edition"""
+        btree = BTree(t=2, lazy_delete=True, compact_ratio=1.0)
+        editions = [Book(i, "Dune", "Frank Herbert", Genre.SCIENCE, 1965) for i in range(1, 20)]
+        btree.insert_many(editions)
+        btree.delete_many_by_id(range(1, 8))
+        snapshot = btree.snapshot()
+        self.assertIs(btree.search("dune"), editions[7])
+        self.assertIs(snapshot.search("DUNE"), editions[7])
+        self.assertEqual(snapshot.find_all("dune"), editions[7:])
+        btree.delete_many_by_id(range(8, 20))
+        self.assertIsNone(btree.search("dune"))
+        self.assertIsNone(btree.snapshot().search("dune"))
+        self.assertIs(snapshot.search("dune"), editions[7])
+
+    def test_lazy_delete_compacts_past_ratio(self):
+        """Test that tombstones are compacted once they pass compact_ratio"""
+        import random
+        rng = random.Random(7)
+        btree = BTree(t=2, lazy_delete=True, compact_ratio=0.2, compact_budget=8)
+        live = {}
+        for i in range(3000):
+            if live and rng.random() < 0.45:
+                book_ID = rng.choice(list(live))
+                self.assertTrue(btree.delete_by_id(book_ID))
+                del live[book_ID]
+            else:
+                live[i] = Book(i, f"Book {rng.randrange(400)}", "Author", Genre.FICTION, 2000)
+                btree.insert(live[i])
+            self.assertLessEqual(btree.tombstones, 0.2 * (len(live) + btree.tombstones) + 1)
+        self._assert_valid_structure(btree)
+        self.assertEqual(sorted(book.book_ID for book in btree), sorted(live))
+        self.assertEqual(len(btree), len(live))
+
+    def test_bloom_filter(self):
+        """Test that the filter rejects absent titles and tracks inserts and deletes"""
+        for lazy in [False, True]:
+            btree = BTree(t=3, lazy_delete=lazy, bloom_filter=True)
+            self.assertIsNone(BTree(t=3).bloom_stats())
+            books = [Book(i, f"Book {i:04d}", "Author", Genre.FICTION, 2000) for i in range(3000)]
+            for book in books[:1500]:
+                btree.insert(book)
+            self.assertEqual(btree.insert_many(books[1500:]), 1500)
+            stats = btree.bloom_stats()
+            self.assertEqual(stats["items"], 3000)
+            self.assertGreaterEqual(stats["capacity"], 3000)  # Grew from its initial size
+            self.assertLess(stats["false_positive_rate"], 0.05)
+            self.assertGreater(stats["memory_bytes"], 0)
+
+            self.assertIsNone(btree.search("No Such Book"))
+            self.assertEqual(btree.find_all("No Such Book"), [])
+            self.assertEqual(btree.bloom_stats()["rejected_lookups"], 2)
+            self.assertEqual(btree.search("BOOK 0042"), books[42])
+
+            self.assertTrue(btree.delete("Book 0042"))
+            self.assertEqual(btree.delete_many_by_id(range(100, 200)), 100)
+            self.assertEqual(btree.delete_many(["Book 0300", "Nothing"]), 1)
+            self.assertEqual(btree.bloom_stats()["items"], 3000 - 102)
+            self.assertIsNone(btree.search("Book 0042"))
+            self.assertIsNone(btree.search("Book 0150"))
+            btree.insert(books[42])
+            self.assertEqual(btree.search("Book 0042"), books[42])
+
+            btree.bulk_load(books[:10])
+            self.assertEqual(btree.bloom_stats()["items"], 10)
+            self.assertIsNone(btree.search("Book 0042"))
+            self.assertIsNone(btree.snapshot().bloom_stats())
+
+    def test_stats(self):
+        """Test height, node count and per-level fill reported by stats()"""
+        empty = BTree(t=3).stats()
+        self.assertEqual((empty["height"], empty["nodes"], empty["entries"], empty["fill"]), (1, 1, 0, 0.0))
+        btree = BTree(t=3)
+        btree.bulk_load([Book(i, f"Book {i:04d}", "Author", Genre.FICTION, 2000) for i in range(1000)])
+        stats = btree.stats()
+        self.assertEqual(stats["entries"], 1000)
+        self.assertEqual(sum(level["keys"] for level in stats["levels"]), 1000)
+        self.assertEqual(stats["levels"][0]["nodes"], 1)
+        self.assertEqual(len(stats["levels"]), stats["height"])
+        self.assertEqual(sum(level["nodes"] for level in stats["levels"]), stats["nodes"])
+        for level in stats["levels"][1:]:
+            self.assertGreaterEqual(level["fill"], (btree.t - 1) / (2 * btree.t - 1))
+        self.assertFalse(stats["instrumented"])
+        self.assertEqual((stats["comparisons"], stats["splits"], stats["merges"], stats["borrows"]), (0, 0, 0, 0))
+
+    def test_instrumentation(self):
+        """Test that counters only move while instrumented and match the tree's shape"""
+        btree = BTree(t=2, instrument=True)
+        self.assertTrue(btree.instrumented)
+        self.assertIs(type(btree), BTree)
+        for i in range(500):
+            btree.insert(Book(i, f"Book {(i * 7919) % 500:04d}", "Author", Genre.FICTION, 2000))
+        stats = btree.stats()
+        # Instrumentation is plain state, so an instrumented tree still pickles
+        restored = pickle.loads(pickle.dumps(btree))
+        self.assertTrue(restored.instrumented)
+        self.assertEqual([book.book_ID for book in restored], [book.book_ID for book in btree])
+        # Every split adds one node, a root split adds the new root as well
+        self.assertEqual(stats["nodes"], 1 + stats["splits"] + stats["height"] - 1)
+        self._assert_valid_structure(btree)
+
+        comparisons = stats["comparisons"]
+        btree.search("Book 0100")
+        self.assertGreater(btree.stats()["comparisons"], comparisons)
+        for i in range(400):
+            self.assertTrue(btree.delete_by_id(i))
+        btree.delete_many_by_id(range(400, 450))
+        stats = btree.stats()
+        self.assertGreater(stats["merges"], 0)
+        self.assertGreater(stats["borrows"], 0)
+        self._assert_valid_structure(btree)
+
+        btree.instrumented = False
+        self.assertIs(type(btree), BTree)
+        btree.insert(Book(999, "Book 9999", "Author", Genre.FICTION, 2000))
+        self.assertEqual(btree.search("Book 9999").book_ID, 999)
+        self.assertEqual(btree.stats()["comparisons"], stats["comparisons"])
+        btree.reset_counters()
+        self.assertEqual(btree.stats()["splits"], 0)
+        self.assertEqual(btree.snapshot().stats()["entries"], 51)
+
+    def test_snapshot_isolation(self):
+        """Test that a snapshot keeps its contents while the tree keeps changing"""
+        books = [Book(i, f"Book {i:04d}", "Author", Genre.FICTION, 2000) for i in range(0, 600, 2)]
+        self.btree.bulk_load(books)
+        snap = self.btree.snapshot()
+        root_before = self.btree.root
+
+        for i in range(1, 600, 2):
+            self.btree.insert(Book(i, f"Book {i:04d}", "Author", Genre.FICTION, 2000))
+        for i in range(0, 600, 4):
+            self.assertTrue(self.btree.delete_by_id(i))
+        later = self.btree.snapshot()
+        self.btree.delete("Book 0002")
+
+        self.assertEqual([book.book_ID for book in snap], list(range(0, 600, 2)))
+        self.assertEqual(len(snap), 300)
+        self.assertIs(snap.search("Book 0004"), books[2])
+        self.assertIsNone(snap.search("Book 0001"))
+        self.assertEqual(len(later), 600 - 150)
+        self.assertIsNotNone(later.search("Book 0002"))
+        self.assertIsNone(self.btree.search("Book 0002"))
+        self.assertIsNot(self.btree.root, root_before)
+        self._assert_valid_structure(self.btree)
+        self._assert_valid_structure(snap)
+        with self.assertRaises(TypeError):
+            snap.insert(books[0])
+        with self.assertRaises(TypeError):
+            snap.delete("Book 0000")
+        with self.assertRaises(TypeError):
+            snap.delete_many_by_id([0])
+
+    def test_no_copies_without_snapshot(self):
+        """Test that writes modify nodes in place until a snapshot exists"""
+        for book in self.books:
+            self.btree.insert(book)
+        root = self.btree.root
+        self.btree.delete("Book J")
+        self.btree.insert(Book(11, "Book K", "Author", Genre.FICTION, 2010))
+        self.assertIs(self.btree.root, root)
+
+    def test_iteration_is_lazy_and_ordered(self):
+        """Test that iterating the tree yields books in title order"""
+        for book in reversed(self.books):
+            self.btree.insert(book)
+        cursor = iter(self.btree)
+        self.assertIs(next(cursor), self.books[0])
+        self.assertEqual([book.title for book in self.btree],
+                         [book.title for book in self.books])
+        self.assertEqual(list(BTree(t=3)), [])
+
+    def test_range(self):
+        """Test half-open title range scans"""
+        for i in range(200):
+            self.btree.insert(Book(i, f"Book {i:03d}", "Author", Genre.FICTION, 2000))
+        titles = [book.title for book in self.btree.range("Book 050", "Book 075")]
+        self.assertEqual(titles, [f"Book {i:03d}" for i in range(50, 75)])
+        self.assertEqual(len(list(self.btree.range(hi="Book 010"))), 10)
+        self.assertEqual(len(list(self.btree.range("Book 190"))), 10)
+        self.assertEqual(list(self.btree.range("Book 050", "Book 050")), [])
+        self.assertEqual(list(self.btree.range("Zzz")), [])
+
+    def test_prefix(self):
+        """Test prefix scans"""
+        for i in range(200):
+            self.btree.insert(Book(i, f"Book {i:03d}", "Author", Genre.FICTION, 2000))
+        self.btree.insert(Book(999, "Other", "Author", Genre.FICTION, 2000))
+        titles = [book.title for book in self.btree.prefix("Book 12")]
+        self.assertEqual(titles, [f"Book {i:03d}" for i in range(120, 130)])
+        self.assertEqual([book.book_ID for book in self.btree.prefix("Oth")], [999])
+        self.assertEqual(list(self.btree.prefix("Missing")), [])
+
+    def test_len_select_rank(self):
+        """Test O(1) length and order-statistic lookups"""
+        self.assertEqual(len(self.btree), 0)
+        for i in range(300):
+            self.btree.insert(Book(i, f"Book {(i * 7) % 300:03d}", "Author", Genre.FICTION, 2000))
+        for i in range(0, 300, 5):
+            self.btree.delete(f"Book {i:03d}")
+        titles = [book.title for book in self.btree]
+        self.assertEqual(len(self.btree), len(titles))
+        for k, title in enumerate(titles):
+            self.assertEqual(self.btree.select(k).title, title)
+            self.assertEqual(self.btree.rank(title), k)
+        self.assertEqual(self.btree.rank("A"), 0)
+        self.assertEqual(self.btree.rank("Zzz"), len(titles))
+        with self.assertRaises(IndexError):
+            self.btree.select(len(titles))
+
+    def test_page(self):
+        """Test windowed access by position"""
+        books = [Book(i, f"Book {i:05d}", "Author", Genre.FICTION, 2000) for i in range(6000)]
+        self.btree.bulk_load(books)
+        window = self.btree.page(5000, 50)
+        self.assertEqual([book.book_ID for book in window], list(range(5000, 5050)))
+        self.assertEqual(len(self.btree.page(5990, 50)), 10)
+        self.assertEqual(self.btree.page(6000, 50), [])
+        self.assertEqual([book.book_ID for book in self.btree.page(0, 3)], [0, 1, 2])
+
+    def test_key_functions(self):
+        """Test author, composite and reversed key orderings"""
+        books = [Book(i, f"Title {i}", f"Author {i % 5}", Genre.FICTION, 1990 + i % 7) for i in range(60)]
+
+        by_author = BTree(t=2, key=lambda b: b.author)
+        for book in books:
+            by_author.insert(book)
+        self._assert_valid_structure(by_author)
+        self.assertEqual(by_author.search("Author 3").book_ID, 3)
+        self.assertEqual([b.book_ID for b in by_author.find_all("Author 4")], list(range(4, 60, 5)))
+        self.assertEqual(len(list(by_author.prefix("Author"))), 60)
+        self.assertEqual(by_author.rank("Author 2"), 24)
+
+        by_year_desc = BTree(t=2, key=lambda b: (b.author, Descending(b.publication_year)))
+        by_year_desc.bulk_load(books)
+        shelf = list(by_year_desc.range(("Author 1",), ("Author 2",)))
+        self.assertEqual(len(shelf), 12)
+        years = [b.publication_year for b in shelf]
+        self.assertEqual(years, sorted(years, reverse=True))
+        newest = by_year_desc.search(("Author 1", Descending(1996)))
+        self.assertEqual((newest.author, newest.publication_year), ("Author 1", 1996))
+        self.assertTrue(by_year_desc.delete_by_id(newest.book_ID))
+        self.assertTrue(by_year_desc.delete(("Author 1", Descending(1996))))
+        self.assertIsNone(by_year_desc.search(("Author 1", Descending(1996))))
+        self.assertEqual(by_year_desc.snapshot().find_all(("Author 0", Descending(1990))),
+                         by_year_desc.find_all(("Author 0", Descending(1990))))
+
+    def test_case_insensitive_title_key(self):
+        """Test that the default index orders and matches by the case-folded title"""
+        titles = ["the Hobbit", "The Hobbit", "THE HOBBIT: ANNOTATED", "Straße", "Ｆｕｌｌ Width", "apple", "Banana"]
+        books = [Book(i, title, "Author", Genre.FICTION, 2000) for i, title in enumerate(titles)]
+        self.btree.bulk_load(books)
+        self.assertEqual([book.title for book in self.btree],
+                         ["apple", "Banana", "Ｆｕｌｌ Width", "Straße", "the Hobbit", "The Hobbit",
+                          "THE HOBBIT: ANNOTATED"])
+        self.assertIs(self.btree.search("THE HOBBIT"), books[0])
+        self.assertEqual([b.book_ID for b in self.btree.find_all("the hobbit")], [0, 1])
+        self.assertEqual([b.book_ID for b in self.btree.prefix("tHe hOb")], [0, 1, 2])
+        self.assertIs(self.btree.search("STRASSE"), books[3])
+        self.assertIs(self.btree.search("full width"), books[4])
+        self.assertEqual(self.btree.rank("BANANA"), 1)
+        self.assertTrue(self.btree.delete("ThE hObBiT"))
+        self.assertIs(self.btree.search("the hobbit"), books[1])
+
     def test_print_tree(self):
         """Test printing the B-tree structure"""
         # Insert more books to ensure the tree has more than two levels
@@ -6,14 +6,15 @@ from src.models.btreenode import BTreeNode
 class TestBTreeNode(unittest.TestCase):
     def setUp(self):
         self.t = 3
-        self.leaf_node = BTreeNode(t=self.t, leaf=True)
-        self.internal_node = BTreeNode(t=self.t, leaf=False)
+        self.leaf_node = BTreeNode(leaf=True)
+        self.internal_node = BTreeNode(leaf=False)
         self.sample_books = [Book(i, f"Book{i}", "Author", Genre.FICTION, 2000+i) for i in range(5)]
 
     def test_node_initialization(self):
         """Test node initialization"""
-        self.assertEqual(self.leaf_node.t, 3)
         self.assertTrue(self.leaf_node.leaf)
+        self.assertFalse(self.internal_node.leaf)
+        self.assertEqual(self.leaf_node.size, 0)
         self.assertEqual(len(self.leaf_node.books), 0)  # Use books instead of keys
         self.assertEqual(len(self.leaf_node.children), 0)
 
@@ -43,7 +44,7 @@ class TestBTreeNode(unittest.TestCase):
     def test_edge_cases(self):
         """Test boundary conditions"""
         # Node with minimum degree t=2
-        min_t_node = BTreeNode(t=2, leaf=True)
+        min_t_node = BTreeNode(leaf=True)
         
         # Fill to maximum capacity (2t-1=3)
         for i in range(3):  
@@ -52,5 +53,12 @@ class TestBTreeNode(unittest.TestCase):
         self.assertTrue(len(min_t_node.books) == 3)
         self.assertEqual(len(min_t_node.books), 3)
 
+    def test_slots(self):
+        """Test that nodes and books carry no per-instance __dict__"""
+        self.assertFalse(hasattr(self.leaf_node, "__dict__"))
+        self.assertFalse(hasattr(self.sample_books[0], "__dict__"))
+        with self.assertRaises(AttributeError):
+            self.leaf_node.t = 3
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
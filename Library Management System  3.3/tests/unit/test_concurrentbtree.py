@@ -0,0 +1,169 @@
+import random
+import threading
+import unittest
+from models.concurrentbtree import ConcurrentBTree
+from models.Book import Book
+from models.Genre import Genre
+
+class TestConcurrentBTree(unittest.TestCase):
+    def setUp(self):
+        """Set up an empty concurrent tree"""
+        self.btree = ConcurrentBTree(t=2)
+
+    def _book(self, i):
+        return Book(i, f"Book {i:05d}", "Author", Genre.FICTION, 2000)
+
+    def _assert_valid_structure(self, btree):
+        """Check key counts, leaf depth, subtree sizes and ordering"""
+        leaf_depths = set()
+
+        def walk(node, depth, is_root):
+            if not is_root:
+                self.assertGreaterEqual(len(node.books), btree.t - 1)
+            self.assertLessEqual(len(node.books), 2 * btree.t - 1)
+            self.assertEqual(node.keys, [btree._key(book) for book in node.books])
+            if node.leaf:
+                leaf_depths.add(depth)
+                self.assertEqual(node.size, len(node.books))
+            else:
+                self.assertEqual(len(node.children), len(node.books) + 1)
+                for child in node.children:
+                    walk(child, depth + 1, False)
+                self.assertEqual(node.size, len(node.books) + sum(c.size for c in node.children))
+
+        walk(btree.root, 0, True)
+        self.assertLessEqual(len(leaf_depths), 1)
+        keys = [btree._key(book) for book in btree.traverse()]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_sequential_operations(self):
+        """Test that single-threaded use behaves like BTree"""
+        books = [self._book(i) for i in range(300)]
+        for book in random.Random(1).sample(books, len(books)):
+            self.btree.insert(book)
+        for i in range(0, 300, 3):
+            self.assertTrue(self.btree.delete(f"Book {i:05d}"))
+        self.assertFalse(self.btree.delete("Book 00000"))
+        self.assertFalse(self.btree.delete_by_id(3))
+        self.assertTrue(self.btree.delete_by_id(4))
+        self._assert_valid_structure(self.btree)
+        self.assertEqual(len(self.btree), 199)
+        self.assertIsNone(self.btree.search("Book 00003"))
+        self.assertIs(self.btree.search("Book 00005"), books[5])
+        self.assertEqual(self.btree.select(0).book_ID, 1)
+        self.assertEqual(self.btree.rank("Book 00005"), 2)
+
+    def test_batch_operations(self):
+        """Test the batch API through the latched single-key paths"""
+        self.assertEqual(self.btree.insert_many([self._book(i) for i in range(100)]), 100)
+        self.assertEqual(self.btree.delete_many_by_id(list(range(0, 100, 2)) + [500]), 50)
+        self.assertEqual(self.btree.delete_many(["book 00001", "BOOK 00001"]), 1)
+        self.assertEqual(self.btree.update_availability_many([("Book 00003", False)]), 1)
+        self.assertFalse(self.btree.search("Book 00003").available)
+        self._assert_valid_structure(self.btree)
+        self.assertEqual(len(self.btree), 49)
+
+    def test_delete_moves_stored_keys(self):
+        """Test that a predecessor/successor swap moves the stored key, not one recomputed from the book"""
+        books = [self._book(i) for i in range(200)]
+        for book in books:
+            self.btree.insert(book)
+        for book in books[::2]:
+            book.title = f"Renamed {book.book_ID}"  # Changed behind the index's back
+        for i in range(1, 200, 2):
+            self.assertTrue(self.btree.delete_by_id(i))
+        self.assertEqual([book.book_ID for book in self.btree], list(range(0, 200, 2)))
+        for book in books[:100:2]:
+            self.assertTrue(self.btree.delete_by_id(book.book_ID))
+        self.assertEqual([book.book_ID for book in self.btree], list(range(100, 200, 2)))
+
+    def test_instrumented_stats(self):
+        """Test that instrumentation keeps the latched paths and reports their work"""
+        self.btree.instrumented = True
+        self.assertIsInstance(self.btree, ConcurrentBTree)
+        for i in range(200):
+            self.btree.insert(self._book(i))
+        for i in range(150):
+            self.assertTrue(self.btree.delete_by_id(i))
+        self.assertEqual(self.btree.search("Book 00160").book_ID, 160)
+        self._assert_valid_structure(self.btree)
+        stats = self.btree.stats()
+        self.assertTrue(stats["instrumented"])
+        self.assertEqual(stats["entries"], 50)
+        self.assertGreater(stats["comparisons"], 0)
+        self.assertGreater(stats["splits"], 0)
+        self.assertGreater(stats["merges"] + stats["borrows"], 0)
+        self.btree.instrumented = False
+        self.assertIs(type(self.btree), ConcurrentBTree)
+
+    def test_concurrent_stress(self):
+        """Test concurrent writers and readers against a known final state"""
+        n_threads, per_thread = 8, 400
+        errors = []
+        start = threading.Barrier(n_threads * 2)
+
+        def writer(tid):
+            rng = random.Random(tid)
+            mine = list(range(tid * per_thread, (tid + 1) * per_thread))
+            try:
+                start.wait()
+                for i in rng.sample(mine, len(mine)):
+                    self.btree.insert(self._book(i))
+                for i in mine[::2]:
+                    if not self.btree.delete_by_id(i):
+                        errors.append(f"delete {i} failed")
+            except Exception as e:  # Surface failures from worker threads
+                errors.append(repr(e))
+
+        def reader(tid):
+            rng = random.Random(100 + tid)
+            try:
+                start.wait()
+                for _ in range(per_thread * 2):
+                    i = rng.randrange(n_threads * per_thread)
+                    book = self.btree.search(f"Book {i:05d}")
+                    if book is not None and book.book_ID != i:
+                        errors.append(f"search {i} returned {book.book_ID}")
+                    if rng.random() < 0.01:
+                        keys = [self.btree._key(b) for b in self.btree]
+                        if keys != sorted(keys):
+                            errors.append("scan out of order")
+            except Exception as e:
+                errors.append(repr(e))
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(n_threads)]
+        threads += [threading.Thread(target=reader, args=(i,)) for i in range(n_threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self._assert_valid_structure(self.btree)
+        expected = [i for i in range(n_threads * per_thread) if i % 2]
+        self.assertEqual([book.book_ID for book in self.btree], expected)
+        self.assertEqual(len(self.btree), len(expected))
+        self.assertEqual(sorted(self.btree._key_by_id), expected)
+
+    def test_snapshot_during_writes(self):
+        """Test that a snapshot stays fixed while writers keep going"""
+        for i in range(200):
+            self.btree.insert(self._book(i))
+        snap = self.btree.snapshot()
+
+        def churn(lo):
+            for i in range(lo, lo + 100):
+                self.btree.delete_by_id(i)
+                self.btree.insert(self._book(1000 + i))
+
+        threads = [threading.Thread(target=churn, args=(lo,)) for lo in (0, 100)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([book.book_ID for book in snap], list(range(200)))
+        self.assertEqual([book.book_ID for book in self.btree], list(range(1000, 1200)))
+        self._assert_valid_structure(self.btree)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -171,6 +171,30 @@ class TestLibraryApp(unittest.TestCase):
         self.assertTrue(test_book.available)
         self.mock_rec_service.record_return.assert_called_once_with("test123", 123)
 
+    def test_batch_borrow_return_delete(self):
+        """Test actions on several comma-separated Book IDs"""
+        self.app.current_user = User("test123")
+        books = {i: MagicMock(available=True) for i in (1, 2, 3)}
+        self.app.id_index = dict(books)
+        
+        self.mock_entry.get.return_value = "1, 2 99"
+        self.app.borrow_book()
+        self.assertFalse(books[1].available)
+        self.assertFalse(books[2].available)
+        self.assertTrue(books[3].available)
+        self.mock_rec_service.record_borrows.assert_called_once_with("test123", [1, 2])
+        
+        self.app.return_book()
+        self.assertTrue(books[1].available)
+        self.mock_rec_service.record_returns.assert_called_once_with("test123", [1, 2])
+        
+        self.mock_messagebox.askyesno.return_value = True
+        self.mock_entry.get.return_value = "1,3"
+        self.app.delete_book()
+        self.mock_btree.delete_many_by_id.assert_called_once_with([1, 3])
+        self.mock_rec_service.remove_books.assert_called_once_with([1, 3])
+        self.assertEqual(list(self.app.id_index), [2])
+
     def test_search_books(self):
         """Test book search functionality"""
         test_books = [
@@ -179,15 +203,190 @@ class TestLibraryApp(unittest.TestCase):
             MagicMock(book_ID=2, title="Advanced Python", author="Jane Smith", 
                      genre=Genre.SCIENCE, available=False)
         ]
-        self.mock_btree.traverse.return_value = test_books
+        self.mock_btree.__iter__.side_effect = lambda: iter(test_books)
+        self.mock_btree.__len__.return_value = len(test_books)
+        self.mock_btree.page.side_effect = lambda offset, limit: test_books[offset:offset + limit]
+        
+        self.mock_btree.find_all.return_value = [test_books[0]]
         
         # Mock search inputs
         self.mock_combobox.get.side_effect = ["Title", "Exact"]
-        self.mock_entry.get.return_value = "Python"
+        self.mock_entry.get.return_value = "python programming"
         
         self.app.search_books()
+        self.mock_btree.find_all.assert_called_once_with("python programming")
         self.mock_tree.insert.assert_called()
 
+    def test_search_books_contains(self):
+        """Test that "Contains" title and author search use the trigram index"""
+        books = [
+            Book(1, "Python Programming", "John Doe", Genre.FICTION, 2001),
+            Book(2, "Advanced Python", "Jane Smith", Genre.SCIENCE, 2005),
+        ]
+        for book in books:
+            self.app.text_index.add(book)
+        self.mock_combobox.get.side_effect = ["Title", "Contains"]
+        self.mock_entry.get.return_value = "PYTHON"
+        self.app.search_books()
+        self.assertEqual(self.mock_tree.insert.call_count, 2)
+        self.mock_btree.__iter__.assert_not_called()
+
+        self.mock_tree.insert.reset_mock()
+        self.mock_combobox.get.side_effect = ["Author", "Contains"]
+        self.mock_entry.get.return_value = "smith"
+        self.app.search_books()
+        self.mock_tree.insert.assert_called_once()
+
+    def test_search_books_author(self):
+        """Test that exact and "Starts with" author search use the author index"""
+        books = [
+            Book(1, "Anna Karenina", "Leo Tolstoy", Genre.FICTION, 1878),
+            Book(2, "War and Peace", "Leo Tolstoy", Genre.FICTION, 1869),
+            Book(3, "Emma", "Jane Austen", Genre.FICTION, 1815),
+        ]
+        for book in books:
+            self.app.author_index.add(book)
+        self.mock_combobox.get.side_effect = ["Author", "Exact"]
+        self.mock_entry.get.return_value = "LEO TOLSTOY"
+        self.app.search_books()
+        self.assertEqual([c.kwargs["values"][0] for c in self.mock_tree.insert.call_args_list], [2, 1])
+        self.mock_btree.__iter__.assert_not_called()
+
+        self.mock_tree.insert.reset_mock()
+        self.mock_combobox.get.side_effect = ["Author", "Starts with"]
+        self.mock_entry.get.return_value = "jane"
+        self.app.search_books()
+        self.mock_tree.insert.assert_called_once()
+
+    def test_search_books_year(self):
+        """Test that "Year" search parses ranges and streams from the year index"""
+        self.assertEqual(self.app._parse_year_range("1900-1950"), (1900, 1950))
+        self.assertEqual(self.app._parse_year_range("1950"), (1950, 1950))
+        self.assertEqual(self.app._parse_year_range("1900 –"), (1900, None))
+        self.assertEqual(self.app._parse_year_range("..1950"), (None, 1950))
+        self.assertRaises(ValueError, self.app._parse_year_range, "soon")
+
+        books = [Book(1, "Old", "A", Genre.FICTION, 1901), Book(2, "New", "B", Genre.FICTION, 1999)]
+        self.mock_rec_service.books_published_between.return_value = iter(books[:1])
+        self.mock_rec_service.count_published_between.return_value = 1
+        self.mock_combobox.get.side_effect = ["Year", "Exact"]
+        self.mock_entry.get.return_value = "1900-1950"
+        self.app.search_books()
+        self.mock_rec_service.books_published_between.assert_called_once_with(1900, 1950)
+        self.mock_tree.insert.assert_called_once()
+        self.mock_btree.__iter__.assert_not_called()
+
+    def test_parse_query(self):
+        """Test that "Query" search terms become QueryEngine filters"""
+        self.assertEqual(
+            self.app._parse_query('genre:science,history author:"carl sagan" year:1970- available:yes', "starts with"),
+            {"genre": [Genre.SCIENCE, Genre.HISTORY], "author": "carl sagan", "author_match": "prefix",
+             "year": (1970, None), "available": True})
+        self.assertEqual(self.app._parse_query("pale blue dot id:3"),
+                         {"book_id": 3, "title": "pale blue dot", "title_match": "exact"})
+        self.assertEqual(self.app._parse_query("author:tolstoi", "fuzzy"),
+                         {"author": "tolstoi", "author_match": "fuzzy"})
+        self.assertRaises(ValueError, self.app._parse_query, "genre:poetry")
+        self.assertRaises(ValueError, self.app._parse_query, "isbn:123")
+        self.assertRaises(ValueError, self.app._parse_query, 'author:"carl')
+
+    def test_search_cache(self):
+        """Test that repeated searches are served from the cache until the catalog changes"""
+        book = Book(1, "Python Programming", "John Doe", Genre.FICTION, 2001)
+        self.app.text_index.add(book)
+        self.app.id_index = {1: book}
+        for _ in range(2):
+            self.app.page_info.set("Books 1–100 of 500")
+            self.mock_combobox.get.side_effect = ["Title", "Contains"]
+            self.mock_entry.get.return_value = "python"
+            with patch.object(self.app.text_index, "search", wraps=self.app.text_index.search) as search:
+                self.app.search_books()
+            self.assertEqual(self.app.page_info.get(), "1 found")
+        search.assert_not_called()  # Second press: cache hit
+        self.assertEqual(self.app.search_cache.hits, 1)
+
+        self.mock_entry.get.return_value = "1"
+        self.app.borrow_book()
+        self.mock_combobox.get.side_effect = ["Title", "Contains"]
+        self.mock_entry.get.return_value = "PYTHON"
+        with patch.object(self.app.text_index, "search", wraps=self.app.text_index.search) as search:
+            self.app.search_books()
+        search.assert_called_once()  # The borrow made the cached result stale
+
+    def test_suggest(self):
+        """Test that type-ahead offers the most borrowed completions and counts borrows"""
+        books = [Book(1, "Dune", "Frank Herbert", Genre.SCIENCE, 1965),
+                 Book(2, "Dracula", "Bram Stoker", Genre.FICTION, 1897)]
+        for book in books:
+            self.app.autocomplete.add(book)
+        self.app.id_index = {book.book_ID: book for book in books}
+        self.mock_entry.get.return_value = "2"
+        self.app.borrow_book()
+        self.assertEqual(books[1].borrow_count, 1)
+
+        self.mock_combobox.get.side_effect = ["Title"]
+        self.mock_entry.get.return_value = "d"
+        self.app._suggest()
+        self.mock_entry.__setitem__.assert_called_with("values", ["Dracula", "Dune"])
+
+    def test_search_books_fuzzy(self):
+        """Test that "Fuzzy" search tolerates typos through the BK-tree index"""
+        books = [
+            Book(1, "Python Programming", "John Doe", Genre.FICTION, 2001),
+            Book(2, "Advanced Python", "Jane Smith", Genre.SCIENCE, 2005),
+        ]
+        for book in books:
+            self.app.fuzzy_index.add(book)
+        self.mock_combobox.get.side_effect = ["Title", "Fuzzy"]
+        self.mock_entry.get.return_value = "pyhton programming"
+        self.app.search_books()
+        self.mock_tree.insert.assert_called_once()
+        self.mock_btree.__iter__.assert_not_called()
+
+    def test_paged_catalog_persists(self):
+        """Test that the "paged" index type reopens the catalog saved on exit"""
+        from gui.libraryapp import LibraryApp
+        from models.pagedbtree import PagedBTree
+        path = os.path.join(self.temp_dir, "catalog.db")
+        app = LibraryApp(index_type="paged", catalog_path=path)
+        app.withdraw()
+        app.tree = self.mock_tree
+        app.recommend_list = self.mock_recommend_list
+        app.action_id_entry = self.mock_entry
+        for book_id, title in ((1, "Dune"), (2, "Dracula"), (3, "Emma")):
+            app._add_book_to_system(Book(book_id, title, "Author", Genre.FICTION, 1900))
+        self.mock_entry.get.return_value = "2"
+        app.borrow_book()
+        self.mock_messagebox.askyesno.return_value = True
+        self.mock_entry.get.return_value = "3"
+        app.delete_book()
+
+        # Every mutation is flushed, so the file is current even without a clean exit
+        copy = os.path.join(self.temp_dir, "copy.db")
+        shutil.copyfile(path, copy)
+        with PagedBTree(copy) as saved:
+            self.assertEqual(sorted(book.book_ID for book in saved), [1, 2])
+            self.assertFalse(saved.search("Dracula").available)
+        app.destroy()
+
+        # Reopening reads nothing up front: paging and title searches go to the page file
+        app = LibraryApp(index_type="paged", catalog_path=path)
+        try:
+            self.assertIs(app.btree, app.store)
+            self.assertEqual(app.id_index, {})
+            self.assertEqual([book.book_ID for book in app.btree.page(0, app.PAGE_SIZE)], [2, 1])
+            self.assertEqual(app._run_search("title", "dune", "exact", False)[0][0].book_ID, 1)
+            self.assertEqual(app.id_index, {})
+            self.mock_btree.bulk_load.assert_not_called()
+
+            # The first search needing another index builds them all from one scan
+            app._run_search("author", "Author", "exact", False)
+            self.assertEqual(sorted(app.id_index), [1, 2])
+            self.assertFalse(app.id_index[2].available)
+            self.assertEqual(app.id_index[2].borrow_count, 1)
+        finally:
+            app.destroy()
+
     def test_csv_import_export(self):
         """Test CSV import and export functionality"""
         # Create temporary CSV file
@@ -252,7 +451,7 @@ class TestLibraryApp(unittest.TestCase):
         
         self.app.delete_book()
         
-        self.mock_btree.delete.assert_called_once()
+        self.mock_btree.delete_by_id.assert_called_once_with(123)
         self.mock_rec_service.remove_book.assert_called_once_with(123)
         self.mock_messagebox.showinfo.assert_called_once()
 
@@ -268,7 +467,7 @@ class TestLibraryApp(unittest.TestCase):
         
         self.app.delete_book()
         
-        self.mock_btree.delete.assert_not_called()
+        self.mock_btree.delete_by_id.assert_not_called()
         self.mock_rec_service.remove_book.assert_not_called()
 
     def test_clear_form(self):
@@ -328,7 +527,7 @@ class TestLibraryApp(unittest.TestCase):
         """Test book search with no results"""
         self.mock_combobox.get.return_value = "Title"
         self.mock_entry.get.return_value = "Nonexistent"
-        self.mock_btree.traverse.return_value = []
+        self.mock_btree.__iter__.side_effect = lambda: iter([])
         
         self.app.search_books()
         self.mock_tree.insert.assert_not_called()
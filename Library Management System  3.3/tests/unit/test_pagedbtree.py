@@ -0,0 +1,214 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from models.pagedbtree import PagedBTree
+from models.Book import Book
+from models.Genre import Genre
+
+class TestPagedBTree(unittest.TestCase):
+    def setUp(self):
+        """Create a scratch directory for page files"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "catalog.db")
+        self.books = [Book(i, f"Book {i:04d}", f"Author {i % 17}", list(Genre)[i % 4], 1900 + i % 100)
+                      for i in range(500)]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_empty_file(self):
+        """Test operations on a new, empty page file"""
+        with PagedBTree(self.path, t=3) as tree:
+            self.assertEqual(len(tree), 0)
+            self.assertEqual(tree.traverse(), [])
+            self.assertIsNone(tree.search("Any Book"))
+            self.assertFalse(tree.delete("Any Book"))
+        with PagedBTree(self.path) as tree:
+            self.assertEqual(len(tree), 0)
+            self.assertEqual(tree.t, 3)
+
+    def test_insert_persists_across_reopen(self):
+        """Test that inserted books survive closing and reopening the file"""
+        shuffled = self.books[:]
+        random.Random(3).shuffle(shuffled)
+        with PagedBTree(self.path, t=3, page_size=1024, cache_pages=4) as tree:
+            for book in shuffled:
+                tree.insert(book)
+            tree.flush()
+            self.assertLessEqual(tree.cache_info()["resident_pages"], 4)
+
+        with PagedBTree(self.path, cache_pages=8) as tree:
+            self.assertEqual(len(tree), 500)
+            self.assertEqual([book.book_ID for book in tree], list(range(500)))
+            found = tree.search("Book 0123")
+            self.assertEqual((found.book_ID, found.author, found.genre), (123, "Author 4", Genre.HISTORY))
+            self.assertEqual([book.book_ID for book in tree.range("Book 0100", "Book 0105")],
+                             list(range(100, 105)))
+            self.assertEqual([book.book_ID for book in tree.prefix("Book 042")], list(range(420, 430)))
+            self.assertEqual([book.book_ID for book in tree.page(250, 3)], [250, 251, 252])
+            self.assertGreater(tree.cache_info()["misses"], 0)
+
+    def test_bulk_load_and_update_availability(self):
+        """Test bulk loading and persisting an availability change"""
+        with PagedBTree(self.path, t=4, page_size=2048) as tree:
+            tree.bulk_load(reversed(self.books))
+            self.assertTrue(tree.update_availability("Book 0042", False))
+            self.assertFalse(tree.update_availability("Missing", False))
+        with PagedBTree(self.path) as tree:
+            self.assertEqual(len(tree.traverse()), 500)
+            self.assertFalse(tree.search("Book 0042").available)
+            self.assertTrue(tree.search("Book 0043").available)
+
+    def test_delete_reuses_pages(self):
+        """Test deletes rebalance correctly and free pages are recycled"""
+        rng = random.Random(11)
+        with PagedBTree(self.path, t=2, page_size=1024, cache_pages=6) as tree:
+            tree.bulk_load(self.books)
+            live = {book.book_ID for book in self.books}
+            for book_id in rng.sample(sorted(live), 400):
+                self.assertTrue(tree.delete(f"Book {book_id:04d}"))
+                live.discard(book_id)
+            self.assertTrue(tree.delete_by_id(min(live)))
+            live.discard(min(live))
+            pages = tree.cache_info()["file_pages"]
+            for book_id in range(1000, 1100):
+                tree.insert(Book(book_id, f"New {book_id}", "Author", Genre.FICTION, 2000))
+            self.assertLessEqual(tree.cache_info()["file_pages"], pages)
+        with PagedBTree(self.path) as tree:
+            expected = sorted(live) + list(range(1000, 1100))
+            self.assertEqual(sorted(book.book_ID for book in tree), expected)
+            self.assertEqual(len(tree), len(expected))
+
+    def test_id_map_persists(self):
+        """Test that delete_by_id and update_by_id use the stored ID map instead of a scan"""
+        with PagedBTree(self.path, t=2, page_size=256) as tree:
+            tree.bulk_load(self.books[:300])
+            for book in self.books[300:]:
+                tree.insert(book)
+            self.assertTrue(tree.delete_by_id(7))
+        with PagedBTree(self.path, t=2, page_size=256, cache_pages=1024) as tree:
+            self.assertTrue(tree.update_by_id(321, False, borrow_count=4))
+            self.assertTrue(tree.delete_by_id(123))
+            self.assertFalse(tree.delete_by_id(7))
+            self.assertFalse(tree.update_by_id(7, False))
+            # One root-to-leaf descent per call, not a walk over every page
+            self.assertLess(tree.cache_info()["misses"], 40)
+            self.assertGreater(tree.cache_info()["file_pages"], 200)
+        with PagedBTree(self.path) as tree:
+            self.assertEqual(len(tree), 498)
+            book = tree.search("Book 0321")
+            self.assertEqual((book.available, book.borrow_count), (False, 4))
+            self.assertIsNone(tree.search("Book 0123"))
+            self.assertTrue(tree.delete_by_id(499))
+            self.assertEqual(sorted(book.book_ID for book in tree),
+                             [i for i in range(499) if i not in (7, 123)])
+            self.assertEqual(tree.delete_many_by_id([400, 7, 12, 400, 999]), 2)
+            self.assertEqual(len(tree), 495)
+            self.assertIsNone(tree.search("Book 0400"))
+
+    def test_reopen_without_close(self):
+        """Test that a copy taken between flushes holds exactly the last flushed catalog"""
+        copy = os.path.join(self.temp_dir, "copy.db")
+        tree = PagedBTree(self.path, t=2, page_size=512, cache_pages=4)
+        try:
+            tree.bulk_load(self.books[:200])
+            for book in self.books[200:]:
+                tree.insert(book)
+            for book_id in range(0, 200, 3):
+                tree.delete_by_id(book_id)
+            shutil.copyfile(self.path, copy)  # As if the process died here
+            with PagedBTree(copy) as reopened:
+                self.assertEqual(len(reopened), 200)
+                self.assertEqual([book.book_ID for book in reopened], list(range(200)))
+                self.assertTrue(reopened.delete_by_id(199))
+
+            tree.flush()
+            shutil.copyfile(self.path, copy)
+            with PagedBTree(copy) as reopened:
+                live = [i for i in range(500) if i >= 200 or i % 3]
+                self.assertEqual(len(reopened), len(live))
+                self.assertEqual(sorted(book.book_ID for book in reopened), live)
+        finally:
+            tree.close()
+
+    def test_id_map_flushes_incrementally(self):
+        """Test that flushing appends ID map changes and compacts the log only after heavy churn"""
+        with PagedBTree(self.path, t=2, page_size=512) as tree:
+            tree.bulk_load(self.books[:300])
+            with patch.object(tree, "_write_id_map", wraps=tree._write_id_map) as rewrite:
+                for book in self.books[300:350]:
+                    tree.insert(book)
+                    tree.flush()
+                for book_id in range(50):
+                    tree.delete_by_id(book_id)
+                    tree.flush()
+                rewrite.assert_not_called()
+
+                for book in self.books[50:200]:
+                    tree.delete_by_id(book.book_ID)
+                    tree.insert(book)
+                tree.flush()
+                rewrite.assert_called_once()
+            tree.delete_by_id(60)
+            tree.insert(Book(60, "Renamed", "Author", Genre.FICTION, 2000))
+
+        with PagedBTree(self.path) as tree:
+            self.assertEqual(len(tree), 300)
+            self.assertFalse(tree.delete_by_id(10))
+            self.assertTrue(tree.update_by_id(60, False))
+            self.assertFalse(tree.search("Renamed").available)
+            self.assertTrue(tree.delete_by_id(349))
+            self.assertEqual(sorted(book.book_ID for book in tree), list(range(50, 349)))
+
+    def test_duplicate_titles(self):
+        """Test editions sharing a title"""
+        with PagedBTree(self.path, t=3, page_size=1024) as tree:
+            for i in range(20, 0, -1):
+                tree.insert(Book(i, "1984", "Orwell", Genre.FICTION, 1949))
+            self.assertEqual([book.book_ID for book in tree.find_all("1984")], list(range(1, 21)))
+            self.assertTrue(tree.delete("1984"))
+            self.assertEqual(tree.search("1984").book_ID, 2)
+
+    def test_case_insensitive_lookup(self):
+        """Test that titles are keyed by their normalized form, as in the in-memory trees"""
+        with PagedBTree(self.path, t=2, page_size=1024) as tree:
+            tree.insert(Book(1, "The Hobbit", "Tolkien", Genre.FICTION, 1937))
+            tree.insert(Book(2, "the silmarillion", "Tolkien", Genre.FICTION, 1977))
+            tree.insert(Book(3, "THE HOBBIT", "Tolkien", Genre.FICTION, 1951))
+            tree.insert(Book(4, "Stra\u00dfe", "Author", Genre.FICTION, 2000))
+        with PagedBTree(self.path) as tree:
+            self.assertEqual(tree.search("the hobbit").title, "The Hobbit")
+            self.assertEqual([book.book_ID for book in tree.find_all("tHe HoBbIt")], [1, 3])
+            self.assertEqual([book.book_ID for book in tree.prefix("THE ")], [1, 3, 2])
+            self.assertEqual([book.book_ID for book in tree.range("STRASSE", "the h")], [4])
+            self.assertEqual([book.book_ID for book in tree], [4, 1, 3, 2])
+            self.assertTrue(tree.update_availability("THE SILMARILLION", False))
+            self.assertFalse(tree.search("The Silmarillion").available)
+            self.assertTrue(tree.delete("the HOBBIT"))
+            self.assertEqual(tree.search("The Hobbit").book_ID, 3)
+
+    def test_oversized_record_rejected(self):
+        """Test that a book that could overflow a page is refused before the tree changes"""
+        with PagedBTree(self.path, t=3, page_size=256) as tree:
+            tree.insert(Book(0, "Short", "Author", Genre.FICTION, 2000))
+            with self.assertRaises(ValueError):
+                tree.insert(Book(1, "x" * 40, "Author", Genre.FICTION, 2000))
+            with self.assertRaises(ValueError):
+                tree.bulk_load([Book(2, "Fine", "Author", Genre.FICTION, 2000),
+                                Book(3, "y" * 40, "Author", Genre.FICTION, 2000)])
+            self.assertEqual([book.book_ID for book in tree], [0])
+        with PagedBTree(self.path) as tree:
+            self.assertEqual([book.title for book in tree], ["Short"])
+
+    def test_rejects_foreign_file(self):
+        """Test opening a file that is not a page file"""
+        with open(self.path, "wb") as f:
+            f.write(b"not a catalog" * 10)
+        with self.assertRaises(ValueError):
+            PagedBTree(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
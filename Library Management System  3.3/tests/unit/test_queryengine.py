@@ -0,0 +1,126 @@
+import random
+import unittest
+from models.authorindex import AuthorIndex
+from models.bktree import FuzzyIndex
+from models.Book import Book, normalize_title
+from models.bplustree import BPlusTree
+from models.btree import BTree
+from models.Genre import Genre
+from models.trigramindex import TrigramIndex
+from services.QueryEngine import QueryEngine
+from services.RecommendationService import RecommendationService
+
+AUTHORS = ["Carl Sagan", "Carl Zimmer", "Mary Beard", "Ursula K. Le Guin", "Leo Tolstoy"]
+WORDS = ["cosmos", "dragons", "pale", "blue", "dot", "history", "war", "peace", "earthsea"]
+
+class TestQueryEngine(unittest.TestCase):
+    def setUp(self):
+        """Index a random catalog the way LibraryApp does"""
+        rng = random.Random(23)
+        self.books = {}
+        for i in range(400):
+            title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))
+            self.books[i] = Book(i, title, rng.choice(AUTHORS), rng.choice(list(Genre)),
+                                 rng.randint(1950, 2000), available=rng.random() < 0.7)
+        self.service = RecommendationService()
+        self.service.load_books(list(self.books.values()))
+        self.authors = AuthorIndex()
+        self.authors.add_many(self.books.values())
+        self.text = TrigramIndex()
+        self.text.add_many(self.books.values())
+        self.titles = BTree(t=3)
+        self.titles.bulk_load(list(self.books.values()))
+        self.engine = self._engine(self.titles)
+
+    def _engine(self, titles):
+        return QueryEngine(self.books, titles, self.authors, self.service.bitmaps,
+                           self.service.year_index, self.text)
+
+    def _scan(self, book_id=None, title=None, title_match="exact", author=None, author_match="exact",
+              genre=None, year=None, available=None):
+        """Reference answer: test every book"""
+        def text_ok(text, term, match):
+            term = normalize_title(term)
+            return {"exact": text == term, "prefix": text.startswith(term), "contains": term in text}[match]
+        genres = None if genre is None else ({genre} if isinstance(genre, Genre) else set(genre))
+        lo, hi = (year, year) if isinstance(year, int) else (year or (None, None))
+        return sorted(b for b in self.books.values()
+                      if (book_id is None or b.book_ID == book_id)
+                      and (title is None or text_ok(b.title_key, title, title_match))
+                      and (author is None or text_ok(normalize_title(b.author), author, author_match))
+                      and (genres is None or b.genre in genres)
+                      and (lo is None or b.publication_year >= lo) and (hi is None or b.publication_year <= hi)
+                      and (available is None or b.available == available))
+
+    def test_matches_scan(self):
+        """Test random filter combinations against a scan, with both title index types"""
+        rng = random.Random(5)
+        plain_titles = BPlusTree(t=3)
+        plain_titles.bulk_load(list(self.books.values()))
+        for engine in (self.engine, self._engine(plain_titles)):
+            for _ in range(300):
+                filters = {}
+                if rng.random() < 0.1:
+                    filters["book_id"] = rng.randrange(450)
+                if rng.random() < 0.4:
+                    filters["title"] = rng.choice(WORDS)[:rng.randint(2, 6)]
+                    filters["title_match"] = rng.choice(["exact", "prefix", "contains"])
+                if rng.random() < 0.4:
+                    filters["author"] = rng.choice(AUTHORS)[:rng.randint(3, 12)]
+                    filters["author_match"] = rng.choice(["exact", "prefix", "contains"])
+                if rng.random() < 0.5:
+                    filters["genre"] = rng.sample(list(Genre), rng.randint(1, 2))
+                if rng.random() < 0.5:
+                    lo = rng.randint(1940, 2000)
+                    filters["year"] = rng.choice([lo, (lo, lo + rng.randint(0, 20)), (None, lo), (lo, None)])
+                if rng.random() < 0.5:
+                    filters["available"] = rng.random() < 0.5
+                self.assertEqual(engine.find(**filters), self._scan(**filters), filters)
+
+    def test_plan_uses_most_selective_index(self):
+        """Test that the driver is the predicate with the smallest estimate"""
+        sagan = self.authors.count("carl sagan")
+        plan = self.engine.explain(author="Carl Sagan", genre=Genre.SCIENCE, year=(1970, None), available=True)
+        self.assertEqual(plan["estimates"]["author"], sagan)
+        self.assertEqual(plan["estimates"]["year"], sum(1 for b in self.books.values() if b.publication_year >= 1970))
+        self.assertEqual(plan["driver"], min(plan["estimates"], key=plan["estimates"].get))
+        self.assertNotIn(plan["driver"], plan["verify"])
+
+        plan = self.engine.explain(book_id=7, genre=Genre.SCIENCE)
+        self.assertEqual((plan["driver"], plan["estimated_rows"], plan["verify"]), ("id", 1, ["genre"]))
+
+        # Bitmap predicates are combined with one AND and need no verification
+        self.engine.find(genre=Genre.SCIENCE, available=False)
+        plan = self.engine.last_plan
+        self.assertEqual(sorted(plan["bitmap_and"]), ["available", "genre"])
+        self.assertEqual(plan["verify"], [])
+        self.assertEqual(plan["rows"], len(self._scan(genre=Genre.SCIENCE, available=False)))
+
+    def test_empty_and_unfiltered(self):
+        """Test impossible filters, no filters and bad match types"""
+        self.assertEqual(self.engine.find(book_id=999, available=True), [])
+        self.assertEqual(self.engine.last_plan["estimated_rows"], 0)
+        self.assertEqual(self.engine.find(), sorted(self.books.values()))
+        self.assertEqual(self.engine.last_plan["driver"], "scan")
+        self.assertEqual(len(self.engine.find(genre=[Genre.FICTION], limit=3)), 3)
+        self.assertRaises(ValueError, self.engine.find, title="war", title_match="fuzzy")
+        self.assertRaises(ValueError, self.engine.find, title="war", title_match="soundex")
+
+    def test_fuzzy_filters(self):
+        """Test that fuzzy title and author filters are answered by the FuzzyIndex"""
+        fuzzy = FuzzyIndex()
+        fuzzy.add_many(self.books.values())
+        engine = QueryEngine(self.books, self.titles, self.authors, self.service.bitmaps,
+                             self.service.year_index, self.text, fuzzy)
+        expected = sorted(fuzzy.search("title", "dargons", limit=len(fuzzy)))
+        self.assertGreater(len(expected), FuzzyIndex.LIMIT)
+        self.assertEqual(engine.find(title="dargons", title_match="fuzzy"), expected)
+        self.assertEqual(engine.last_plan["estimates"]["title"], len(expected))
+
+        found = engine.find(title="dargons", title_match="fuzzy", author="tolstoi", author_match="fuzzy",
+                            genre=Genre.SCIENCE)
+        self.assertEqual(found, [b for b in expected if b.author == "Leo Tolstoy" and b.genre == Genre.SCIENCE])
+        self.assertTrue(found)
+
+if __name__ == '__main__':
+    unittest.main()
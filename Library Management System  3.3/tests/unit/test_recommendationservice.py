@@ -23,13 +23,10 @@ class TestRecommendationService(unittest.TestCase):
         self.book2 = Book(2, "SciFiBook", "AuthorB", Genre.SCIENCE, 2021)
         self.book3 = Book(3, "RomanceBook", "AuthorA", Genre.ROMANCE, 2022)
         
-        # Add to service (without triggering BTree operations)
+        # Add to service (the title index is mocked, genre/availability bitmaps are real)
         self.service.user_data = {"u1": self.user1, "u2": self.user2}
-        self.service.book_data = {
-            1: self.book1,
-            2: self.book2, 
-            3: self.book3
-        }
+        for book in (self.book1, self.book2, self.book3):
+            self.service.add_book(book)
         self.service.genre_stats = defaultdict(int)
         self.service.genre_stats.update({
             "FICTION": 1,
@@ -43,6 +40,28 @@ class TestRecommendationService(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.service.add_book("invalid_book_object")
 
+    def test_load_books(self):
+        """Test loading a batch of books into a fresh service"""
+        service = RecommendationService()
+        books = [Book(i, f"Title {i}", "Author", Genre.SCIENCE, 2000) for i in range(50)]
+        service.load_books(books)
+        self.assertEqual(len(service.book_data), 50)
+        self.assertEqual(service.genre_stats["SCIENCE"], 50)
+        self.assertIs(service.title_index.search("Title 7"), books[7])
+        with self.assertRaises(ValueError):
+            service.load_books(["invalid_book_object"])
+
+    def test_index_type_configuration(self):
+        """Test choosing the title index implementation"""
+        from models.bplustree import BPlusTree
+        service = RecommendationService(index_type="bplustree")
+        self.assertIsInstance(service.title_index, BPlusTree)
+        service.load_books([Book(i, f"Title {i}", "Author", Genre.HISTORY, 2000) for i in range(20)])
+        service.remove_book(3)
+        self.assertIsNone(service.title_index.search("Title 3"))
+        with self.assertRaises(ValueError):
+            RecommendationService(index_type="hash")
+
     def test_add_user(self):
         """Test user addition"""
         self.assertIn("u1", self.service.user_data)
@@ -61,8 +80,8 @@ class TestRecommendationService(unittest.TestCase):
 
     def test_empty_recommendations(self):
         """Test when no books are available"""
-        for book in self.service.book_data.values():
-            book.available = False
+        self.service.update_availability(list(self.service.book_data), False)
+        self.assertEqual(self.service.available_count(), 0)
         self.assertEqual(len(self.service.recommend_books("u1")), 0)
 
     def test_get_or_create_user(self):
@@ -129,9 +148,9 @@ class TestRecommendationService(unittest.TestCase):
             book.author = f"Author{i}"
             book.genre = Mock()
             book.genre.value = f"Type{i%4}"
+            book.publication_year = 2000 + i
             book.available = True
-            self.service.book_data[i] = book
-            self.service.genre_stats[book.genre.value] += 1
+            self.service.add_book(book)
         
         recommendations = self.service.recommend_books("u1", top_n=5)
         authors = {book.author for book in recommendations}
@@ -145,6 +164,84 @@ class TestRecommendationService(unittest.TestCase):
         self.assertNotIn(1, self.service.book_data)
         self.assertEqual(len(self.service.book_data), 2)
 
+    def test_batch_operations(self):
+        """Test batch add, remove and return entry points"""
+        service = RecommendationService()
+        service.add_user(self.user1)
+        service.load_books([self.book1, self.book2])
+        extra = [Book(i, f"Title {i}", "Author", Genre.SCIENCE, 2000) for i in range(10, 20)]
+        service.add_books(extra)
+        self.assertEqual(len(service.book_data), 12)
+        self.assertEqual(service.genre_stats["SCIENCE"], 11)
+        self.assertIs(service.title_index.search("title 15"), extra[5])
+        with self.assertRaises(ValueError):
+            service.add_books([self.book3, "invalid_book_object"])
+        self.assertNotIn(3, service.book_data)
+
+        service.record_borrows("u1", [10, 11, 99])
+        self.assertFalse(extra[0].available)
+        self.assertFalse(extra[1].available)
+        service.record_returns("u1", [10, 11, 99])
+        self.assertTrue(extra[0].available and extra[1].available)
+
+        service.remove_books([10, 11, 12, 99])
+        self.assertEqual(len(service.book_data), 9)
+        self.assertEqual(len(service.title_index), 9)
+        self.assertEqual(service.genre_stats["SCIENCE"], 8)
+
+    def test_genre_bitmaps(self):
+        """Test genre queries stay in step with adds, removals, borrows and returns"""
+        service = RecommendationService()
+        service.add_user(self.user1)
+        genres = list(Genre)
+        books = [Book(i, f"Title {i:02d}", "Author", genres[i % 4], 2000) for i in range(40)]
+        service.load_books(books[:30])
+        service.add_books(books[30:])
+        service.record_borrows("u1", [0, 4, 8])
+        service.update_availability([12], False)
+        service.record_return("u1", 4)
+        service.remove_books([16, 20])
+        live = [b for b in books if b.book_ID not in (16, 20)]
+        self.assertEqual(service.books_in_genres([Genre.FICTION]),
+                         [b for b in live if b.genre == Genre.FICTION])
+        self.assertEqual([b.book_ID for b in service.books_in_genres([Genre.FICTION], available_only=True)],
+                         [b.book_ID for b in live if b.genre == Genre.FICTION and b.book_ID not in (0, 8, 12)])
+        self.assertEqual(len(service.books_in_genres([Genre.SCIENCE, Genre.HISTORY])), 20)
+        self.assertEqual(service.books_in_genres([]), [])
+        available = [b for b in live if b.book_ID not in (0, 8, 12)]
+        self.assertEqual(service.available_count(), len(available))
+        self.assertEqual(service.available_books(title_order=True), available)
+        self.assertEqual(sorted(b.book_ID for b in service.available_books()),
+                         [b.book_ID for b in available])
+
+        # A new user gets one available, unborrowed book per genre
+        service.add_user(self.user2)
+        recommended = service.recommend_books("u2", top_n=4)
+        self.assertEqual({b.genre for b in recommended}, set(Genre))
+        self.assertTrue(all(b.available for b in recommended))
+
+    def test_year_index(self):
+        """Test year-range streams and per-year counts through adds and removals"""
+        service = RecommendationService()
+        books = [Book(i, f"Title {i:02d}", "Author", Genre.FICTION, 1900 + i % 10) for i in range(30)]
+        service.load_books(books[:20])
+        service.add_books(books[20:25])
+        for book in books[25:]:
+            service.add_book(book)
+        service.remove_books([0, 10])
+        service.remove_book(20)
+        live = [b for b in books if b.book_ID not in (0, 10, 20)]
+
+        found = list(service.books_published_between(1902, 1904))
+        self.assertEqual([b.book_ID for b in found],
+                         [b.book_ID for b in sorted(live, key=lambda b: (b.publication_year, b.book_ID))
+                          if 1902 <= b.publication_year <= 1904])
+        self.assertEqual([b.book_ID for b in service.books_published_between(hi=1900)], [])
+        self.assertEqual(len(list(service.books_published_between(1905))), 15)
+        self.assertEqual(service.books_per_year(1899, 1901), {1901: 3})
+        self.assertEqual(service.count_published_between(), len(live))
+        self.assertEqual(service.count_published_between(1902, 1904), len(found))
+
     def test_thread_safety(self):
         # Reset to initial state (3 points)
         self.user1.preferences = {"FICTION": 3}
@@ -0,0 +1,42 @@
+import unittest
+from models.searchcache import SearchCache
+
+class TestSearchCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = SearchCache(capacity=2)
+
+    def test_hits_and_misses(self):
+        """Test lookups, the hit rate and the stats"""
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.put("a", [1])
+        self.assertEqual(self.cache.get("a"), [1])
+        self.assertEqual(self.cache.get("a"), [1])
+        self.assertIn("a", self.cache)
+        self.assertAlmostEqual(self.cache.hit_rate, 2 / 3)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (2, 1, 1))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry goes first"""
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+        self.cache.get("a")
+        self.cache.put("c", 3)
+        self.assertEqual(len(self.cache), 2)
+        self.assertNotIn("b", self.cache)
+        self.assertEqual((self.cache.get("a"), self.cache.get("c")), (1, 3))
+
+    def test_invalidate(self):
+        """Test that results cached before a catalog change are never served"""
+        self.cache.put("a", 1)
+        self.cache.invalidate()
+        self.assertNotIn("a", self.cache)
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual((self.cache.stale, len(self.cache)), (1, 0))
+        self.cache.put("a", 2)
+        self.assertEqual(self.cache.get("a"), 2)
+        self.cache.clear()
+        self.assertEqual((len(self.cache), self.cache.hit_rate), (0, 0.0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import random
+import unittest
+from models.trigramindex import TrigramIndex
+from models.Book import Book, normalize_title
+from models.Genre import Genre
+
+class TestTrigramIndex(unittest.TestCase):
+    def setUp(self):
+        """Set up an index over a few books"""
+        self.books = [
+            Book(1, "Python Programming", "John Doe", Genre.FICTION, 2001),
+            Book(2, "Advanced Python", "Jane Smith", Genre.SCIENCE, 2005),
+            Book(3, "Cien años de soledad", "Gabriel García Márquez", Genre.FICTION, 1967),
+            Book(4, "Dune", "Frank Herbert", Genre.FICTION, 1965),
+        ]
+        self.index = TrigramIndex()
+        for book in self.books:
+            self.index.add(book)
+
+    def test_contains_search(self):
+        """Test case-insensitive substring matches in title order"""
+        self.assertEqual(self.index.search("title", "PYTHON"), [self.books[1], self.books[0]])
+        self.assertEqual(self.index.search("title", "thon prog"), [self.books[0]])
+        self.assertEqual(self.index.search("title", "AÑOS"), [self.books[2]])
+        self.assertEqual(self.index.search("author", "garcía"), [self.books[2]])
+        self.assertEqual(self.index.search("author", "herb"), [self.books[3]])
+        self.assertEqual(self.index.search("title", "no such title"), [])
+
+    def test_short_terms(self):
+        """Test that terms under three characters still match"""
+        self.assertEqual(self.index.search("title", "du"), [self.books[3]])
+        self.assertEqual(self.index.search("author", "J"), [self.books[1], self.books[0]])
+
+    def test_add_and_remove(self):
+        """Test that updates keep posting lists exact"""
+        self.assertTrue(self.index.remove(1))
+        self.assertFalse(self.index.remove(1))
+        self.assertEqual(self.index.search("title", "python"), [self.books[1]])
+        self.index.add(Book(2, "Children of Dune", "Frank Herbert", Genre.FICTION, 1976))
+        self.assertEqual(self.index.search("title", "python"), [])
+        self.assertEqual([book.book_ID for book in self.index.search("title", "dune")], [2, 4])
+        self.assertEqual(len(self.index), 3)
+        for book_ID in (2, 3, 4):
+            self.index.remove(book_ID)
+        self.assertEqual(self.index._postings, {"title": {}, "author": {}})
+        self.index.add_many(self.books)
+        self.index.clear()
+        self.assertEqual(len(self.index), 0)
+        self.assertEqual(self.index.search("title", "dune"), [])
+
+    def test_matches_scan(self):
+        """Test index results against a full scan after random updates"""
+        rng = random.Random(17)
+        words = ["war", "peace", "night", "dune", "star", "river", "garden", "sea", "king"]
+        books = [Book(i, " ".join(rng.choice(words) for _ in range(rng.randint(1, 4))),
+                      rng.choice(["Tolstoy", "Austen", "Le Guin"]), Genre.FICTION, 2000)
+                 for i in range(2000)]
+        index = TrigramIndex()
+        index.add_many(books[:1500])
+        for book in books[1500:]:
+            index.add(book)
+        removed = set(rng.sample(range(2000), 700))
+        for book_ID in removed:
+            index.remove(book_ID)
+        live = [book for book in books if book.book_ID not in removed]
+        for term in ["war", "ar pe", "night dune", "sea k", "a", "tolst", "le g", "xyz"]:
+            for field, text in [("title", lambda b: b.title_key), ("author", lambda b: normalize_title(b.author))]:
+                expected = sorted(book for book in live if normalize_title(term) in text(book))
+                self.assertEqual(index.search(field, term), expected)
+
+if __name__ == '__main__':
+    unittest.main()